@@ -0,0 +1,188 @@
+# artifact.py
+import io
+import json
+import os
+import struct
+from datetime import datetime, timezone
+
+import joblib
+import sklearn
+
+# --- FORMAT ARTEFAK MODEL ---
+# Susunan file (versi 1):
+#   [payload joblib: {'model': ...}] [header JSON] [trailer]
+# trailer = panjang payload (uint64) + panjang header (uint64) + versi format (uint32) + MAGIC (8 byte)
+# Payload diletakkan di awal file agar file tanpa kompresi bisa langsung dibuka joblib.
+# mmap_mode='r' hanya dipakai untuk file di disk yang berisi array numpy biasa, yaitu
+# forest_engine.PackedForest yang ditulis untuk worker scoring: arraynya dipetakan dari disk
+# dan dipakai bersama oleh semua worker. Pohon sklearn (Tree) menyalin buffer node-nya sendiri
+# saat unpickle, sehingga model sklearn yang diupload dimuat langsung dari buffer upload.
+# Header berada di akhir sehingga bisa dibaca tanpa memuat pohon-pohon model.
+MAGIC = b"TNSCMDL1"
+FORMAT_VERSION = 1
+_TRAILER = struct.Struct("<QQI8s")
+
+# Level kompresi yang bisa dipilih pengguna (0 = tanpa kompresi, dimuat tanpa dekompresi)
+COMPRESSION_LEVELS = {
+    "Tanpa kompresi (muat tercepat)": 0,
+    "Sedang (zlib 3)": 3,
+    "Maksimal (zlib 9)": 9,
+}
+
+# Folder artefak model bersama untuk worker scoring (di-mmap), dibatasi total ukurannya
+# (file terlama dihapus lebih dulu)
+SPOOL_DIR = os.path.join(os.environ.get("TENSICARE_CACHE_DIR", ".cache"), "artifacts")
+SPOOL_MAX_MB = int(os.environ.get("TENSICARE_SPOOL_MB", "2048"))
+
+
+# --- HELPER: TULIS ARTEFAK ---
+def write_artifact(fileobj, model, metadata: dict, compress: int = 3) -> dict:
+    """
+    Menulis model + metadata ke fileobj dengan format artefak versi 1.
+    metadata berisi antara lain 'features', 'target', 'encoders', 'training'.
+    Returns: dict header yang ditulis.
+    """
+    start = fileobj.tell()
+    joblib.dump({"model": model}, fileobj, compress=compress)
+    payload_size = fileobj.tell() - start
+
+    header = {
+        **metadata,
+        "format_version": FORMAT_VERSION,
+        "model_class": type(model).__name__,
+        "sklearn_version": sklearn.__version__,
+        "compress": int(compress),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    header_bytes = json.dumps(header, default=_json_default).encode("utf-8")
+    fileobj.write(header_bytes)
+    fileobj.write(_TRAILER.pack(payload_size, len(header_bytes), FORMAT_VERSION, MAGIC))
+    return header
+
+
+def _json_default(value):
+    # nilai numpy (mis. np.int64, np.float32) di metadata -> tipe Python biasa
+    if hasattr(value, "item"):
+        return value.item()
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Tidak bisa disimpan di header: {type(value).__name__}")
+
+
+# --- HELPER: BACA HEADER SAJA ---
+def _read_trailer(fileobj):
+    fileobj.seek(0, io.SEEK_END)
+    size = fileobj.tell()
+    if size < _TRAILER.size:
+        return None
+    fileobj.seek(size - _TRAILER.size)
+    payload_size, header_size, version, magic = _TRAILER.unpack(fileobj.read(_TRAILER.size))
+    if magic != MAGIC:
+        return None
+    return payload_size, header_size, version
+
+
+def read_artifact_header(fileobj) -> dict:
+    """
+    Membaca header artefak (fitur, target, encoder, statistik training) tanpa memuat model.
+    Returns: dict header, atau None jika file adalah format lama (joblib dict biasa).
+    """
+    trailer = _read_trailer(fileobj)
+    if trailer is None:
+        return None
+    payload_size, header_size, version = trailer
+    if version > FORMAT_VERSION:
+        raise ValueError(f"Versi format artefak {version} belum didukung aplikasi ini.")
+    fileobj.seek(payload_size)
+    header = json.loads(fileobj.read(header_size).decode("utf-8"))
+    header["payload_size"] = payload_size
+    return header
+
+
+# --- HELPER: BATAS UKURAN SPOOL_DIR ---
+def touch_spool_file(path: str):
+    """Menandai file spool sebagai baru dipakai, lalu membatasi ukuran SPOOL_DIR."""
+    os.utime(path)
+    prune_spool(keep=path)
+
+
+def prune_spool(keep: str = None, budget_bytes: int = SPOOL_MAX_MB * 1024 * 1024):
+    """
+    Menghapus file terlama (mtime) di SPOOL_DIR sampai total ukurannya <= budget_bytes.
+    File keep tidak dihapus. Di Linux file yang sedang di-mmap tetap aman dihapus
+    (pemetaan yang sudah ada tetap berlaku).
+    """
+    files = []
+    for name in os.listdir(SPOOL_DIR):
+        if not name.endswith(".tnsc"):
+            continue
+        path = os.path.join(SPOOL_DIR, name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, path))
+    keep = os.path.abspath(keep) if keep is not None else None
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= budget_bytes:
+            break
+        if os.path.abspath(path) == keep:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+# --- HELPER: MUAT ARTEFAK ---
+def load_artifact(source, mmap: bool = False):
+    """
+    Memuat model dari artefak. source bisa berupa path atau file-like (mis. file upload).
+    Payload tanpa kompresi dari path dimuat dengan mmap_mode='r' jika mmap=True (hanya
+    berguna untuk model berupa array numpy biasa, lihat catatan format di atas); dari
+    file-like dibaca langsung dari buffernya tanpa salinan payload.
+    File format lama (joblib dict {'model', 'features', ...}) tetap didukung.
+    Returns: tuple (model, header).
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            header = read_artifact_header(f)
+        path = source
+        fileobj = None
+    else:
+        fileobj = source
+        header = read_artifact_header(fileobj)
+        path = None
+
+    if header is None:
+        # format lama: seluruh file adalah joblib dict
+        if fileobj is not None:
+            fileobj.seek(0)
+        data = joblib.load(path if path is not None else fileobj)
+        header = {
+            "format_version": 0,
+            "features": list(data.get("features", [])),
+            "encoders": data.get("encoders", {}),
+            "compress": None,
+        }
+        return data.get("model"), header
+
+    if header["compress"] == 0:
+        # trailer & header setelah payload diabaikan oleh unpickler
+        if fileobj is None:
+            payload = joblib.load(path, mmap_mode="r" if mmap else None)
+        else:
+            fileobj.seek(0)
+            payload = joblib.load(fileobj)
+    else:
+        if fileobj is None:
+            with open(path, "rb") as f:
+                payload_bytes = f.read(header["payload_size"])
+        else:
+            fileobj.seek(0)
+            payload_bytes = fileobj.read(header["payload_size"])
+        payload = joblib.load(io.BytesIO(payload_bytes))
+
+    return payload["model"], header
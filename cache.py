@@ -0,0 +1,216 @@
+# cache.py
+import hashlib
+import os
+import threading
+import uuid
+from collections import OrderedDict
+
+import joblib
+import pandas as pd
+import streamlit as st
+
+from compaction import compact_dtypes
+from ingest import read_csv_chunked
+
+# --- KONFIGURASI CACHE ---
+# Batas memori cache dataset (MB), bisa diubah lewat environment variable
+DATASET_CACHE_BUDGET_MB = int(os.environ.get("TENSICARE_DATASET_CACHE_MB", "1024"))
+
+
+# --- HELPER: HASH KONTEN FILE ---
+def content_hash(data: bytes) -> str:
+    """
+    Menghitung hash isi file (blake2b, 128-bit) sebagai kunci cache.
+    Returns: string heksadesimal.
+    """
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+# --- HELPER: FINGERPRINT DATAFRAME ---
+def data_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Sidik jari isi DataFrame (nama kolom, tipe data, nilai & index).
+    Dua DataFrame dengan isi sama menghasilkan fingerprint yang sama.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+# --- CACHE LRU BERBATAS MEMORI ---
+class MemoryLRUCache:
+    """
+    Cache LRU thread-safe yang dibatasi total ukuran (bytes), bukan jumlah item.
+    Entri yang paling lama tidak dipakai dibuang saat total melebihi budget.
+    """
+
+    def __init__(self, budget_bytes: int):
+        self.budget_bytes = budget_bytes
+        self._items = OrderedDict()  # key -> (value, nbytes)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._items:
+                return None
+            self._items.move_to_end(key)  # tandai sebagai baru dipakai
+            return self._items[key][0]
+
+    def put(self, key, value, nbytes: int):
+        with self._lock:
+            self._items[key] = (value, int(nbytes))
+            self._items.move_to_end(key)
+            # Buang entri terlama, tapi jangan buang entri yang baru dimasukkan
+            while self.total_bytes() > self.budget_bytes and len(self._items) > 1:
+                self._items.popitem(last=False)
+
+    def total_bytes(self) -> int:
+        return sum(nbytes for _, nbytes in self._items.values())
+
+    def entries(self):
+        """Daftar (key, value, nbytes) dari yang terlama ke yang terbaru dipakai."""
+        with self._lock:
+            return [(key, value, nbytes) for key, (value, nbytes) in self._items.items()]
+
+
+# --- CACHE LRU DI DISK ---
+class DiskLRUCache:
+    """
+    Cache berbasis file (joblib) di disk lokal, dibatasi total ukuran folder.
+    Waktu akses dicatat lewat mtime file; file terlama dihapus saat melebihi budget.
+    """
+
+    def __init__(self, directory: str, budget_bytes: int, compress: int = 3):
+        self.directory = directory
+        self.budget_bytes = budget_bytes
+        self.compress = compress
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.joblib")
+
+    def get(self, key: str):
+        path = self._path(key)
+        try:
+            value = joblib.load(path)
+        except (FileNotFoundError, EOFError):
+            return None
+        except Exception:
+            # file rusak (mis. proses terhenti saat menulis) -> anggap tidak ada
+            self._remove(path)
+            return None
+        os.utime(path)  # tandai sebagai baru dipakai
+        return value
+
+    def contains(self, key: str) -> bool:
+        """True jika key masih ada di cache (tanpa memuat isinya)."""
+        return os.path.exists(self._path(key))
+
+    def put(self, key: str, value):
+        path = self._path(key)
+        # tulis ke file sementara lalu rename agar pembaca tidak melihat file setengah jadi
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        joblib.dump(value, tmp_path, compress=self.compress)
+        os.replace(tmp_path, path)
+        self._evict(keep=path)
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _evict(self, keep: str = None):
+        with self._lock:
+            files = []
+            for name in os.listdir(self.directory):
+                if not name.endswith(".joblib"):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _, size, _ in files)
+            for _, size, path in sorted(files):
+                if total <= self.budget_bytes:
+                    break
+                if path == keep:
+                    continue
+                self._remove(path)
+                total -= size
+
+
+@st.cache_resource
+def get_dataset_cache() -> MemoryLRUCache:
+    """Cache dataset yang dipakai bersama oleh semua sesi dalam satu proses."""
+    return MemoryLRUCache(DATASET_CACHE_BUDGET_MB * 1024 * 1024)
+
+
+# --- HELPER: PROFIL KOLOM DATASET ---
+def profile_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Membuat tabel informasi kolom (tipe data, jumlah non-null & null).
+    Returns: DataFrame dengan kolom 'Kolom', 'Tipe Data', 'Non-Null Count', 'Null Count'.
+    """
+    null_counts = df.isna().sum().values
+    return pd.DataFrame({
+        'Kolom': df.columns,
+        'Tipe Data': df.dtypes.values,
+        'Non-Null Count': len(df) - null_counts,
+        'Null Count': null_counts,
+    })
+
+
+# --- HELPER: LOAD CSV DENGAN CACHE ---
+def load_csv_cached(uploaded_file, streaming: bool = False, progress_callback=None):
+    """
+    Membaca file CSV yang diupload sekali saja per isi file.
+    Hasil parse (DataFrame + profil kolom) disimpan di cache bersama,
+    dengan kunci hash isi file sehingga upload ulang file yang sama tidak di-parse lagi.
+    Jika streaming=True, file dibaca per chunk (lihat ingest.read_csv_chunked).
+    Tipe data selalu dipadatkan (lihat compaction.compact_dtypes).
+    Returns: tuple (key, entry) dengan entry berisi 'df', 'col_info', 'nbytes', 'bytes_before'.
+    """
+    cache = get_dataset_cache()
+
+    # Selama file yang sama masih ada di uploader, pakai kunci yang sudah dihitung
+    # (tidak perlu hashing ulang isi file di setiap rerun)
+    file_id = getattr(uploaded_file, "file_id", None)
+    if file_id is not None and st.session_state.get("raw_file_id") == file_id:
+        key = st.session_state.get("raw_key")
+        entry = cache.get(key)
+        if entry is not None:
+            return key, entry
+
+    # getbuffer() tidak menyalin isi file (penting untuk file berukuran GB)
+    with uploaded_file.getbuffer() as buf:
+        key = content_hash(buf)
+        total_bytes = buf.nbytes
+    entry = cache.get(key)
+    if entry is None:
+        uploaded_file.seek(0)
+        if streaming:
+            df, col_info, bytes_before = read_csv_chunked(
+                uploaded_file, total_bytes, progress_callback=progress_callback
+            )
+            nbytes = int(df.memory_usage(deep=True).sum())
+        else:
+            df, mem_info = compact_dtypes(pd.read_csv(uploaded_file))
+            col_info = profile_columns(df)
+            bytes_before = mem_info["bytes_before"]
+            nbytes = mem_info["bytes_after"]
+        entry = {
+            "df": df,
+            "col_info": col_info,
+            "nbytes": nbytes,
+            "bytes_before": bytes_before,
+        }
+        cache.put(key, entry, nbytes)
+
+    st.session_state["raw_file_id"] = file_id
+    st.session_state["raw_key"] = key
+    return key, entry
@@ -0,0 +1,81 @@
+# column_rules.py
+import re
+from functools import lru_cache
+
+# --- DAFTAR ATURAN DEFAULT ---
+# Daftar kolom yang tidak relevan untuk prediksi hipertensi (dicocokkan dengan nama kolom utuh)
+IRRELEVANT_COLUMNS = [
+    # Identifiers
+    'id', 'patient_id', 'record_id', 'index', 'unnamed', 'unnamed: 0',
+    # Location/Geographic (tidak relevan untuk prediksi medis)
+    'country', 'region', 'city', 'state', 'zip', 'zipcode', 'address', 'location',
+    # Personal identifiers
+    'name', 'first_name', 'last_name', 'email', 'phone', 'telephone',
+    # Dates (bisa diproses terpisah jika perlu)
+    'date', 'timestamp', 'created_at', 'updated_at', 'record_date',
+    # Education & Employment (tidak relevan untuk prediksi hipertensi)
+    'education', 'education_level', 'employment', 'employment_status', 'occupation', 'income', 'job',
+]
+
+# Token yang menandai kolom identitas jika muncul sebagai kata utuh di nama kolom
+# (mis. 'patientID', 'record_index', 'Unnamed: 0' -> dihapus; 'lipid_panel', 'rapid_test' -> tidak)
+IRRELEVANT_TOKENS = ['id', 'index', 'unnamed']
+
+# Kolom yang tidak pernah dihapus walaupun cocok dengan aturan di atas
+PROTECTED_COLUMNS = ['diabetes', 'hypertension']
+
+
+# --- HELPER: NORMALISASI NAMA KOLOM ---
+def normalize_column_name(name) -> str:
+    """
+    Menyeragamkan nama kolom menjadi snake_case huruf kecil agar bisa dipecah per token.
+    Contoh: 'patientID' -> 'patient_id', 'Unnamed: 0' -> 'unnamed_0'.
+    """
+    name = re.sub(r"([a-z0-9])([A-Z])", r"\1_\2", str(name).strip())
+    return re.sub(r"[^0-9a-zA-Z]+", "_", name).strip("_").lower()
+
+
+# --- HELPER: KOMPILASI ATURAN ---
+@lru_cache(maxsize=32)
+def compile_rules(extra_exact=(), extra_tokens=(), extra_protected=()):
+    """
+    Menggabungkan aturan default dengan aturan tambahan dari pengguna.
+    Returns: tuple (set nama utuh, regex token kata utuh atau None, set kolom yang dilindungi).
+    """
+    exact = frozenset(normalize_column_name(n) for n in [*IRRELEVANT_COLUMNS, *extra_exact] if n)
+    tokens = sorted({normalize_column_name(t) for t in [*IRRELEVANT_TOKENS, *extra_tokens] if t})
+    token_re = None
+    if tokens:
+        # token harus diapit awal/akhir nama atau garis bawah (batas kata snake_case)
+        token_re = re.compile(r"(?:^|_)(" + "|".join(map(re.escape, tokens)) + r")(?:_|$)")
+    protected = frozenset(normalize_column_name(n) for n in [*PROTECTED_COLUMNS, *extra_protected] if n)
+    return exact, token_re, protected
+
+
+@lru_cache(maxsize=128)
+def _classify_cached(columns, extra_exact, extra_tokens, extra_protected):
+    exact, token_re, protected = compile_rules(extra_exact, extra_tokens, extra_protected)
+    dropped = []
+    for col in columns:
+        norm = normalize_column_name(col)
+        if norm in protected:
+            continue
+        if norm in exact:
+            dropped.append((col, f"nama kolom '{norm}' ada di daftar kolom tidak relevan"))
+            continue
+        match = token_re.search(norm) if token_re is not None else None
+        if match:
+            dropped.append((col, f"mengandung token '{match.group(1)}' (kolom identitas)"))
+    return tuple(dropped)
+
+
+# --- HELPER: KLASIFIKASI KOLOM ---
+def classify_columns(columns, extra_exact=(), extra_tokens=(), extra_protected=()) -> dict:
+    """
+    Menentukan kolom yang tidak relevan beserta alasannya. Hasil di-cache
+    berdasarkan tuple nama kolom + aturan, sehingga klik berikutnya tidak memindai ulang.
+    Returns: dict {nama kolom: alasan dihapus}, urut sesuai urutan kolom.
+    """
+    return dict(_classify_cached(
+        tuple(columns), tuple(extra_exact), tuple(extra_tokens), tuple(extra_protected)
+    ))
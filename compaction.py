@@ -0,0 +1,52 @@
+# compaction.py
+import numpy as np
+import pandas as pd
+
+# Kolom teks diubah ke category hanya jika rasio nilai unik / jumlah baris di bawah batas ini
+# (kolom hampir unik seperti nama justru lebih boros jika dijadikan category)
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+
+# --- HELPER: PADATKAN SATU KOLOM ---
+def compact_series(s: pd.Series) -> pd.Series:
+    """
+    Memilih tipe data terkecil untuk satu kolom:
+    - integer -> int8/int16/int32 (tetap signed)
+    - float tanpa missing & bernilai bulat -> integer terkecil
+    - float lainnya -> float32 (Random Forest sklearn memang bekerja di float32)
+    - teks dengan sedikit nilai unik -> category
+    Returns: Series dengan tipe yang sudah dipadatkan.
+    """
+    if pd.api.types.is_bool_dtype(s):
+        return s
+    if pd.api.types.is_integer_dtype(s):
+        return pd.to_numeric(s, downcast="integer")
+    if pd.api.types.is_float_dtype(s):
+        values = s.to_numpy()
+        if len(values) and not np.isnan(values).any() and np.array_equal(values, np.floor(values)):
+            return pd.to_numeric(s, downcast="integer")
+        return pd.to_numeric(s, downcast="float")
+    if s.dtype == "object" and len(s):
+        if s.nunique(dropna=True) / len(s) <= CATEGORY_MAX_UNIQUE_RATIO:
+            return s.astype("category")
+    return s
+
+
+# --- HELPER: PADATKAN DATAFRAME ---
+def compact_dtypes(df: pd.DataFrame):
+    """
+    Menerapkan compact_series ke semua kolom DataFrame.
+    Returns: tuple (DataFrame baru, dict info memori sebelum/sesudah dalam bytes).
+    """
+    bytes_before = int(df.memory_usage(deep=True).sum())
+    compacted = pd.DataFrame(
+        {col: compact_series(df[col]) for col in df.columns},
+        index=df.index,
+    )
+    bytes_after = int(compacted.memory_usage(deep=True).sum())
+    info = {
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+        "bytes_saved": bytes_before - bytes_after,
+    }
+    return compacted, info
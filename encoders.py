@@ -0,0 +1,63 @@
+# encoders.py
+import pandas as pd
+
+# Kode untuk kategori yang tidak dikenal (tidak ada saat training) atau kosong
+UNKNOWN_CODE = -1
+
+
+# --- HELPER: CEK KOLOM KATEGORIKAL ---
+def is_categorical_column(s: pd.Series) -> bool:
+    """True jika kolom bertipe teks (object) atau category."""
+    return s.dtype == "object" or isinstance(s.dtype, pd.CategoricalDtype)
+
+
+# --- HELPER: FIT ENCODER ---
+def fit_encoders(df: pd.DataFrame, columns) -> dict:
+    """
+    Membuat registry encoder: untuk setiap kolom, daftar kategori terurut.
+    Kode sebuah kategori = posisinya di daftar ini (sama seperti astype('category').cat.codes).
+    Returns: dict {nama kolom: list kategori}.
+    """
+    encoders = {}
+    for col in columns:
+        values = df[col].dropna().unique()
+        encoders[col] = sorted(values.tolist(), key=str)
+    return encoders
+
+
+# --- HELPER: TERAPKAN ENCODER KE SATU KOLOM ---
+def encode_column(s: pd.Series, categories) -> tuple:
+    """
+    Mengubah nilai kategori menjadi kode numerik secara vektor (tanpa loop per baris).
+    Kategori yang tidak dikenal atau kosong diberi kode UNKNOWN_CODE.
+    Returns: tuple (array kode, jumlah nilai tidak dikenal/kosong).
+    """
+    if categories and isinstance(categories[0], str) and not is_categorical_column(s):
+        # batch bisa terbaca numerik walau saat training berupa teks (mis. '1', '2')
+        s = s.astype(str).where(s.notna())
+    codes = pd.Categorical(s, categories=categories).codes
+    n_unknown = int((codes == UNKNOWN_CODE).sum())
+    return codes, n_unknown
+
+
+# --- HELPER: TERAPKAN REGISTRY ENCODER ---
+def apply_encoders(df: pd.DataFrame, encoders: dict) -> tuple:
+    """
+    Menerapkan registry encoder ke kolom-kolom yang ada di df (df diubah langsung).
+    Returns: tuple (df, dict {kolom: jumlah nilai tidak dikenal/kosong}).
+    """
+    unknown_counts = {}
+    for col, categories in encoders.items():
+        if col not in df.columns:
+            continue
+        codes, n_unknown = encode_column(df[col], categories)
+        df[col] = codes
+        if n_unknown:
+            unknown_counts[col] = n_unknown
+    return df, unknown_counts
+
+
+# --- HELPER: MAPPING UNTUK DITAMPILKAN ---
+def encoder_mapping(categories) -> dict:
+    """Returns: dict {kategori: kode} untuk ditampilkan di UI."""
+    return {cat: code for code, cat in enumerate(categories)}
@@ -0,0 +1,317 @@
+# forest_engine.py
+import time
+import warnings
+
+import numpy as np
+
+# --- FORMAT HUTAN TERKEMAS (PACKED FOREST) ---
+# Semua pohon digabung menjadi satu set array node:
+#   feature[n]     fitur yang diuji node (0 untuk daun)
+#   threshold[n]   ambang float32, dibulatkan ke bawah dari ambang float64 sklearn (+inf untuk daun)
+#   left[n]        indeks global anak kiri; anak kanan selalu left + 1; daun menunjuk dirinya sendiri
+#   nan_left[n]    True jika nilai kosong (NaN) diarahkan ke anak kiri (True untuk daun)
+#   value[n, k]    probabilitas kelas di node (sudah dinormalisasi seperti predict_proba pohon)
+#   roots[t]       indeks node akar setiap pohon
+# Satu langkah penelusuran: node = left[node] + (x > threshold[node]). Di daun x > +inf selalu
+# False sehingga node tetap di tempat, jadi semua pohon bisa ditelusuri bersamaan sebanyak
+# max_depth langkah tanpa percabangan per pohon.
+# Node disusun per level untuk semua pohon sekaligus (akar semua pohon, lalu level 1, dst.),
+# sehingga node yang dibaca pada langkah yang sama letaknya berdekatan di memori.
+# sklearn membandingkan X float32 dengan ambang float64; untuk x float32,
+# x <= t64 setara dengan x <= (float32 terbesar yang <= t64), jadi ambang float32 ini
+# memberi hasil yang identik.
+
+PARITY_TOLERANCE = 1e-9   # selisih probabilitas maksimum yang dianggap sama dengan sklearn
+BLOCK_ROWS = 1024         # baris per blok pada evaluasi batch (blok x pohon tetap muat di cache)
+EXIT_CHECK_EVERY = 8      # setiap beberapa langkah dicek apakah semua pohon sudah di daun
+COMPACT_FROM_DEPTH = 16   # mulai kedalaman ini, pasangan (pohon, baris) yang sudah di daun dibuang
+COMPACT_EVERY = 4
+
+
+def _round_down_float32(values: np.ndarray) -> np.ndarray:
+    """Float32 terbesar yang <= setiap nilai float64."""
+    down = values.astype(np.float32)
+    too_big = down.astype(np.float64) > values
+    down[too_big] = np.nextafter(down[too_big], np.float32(-np.inf))
+    return down
+
+
+def _level_order(left: np.ndarray, right: np.ndarray, roots: np.ndarray) -> np.ndarray:
+    """Urutan node per level kedalaman untuk semua pohon (anak kiri & kanan bersebelahan)."""
+    levels = []
+    frontier = roots
+    while len(frontier):
+        levels.append(frontier)
+        internal = frontier[left[frontier] != frontier]
+        frontier = np.column_stack([left[internal], right[internal]]).reshape(-1)
+    return np.concatenate(levels)
+
+
+class PackedForest:
+    """
+    Hutan keputusan dalam bentuk array NumPy terkemas, dievaluasi tanpa sklearn.
+    Antarmuka mengikuti classifier sklearn (classes_, predict_proba, predict) sehingga
+    bisa dipakai oleh scoring.predict_with_proba.
+    """
+
+    def __init__(self, feature, threshold, left, nan_left, value, roots, max_depth,
+                 classes, n_features):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.nan_left = nan_left
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.classes_ = classes
+        self.n_features_in_ = n_features
+
+    @classmethod
+    def from_model(cls, model):
+        """
+        Mengemas RandomForestClassifier (atau ensemble pohon klasifikasi sejenis).
+        Returns: PackedForest, atau None jika model tidak didukung.
+        """
+        estimators = getattr(model, "estimators_", None)
+        if not estimators or not hasattr(model, "classes_"):
+            return None
+        trees = [getattr(est, "tree_", None) for est in estimators]
+        if any(tree is None or tree.n_outputs != 1 for tree in trees):
+            return None
+
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+        n_nodes = int(offsets[-1])
+        n_classes = len(model.classes_)
+
+        feature = np.zeros(n_nodes, dtype=np.int32)
+        threshold = np.empty(n_nodes, dtype=np.float32)
+        left = np.empty(n_nodes, dtype=np.int32)
+        right = np.empty(n_nodes, dtype=np.int32)
+        nan_left = np.ones(n_nodes, dtype=bool)
+        value = np.empty((n_nodes, n_classes), dtype=np.float64)
+
+        for tree, start, stop in zip(trees, offsets[:-1], offsets[1:]):
+            nodes = np.arange(start, stop, dtype=np.int32)
+            is_leaf = tree.children_left == -1
+            feature[start:stop] = np.where(is_leaf, 0, tree.feature)
+            threshold[start:stop] = np.where(is_leaf, np.inf, _round_down_float32(tree.threshold))
+            left[start:stop] = np.where(is_leaf, nodes, tree.children_left + start)
+            right[start:stop] = np.where(is_leaf, nodes, tree.children_right + start)
+            missing_left = getattr(tree, "missing_go_to_left", None)
+            if missing_left is not None:
+                nan_left[start:stop] = is_leaf | np.asarray(missing_left, dtype=bool)
+
+            # sama seperti DecisionTreeClassifier.predict_proba: dibagi total per baris
+            proba = tree.value[:, 0, :n_classes].astype(np.float64)
+            normalizer = proba.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            value[start:stop] = proba / normalizer
+
+        order = _level_order(left, right, offsets[:-1].astype(np.int32))
+        new_index = np.empty(n_nodes, dtype=np.int32)
+        new_index[order] = np.arange(n_nodes, dtype=np.int32)
+
+        return cls(
+            feature=feature[order],
+            threshold=threshold[order],
+            left=new_index[left[order]],
+            nan_left=nan_left[order],
+            value=value[order],
+            roots=new_index[offsets[:-1]],
+            max_depth=max(int(tree.max_depth) for tree in trees),
+            classes=np.asarray(model.classes_),
+            n_features=int(getattr(model, "n_features_in_", feature.max() + 1)),
+        )
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.feature, self.threshold, self.left,
+                                      self.nan_left, self.value, self.roots))
+
+    def is_leaf(self) -> np.ndarray:
+        """Returns: array bool, True untuk node daun."""
+        return self.left == np.arange(len(self.left), dtype=self.left.dtype)
+
+    # --- EVALUASI SATU BARIS ---
+    def predict_proba_one(self, row) -> np.ndarray:
+        """
+        Probabilitas kelas untuk satu vektor fitur mentah: semua pohon ditelusuri
+        bersamaan, satu langkah kedalaman per iterasi.
+        Returns: array (n_kelas,).
+        """
+        row = np.asarray(row, dtype=np.float32).reshape(-1)
+        has_nan = bool(np.isnan(row).any())
+        node = self.roots
+        for depth in range(self.max_depth):
+            x = row.take(self.feature.take(node))
+            go_right = x > self.threshold.take(node)
+            if has_nan:
+                go_right |= np.isnan(x) & ~self.nan_left.take(node)
+            next_node = self.left.take(node) + go_right
+            # berhenti lebih awal jika semua pohon sudah di daun
+            if depth % EXIT_CHECK_EVERY == EXIT_CHECK_EVERY - 1 and np.array_equal(next_node, node):
+                break
+            node = next_node
+        # sum(axis=0) menjumlah berurutan per pohon, sama seperti akumulasi sklearn
+        return self.value.take(node, axis=0).sum(axis=0) / self.n_trees
+
+    # --- EVALUASI BATCH ---
+    def _leaves_block(self, X: np.ndarray, feature_offset: np.ndarray) -> np.ndarray:
+        """
+        Node daun untuk setiap pasangan (pohon, baris) pada satu blok baris. Blok disimpan
+        per kolom (fitur-mayor) sehingga nilai x = X_T[feature * n_baris + baris] dibaca
+        dengan satu gather; feature_offset = feature * n_baris sudah dihitung sebelumnya.
+        Pada hutan yang dalam, setelah COMPACT_FROM_DEPTH langkah pasangan yang sudah di daun
+        disisihkan agar langkah berikutnya hanya memproses yang masih aktif.
+        Returns: array (n_pohon, n_baris) indeks node daun.
+        """
+        n_rows = len(X)
+        flat_x = np.ascontiguousarray(X.T).reshape(-1)
+        has_nan = bool(np.isnan(flat_x).any())
+        rows = np.tile(np.arange(n_rows, dtype=np.int32), self.n_trees)
+        node = np.repeat(self.roots, n_rows)
+        leaves, position = None, None
+
+        for depth in range(self.max_depth):
+            x = flat_x.take(rows + feature_offset.take(node))
+            go_right = x > self.threshold.take(node)
+            if has_nan:
+                go_right |= np.isnan(x) & ~self.nan_left.take(node)
+            next_node = self.left.take(node) + go_right
+
+            if depth >= COMPACT_FROM_DEPTH and depth % COMPACT_EVERY == COMPACT_EVERY - 1:
+                active = next_node != node
+                if leaves is None:
+                    leaves, position = next_node.copy(), np.flatnonzero(active)
+                else:
+                    leaves[position] = next_node
+                    position = position[active]
+                rows, next_node = rows[active], next_node[active]
+            elif depth % EXIT_CHECK_EVERY == EXIT_CHECK_EVERY - 1 and np.array_equal(next_node, node):
+                node = next_node
+                break
+            node = next_node
+            if not len(node):
+                break
+
+        if leaves is None:
+            leaves = node
+        else:
+            leaves[position] = node
+        return leaves.reshape(self.n_trees, n_rows)
+
+    def predict_proba(self, X, block_rows: int = BLOCK_ROWS) -> np.ndarray:
+        """
+        Probabilitas kelas untuk banyak baris, diproses per blok block_rows baris.
+        Returns: array (n_baris, n_kelas).
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if len(X) == 1:
+            return self.predict_proba_one(X[0]).reshape(1, -1)
+
+        proba = np.empty((len(X), len(self.classes_)), dtype=np.float64)
+        feature_offset = self.feature * np.int32(min(block_rows, len(X)))
+        for start in range(0, len(X), block_rows):
+            block = X[start:start + block_rows]
+            if len(block) != min(block_rows, len(X)):
+                feature_offset = self.feature * np.int32(len(block))   # blok terakhir lebih pendek
+            leaves = self._leaves_block(block, feature_offset)
+            # jumlah berurutan per pohon (sumbu 0), sama seperti akumulasi sklearn
+            proba[start:start + len(block)] = self.value.take(leaves, axis=0).sum(axis=0)
+        proba /= self.n_trees
+        return proba
+
+    def predict(self, X) -> np.ndarray:
+        """Returns: array label kelas (argmax probabilitas, seperti sklearn)."""
+        return self.classes_.take(self.predict_proba(X).argmax(axis=1))
+
+
+# --- HELPER: DATA UJI KESAMAAN ---
+def synthetic_rows(forest: PackedForest, n_rows: int = 500, seed: int = 0) -> np.ndarray:
+    """
+    Baris acak di sekitar ambang-ambang split setiap fitur, dipakai untuk cek kesamaan
+    jika data training tidak tersedia (mis. model hasil upload).
+    Returns: array float32 (n_rows, n_fitur).
+    """
+    rng = np.random.default_rng(seed)
+    X = np.zeros((n_rows, forest.n_features_in_), dtype=np.float32)
+    is_split = ~forest.is_leaf()
+    for f in range(forest.n_features_in_):
+        thresholds = forest.threshold[is_split & (forest.feature == f)]
+        if len(thresholds):
+            # ambang itu sendiri + nilai di antaranya, agar kasus x == ambang ikut teruji
+            picks = rng.choice(thresholds, n_rows)
+            X[:, f] = np.where(rng.random(n_rows) < 0.2, picks, picks + rng.normal(0, 1, n_rows))
+    return X
+
+
+# --- HELPER: BENCHMARK ---
+def benchmark(model, forest: PackedForest, X) -> dict:
+    """
+    Membandingkan kecepatan predict_proba sklearn dengan PackedForest pada data X.
+    Returns: dict jumlah baris, detik & baris/detik untuk kedua mesin, dan rasio percepatan.
+    """
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        start = time.perf_counter()
+        expected = model.predict_proba(X)
+        sklearn_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = forest.predict_proba(X)
+    packed_s = time.perf_counter() - start
+
+    return {
+        "n_rows": len(X),
+        "sklearn_seconds": sklearn_s,
+        "packed_seconds": packed_s,
+        "sklearn_rows_per_s": len(X) / sklearn_s if sklearn_s else float("inf"),
+        "packed_rows_per_s": len(X) / packed_s if packed_s else float("inf"),
+        "speedup": sklearn_s / packed_s if packed_s else float("inf"),
+        "max_abs_diff": float(np.abs(expected - actual).max()) if len(X) else 0.0,
+    }
+
+
+# --- HELPER: CEK KESAMAAN DENGAN SKLEARN ---
+def check_parity(model, forest: PackedForest, X, tolerance: float = PARITY_TOLERANCE) -> dict:
+    """
+    Membandingkan hasil PackedForest dengan model.predict_proba / predict pada data X.
+    Returns: dict 'ok', 'n_rows', 'max_abs_diff', 'label_mismatches', serta waktu
+    rata-rata per baris (ms) untuk sklearn dan mesin terkemas pada prediksi satu baris.
+    """
+    X = np.asarray(X, dtype=np.float32)
+    sample = X[: min(len(X), 20)]
+    with warnings.catch_warnings():
+        # model dilatih dengan DataFrame; di sini sengaja diberi array mentah
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        expected = model.predict_proba(X)
+        expected_labels = model.predict(X)
+
+        start = time.perf_counter()
+        for row in sample:
+            model.predict_proba(row.reshape(1, -1))
+        sklearn_ms = (time.perf_counter() - start) * 1000 / max(len(sample), 1)
+
+    actual = forest.predict_proba(X)
+    max_abs_diff = float(np.abs(expected - actual).max()) if len(X) else 0.0
+    label_mismatches = int((expected_labels != forest.predict(X)).sum())
+    start = time.perf_counter()
+    for row in sample:
+        forest.predict_proba_one(row)
+    packed_ms = (time.perf_counter() - start) * 1000 / max(len(sample), 1)
+
+    return {
+        "ok": max_abs_diff <= tolerance and label_mismatches == 0,
+        "n_rows": len(X),
+        "max_abs_diff": max_abs_diff,
+        "label_mismatches": label_mismatches,
+        "sklearn_ms_per_row": sklearn_ms,
+        "packed_ms_per_row": packed_ms,
+    }
@@ -0,0 +1,358 @@
+# form_schema.py
+import re
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Kolom dengan nilai unik sebanyak ini atau kurang ditampilkan sebagai pilihan (selectbox)
+MAX_SELECT_VALUES = 5
+# Baris awal yang dicek dulu: jika nilai uniknya sudah lebih dari MAX_SUMMARY_LEVELS,
+# level tidak disimpan dan nilai unik seluruh kolom tidak perlu dihitung
+UNIQUE_PROBE_ROWS = 10_000
+# Kolom dengan nilai unik sebanyak ini atau kurang disimpan levelnya di ringkasan fitur
+MAX_SUMMARY_LEVELS = 50
+# Titik kuantil yang disimpan di ringkasan fitur (sketsa distribusi)
+QUANTILE_PROBS = [0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99]
+
+# ===========================================
+# FIELD MAPPING UNTUK USER-FRIENDLY FORM
+# ===========================================
+
+# Mapping nama kolom ke label yang lebih mudah dipahami
+FIELD_LABELS = {
+    # Gender/Sex fields
+    "male": "Jenis Kelamin",
+    "female": "Jenis Kelamin", 
+    "gender": "Jenis Kelamin",
+    "sex": "Jenis Kelamin",
+    "is_male": "Jenis Kelamin",
+    
+    # Age fields
+    "age": "Usia (Tahun)",
+    "umur": "Usia (Tahun)",
+    
+    # Country/Location
+    "country": "Negara",
+    "region": "Wilayah",
+    
+    # Smoking fields
+    "smoking": "Status Merokok",
+    "smoking_status": "Status Merokok",
+    "currentSmoker": "Perokok Aktif",
+    "current_smoker": "Perokok Aktif",
+    "is_smoking": "Status Merokok",
+    "cigsPerDay": "Jumlah Rokok per Hari",
+    "cigs_per_day": "Jumlah Rokok per Hari",
+    
+    # Blood pressure fields
+    "sysBP": "Tekanan Darah Sistolik (mmHg)",
+    "sys_bp": "Tekanan Darah Sistolik (mmHg)",
+    "systolic": "Tekanan Darah Sistolik (mmHg)",
+    "systolic_bp": "Tekanan Darah Sistolik (mmHg)",
+    "blood_pressure_systolic": "Tekanan Darah Sistolik (mmHg)",
+    "diaBP": "Tekanan Darah Diastolik (mmHg)",
+    "dia_bp": "Tekanan Darah Diastolik (mmHg)",
+    "diastolic": "Tekanan Darah Diastolik (mmHg)",
+    "diastolic_bp": "Tekanan Darah Diastolik (mmHg)",
+    "blood_pressure_diastolic": "Tekanan Darah Diastolik (mmHg)",
+    
+    # Medical history fields
+    "diabetes": "Riwayat Diabetes",
+    "has_diabetes": "Riwayat Diabetes",
+    "hypertension": "Riwayat Hipertensi",
+    "has_hypertension": "Riwayat Hipertensi",
+    "BPMeds": "Mengonsumsi Obat Tekanan Darah",
+    "bp_meds": "Mengonsumsi Obat Tekanan Darah",
+    "prevalentStroke": "Riwayat Stroke",
+    "prevalent_stroke": "Riwayat Stroke",
+    "stroke": "Riwayat Stroke",
+    "prevalentHyp": "Riwayat Hipertensi",
+    "prevalent_hyp": "Riwayat Hipertensi",
+    "previous_heart_disease": "Riwayat Penyakit Jantung",
+    "heart_disease": "Riwayat Penyakit Jantung",
+    "family_history": "Riwayat Keluarga",
+    
+    # Physical measurements
+    "BMI": "Indeks Massa Tubuh (BMI)",
+    "bmi": "Indeks Massa Tubuh (BMI)",
+    "obesity": "Status Obesitas",
+    "is_obese": "Status Obesitas",
+    "weight": "Berat Badan (kg)",
+    "height": "Tinggi Badan (cm)",
+    "waist_circumference": "Lingkar Pinggang (cm)",
+    
+    # Lab values
+    "totChol": "Kolesterol Total (mg/dL)",
+    "tot_chol": "Kolesterol Total (mg/dL)",
+    "cholesterol": "Kolesterol Total (mg/dL)",
+    "cholesterol_level": "Tingkat Kolesterol",
+    "cholesterol_hdl": "Kolesterol HDL (mg/dL)",
+    "cholesterol_ldl": "Kolesterol LDL (mg/dL)",
+    "hdl": "Kolesterol HDL (mg/dL)",
+    "ldl": "Kolesterol LDL (mg/dL)",
+    "triglycerides": "Trigliserida (mg/dL)",
+    "glucose": "Kadar Glukosa (mg/dL)",
+    "fasting_blood_sugar": "Gula Darah Puasa (mg/dL)",
+    
+    # Heart rate
+    "heartRate": "Detak Jantung (bpm)",
+    "heart_rate": "Detak Jantung (bpm)",
+    
+    # Activity & Lifestyle
+    "physical_activity": "Tingkat Aktivitas Fisik",
+    "physical_activity_level": "Tingkat Aktivitas Fisik",
+    "activity": "Tingkat Aktivitas Fisik",
+    "exercise": "Frekuensi Olahraga",
+    "alcohol_intake": "Konsumsi Alkohol",
+    "alcohol": "Konsumsi Alkohol",
+    "salt_intake": "Konsumsi Garam",
+    "sleep_duration": "Durasi Tidur (jam)",
+    "sleep": "Durasi Tidur (jam)",
+    "stress_level": "Tingkat Stres",
+    "stress": "Tingkat Stres",
+    
+    # Education & Employment
+    "education": "Tingkat Pendidikan",
+    "education_level": "Tingkat Pendidikan",
+    "employment_status": "Status Pekerjaan",
+    "employment": "Status Pekerjaan",
+    "occupation": "Pekerjaan",
+    "income": "Pendapatan",
+}
+
+# Mapping untuk field binary (0/1) ke opsi yang lebih ramah
+BINARY_OPTIONS = {
+    # Gender fields - 1 biasanya = male, 0 = female
+    "male": {0: "Perempuan", 1: "Laki-laki"},
+    "is_male": {0: "Perempuan", 1: "Laki-laki"},
+    "sex": {0: "Perempuan", 1: "Laki-laki"},
+    "gender": {0: "Perempuan", 1: "Laki-laki"},
+    "jenis_kelamin": {0: "Perempuan", 1: "Laki-laki"},
+    "kelamin": {0: "Perempuan", 1: "Laki-laki"},
+    "female": {0: "Laki-laki", 1: "Perempuan"},
+    "is_female": {0: "Laki-laki", 1: "Perempuan"},
+    
+    # Yes/No fields
+    "smoking": {0: "Tidak Merokok", 1: "Merokok"},
+    "currentSmoker": {0: "Tidak", 1: "Ya"},
+    "current_smoker": {0: "Tidak", 1: "Ya"},
+    "is_smoking": {0: "Tidak Merokok", 1: "Merokok"},
+    "diabetes": {0: "Tidak", 1: "Ya"},
+    "has_diabetes": {0: "Tidak", 1: "Ya"},
+    "hypertension": {0: "Tidak", 1: "Ya"},
+    "has_hypertension": {0: "Tidak", 1: "Ya"},
+    "BPMeds": {0: "Tidak", 1: "Ya"},
+    "bp_meds": {0: "Tidak", 1: "Ya"},
+    "prevalentStroke": {0: "Tidak", 1: "Ya"},
+    "prevalent_stroke": {0: "Tidak", 1: "Ya"},
+    "stroke": {0: "Tidak", 1: "Ya"},
+    "prevalentHyp": {0: "Tidak", 1: "Ya"},
+    "prevalent_hyp": {0: "Tidak", 1: "Ya"},
+    "previous_heart_disease": {0: "Tidak", 1: "Ya"},
+    "heart_disease": {0: "Tidak", 1: "Ya"},
+    "obesity": {0: "Tidak Obesitas", 1: "Obesitas"},
+    "is_obese": {0: "Tidak", 1: "Ya"},
+}
+
+# Mapping untuk field kategorikal dengan nilai tertentu
+CATEGORICAL_OPTIONS = {
+    "smoking_status": {
+        0: "Tidak Pernah Merokok",
+        1: "Mantan Perokok",
+        2: "Perokok Aktif"
+    },
+    "physical_activity": {
+        0: "Rendah",
+        1: "Sedang",
+        2: "Tinggi"
+    },
+    "physical_activity_level": {
+        0: "Rendah",
+        1: "Sedang",
+        2: "Tinggi"
+    },
+    "activity_level": {
+        0: "Rendah",
+        1: "Sedang",
+        2: "Tinggi"
+    },
+    "aktivitas_fisik": {
+        0: "Rendah",
+        1: "Sedang",
+        2: "Tinggi"
+    },
+    "cholesterol_level": {
+        0: "Normal",
+        1: "Tinggi"
+    },
+    "education": {
+        1: "SD/Sederajat",
+        2: "SMP/Sederajat",
+        3: "SMA/Sederajat",
+        4: "Diploma/Sarjana"
+    }
+}
+
+
+# --- HELPER: TABEL LOOKUP HURUF KECIL ---
+def _lowercase_table(mapping: dict) -> dict:
+    # kunci pertama yang cocok (tanpa membedakan huruf besar/kecil) yang dipakai
+    table = {}
+    for key, value in mapping.items():
+        table.setdefault(key.lower(), value)
+    return table
+
+
+# Dibangun sekali saat modul dimuat, bukan di setiap pemanggilan
+FIELD_LABELS_LOWER = _lowercase_table(FIELD_LABELS)
+BINARY_OPTIONS_LOWER = _lowercase_table(BINARY_OPTIONS)
+CATEGORICAL_OPTIONS_LOWER = _lowercase_table(CATEGORICAL_OPTIONS)
+DEFAULT_BINARY_OPTIONS = {0: "Tidak", 1: "Ya"}
+
+
+def get_friendly_label(feature_name):
+    """Mendapatkan label yang ramah pengguna untuk nama kolom."""
+    label = FIELD_LABELS_LOWER.get(feature_name.lower())
+    if label is not None:
+        return label
+    
+    # Fallback: format nama kolom agar lebih readable
+    # Ubah snake_case atau camelCase ke Title Case
+    formatted = feature_name.replace("_", " ").replace("-", " ")
+    # Handle camelCase
+    formatted = re.sub('([a-z])([A-Z])', r'\1 \2', formatted)
+    return formatted.title()
+
+
+def get_friendly_options(feature_name, unique_values):
+    """Mendapatkan opsi yang ramah pengguna untuk field."""
+    feature_lower = feature_name.lower()
+    
+    # Cek apakah binary field (0 dan 1)
+    if set(unique_values) == {0, 1}:
+        return BINARY_OPTIONS_LOWER.get(feature_lower, DEFAULT_BINARY_OPTIONS)
+    
+    # Cek di mapping kategorikal; None berarti memakai nilai asli
+    return CATEGORICAL_OPTIONS_LOWER.get(feature_lower)
+
+
+# --- HELPER: RINGKASAN FITUR (DISIMPAN DI ARTEFAK MODEL) ---
+def summarize_column(col: pd.Series) -> dict:
+    """
+    Ringkasan ringkas satu kolom: dtype, jumlah kosong, level (jika nilai uniknya sedikit)
+    dan untuk kolom numerik min/max/mean + sketsa kuantil di QUANTILE_PROBS.
+    Returns: dict yang bisa disimpan sebagai JSON.
+    """
+    values = col.dropna()
+    entry = {"dtype": str(col.dtype), "nulls": int(len(col) - len(values))}
+
+    levels = pd.unique(values.iloc[:UNIQUE_PROBE_ROWS])
+    if len(levels) <= MAX_SUMMARY_LEVELS:
+        levels = pd.unique(values)
+    if len(levels) <= MAX_SUMMARY_LEVELS:
+        entry["levels"] = sorted(levels.tolist())
+
+    if pd.api.types.is_numeric_dtype(col) and len(values):
+        numeric = values.to_numpy(dtype=np.float64)
+        entry.update({
+            "min": float(numeric.min()),
+            "max": float(numeric.max()),
+            "mean": float(numeric.mean()),
+            "quantiles": [float(q) for q in np.quantile(numeric, QUANTILE_PROBS)],
+        })
+    return entry
+
+
+def summarize_features(df: pd.DataFrame, features) -> dict:
+    """
+    Ringkasan semua fitur model dari data training, disimpan di header artefak sehingga
+    form prediksi dan validasi batch tidak membutuhkan data training lagi.
+    Returns: dict 'n_rows', 'quantile_probs', 'features' (per kolom, lihat summarize_column).
+    """
+    return {
+        "n_rows": int(len(df)),
+        "quantile_probs": QUANTILE_PROBS,
+        "features": {f: summarize_column(df[f]) for f in features if f in df.columns},
+    }
+
+
+def summary_median(entry: dict):
+    """Median dari sketsa kuantil (None jika kolom tidak numerik)."""
+    if "quantiles" not in entry:
+        return None
+    return entry["quantiles"][QUANTILE_PROBS.index(0.5)]
+
+
+def get_feature_summary(features):
+    """
+    Ringkasan fitur model aktif. Model dari file memakai ringkasan di header artefaknya
+    (disimpan ke session state saat dimuat); model hasil training dirangkum dari clean_df,
+    sekali per model. Returns: dict ringkasan, atau None jika tidak ada sumber data.
+    """
+    model_key = st.session_state.get("model_key")
+    cached = st.session_state.get("feature_summary")
+    if cached is not None and cached["key"] == model_key:
+        return cached["summary"]
+
+    df_clean = st.session_state.get("clean_df")
+    summary = None
+    if df_clean is not None and all(f in df_clean.columns for f in features):
+        summary = summarize_features(df_clean, features)
+    st.session_state["feature_summary"] = {"key": model_key, "summary": summary}
+    return summary
+
+
+# --- HELPER: SKEMA FORM INPUT MANUAL ---
+def build_field(feature, entry: dict = None) -> dict:
+    """
+    Skema satu input form dari ringkasan fiturnya: jenis widget, opsi (nilai asli, teks
+    tampilan dan konversi balik teks -> nilai), rentang dan default.
+    Tanpa ringkasan, field menjadi number_input bebas dengan default 0.
+    Returns: dict field.
+    """
+    field = {"feature": feature, "label": get_friendly_label(feature)}
+    levels = (entry or {}).get("levels")
+    if levels is not None and len(levels) <= MAX_SELECT_VALUES:
+        # kolom dengan sedikit nilai unik (kemungkinan kategorikal)
+        friendly_options = get_friendly_options(feature, levels)
+        display, reverse = None, None
+        if friendly_options:
+            display = [friendly_options.get(v, str(v)) for v in levels]
+            reverse = dict(zip(display, levels))
+        field.update({"widget": "select", "options": levels, "display": display, "reverse": reverse})
+        return field
+
+    if entry is not None and "min" in entry:
+        field.update({
+            "widget": "number",
+            "min": entry["min"],
+            "max": entry["max"],
+            "default": entry["mean"],
+            "median": summary_median(entry),
+        })
+        return field
+
+    field.update({"widget": "number", "min": None, "max": None, "default": 0.0})
+    return field
+
+
+def build_form_schema(summary, features) -> list:
+    """Skema form untuk semua fitur model (summary boleh None). Returns: list dict field."""
+    entries = (summary or {}).get("features", {})
+    return [build_field(feature, entries.get(feature)) for feature in features]
+
+
+def get_form_schema(features) -> list:
+    """
+    Skema form input manual dari ringkasan fitur model aktif, dibangun sekali per
+    (model, daftar fitur) lalu disimpan di session state, sehingga rerun (mis. mengetik
+    di satu input) tidak memindai ulang dataset. Returns: list dict field.
+    """
+    schema_key = (st.session_state.get("model_key"), tuple(features))
+    schema = st.session_state.get("form_schema")
+    if schema is None or schema["key"] != schema_key:
+        summary = get_feature_summary(features)
+        schema = {"key": schema_key, "fields": build_form_schema(summary, features)}
+        st.session_state["form_schema"] = schema
+    return schema["fields"]
@@ -4,45 +4,120 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
+import time
 from io import BytesIO
 from matplotlib.backends.backend_pdf import PdfPages
-import joblib
 
 from sklearn.metrics import confusion_matrix 
 from sklearn.preprocessing import StandardScaler, MinMaxScaler
 
+from artifact import load_artifact, write_artifact
+from column_rules import classify_columns
+from compaction import compact_dtypes
+from forest_engine import PackedForest, check_parity, synthetic_rows
+from encoders import apply_encoders, fit_encoders, is_categorical_column
+from profiling import profile_dataset
+
 # --- KONSTANTA TARGET ---
 # Nama kolom target (label) di dataset untuk risiko hipertensi
 TARGET_COL = "hypertension"  # Diubah dari "heart_attack"
 
 
 # --- HELPER: SAVE MODEL TO FILE ---
-def save_model_to_file(model, features):
+def save_model_to_file(model, features, encoders=None, compress=3, target=None, training=None,
+                       feature_summary=None):
     """
-    Menyimpan model dan daftar fitur ke dalam buffer BytesIO untuk download.
-    Returns: BytesIO buffer containing the pickled model data.
+    Menyimpan model ke buffer BytesIO dengan format artefak (lihat artifact.py):
+    payload model + header berisi fitur, target, encoder kategorikal, statistik training
+    dan ringkasan per fitur (lihat form_schema.summarize_features).
+    compress: level kompresi zlib (0 = tanpa kompresi, dimuat tanpa dekompresi).
+    Returns: BytesIO buffer berisi artefak model.
     """
-    model_data = {
-        'model': model,
-        'features': features
+    metadata = {
+        'features': list(features),
+        'target': target,
+        'encoders': encoders or {},
+        'training': training or {},
+        'feature_summary': feature_summary,
     }
     buf = BytesIO()
-    joblib.dump(model_data, buf)
+    write_artifact(buf, model, metadata, compress=compress)
     buf.seek(0)
     return buf
 
 
+# --- HELPER: ARTEFAK MODEL UNTUK DOWNLOAD ---
+def get_model_artifact(model, features, encoders=None, compress=3, target=None, training=None,
+                       feature_summary=None):
+    """
+    Serialisasi model hanya sekali per model terlatih (bukan di setiap rerun halaman).
+    Hasilnya disimpan di session_state bersama ukuran file & waktu serialisasi.
+    Returns: dict berisi 'data' (bytes), 'size' (bytes), 'seconds'.
+    """
+    artifact_key = (st.session_state.get("model_key"), id(model), compress)
+    artifact = st.session_state.get("model_artifact")
+    if artifact is not None and artifact["key"] == artifact_key:
+        return artifact
+
+    start = time.perf_counter()
+    data = save_model_to_file(
+        model, features, encoders, compress, target, training, feature_summary
+    ).getvalue()
+    artifact = {
+        "key": artifact_key,
+        "data": data,
+        "size": len(data),
+        "seconds": time.perf_counter() - start,
+    }
+    st.session_state["model_artifact"] = artifact
+    return artifact
+
+
+# --- HELPER: MESIN PREDIKSI CEPAT ---
+PARITY_SAMPLE_ROWS = 500
+
+def packed_forest_key(model):
+    """Kunci PackedForest untuk model aktif (tanpa mengemas model)."""
+    return (st.session_state.get("model_key"), id(model))
+
+
+def get_packed_forest(model, features):
+    """
+    Mengemas model menjadi PackedForest sekali per model, lalu memastikan hasilnya sama
+    dengan sklearn pada sampel data (clean_df jika ada, atau baris sintetis).
+    Returns: dict berisi 'forest' (None jika tidak didukung/tidak lolos cek) dan 'parity'.
+    """
+    packed_key = packed_forest_key(model)
+    packed = st.session_state.get("packed_forest")
+    if packed is not None and packed["key"] == packed_key:
+        return packed
+
+    forest = PackedForest.from_model(model)
+    parity = None
+    if forest is not None:
+        df_clean = st.session_state.get("clean_df")
+        if df_clean is not None and all(f in df_clean.columns for f in features):
+            sample = df_clean[features].head(PARITY_SAMPLE_ROWS)
+        else:
+            sample = synthetic_rows(forest, PARITY_SAMPLE_ROWS)
+        parity = check_parity(model, forest, sample)
+        if not parity["ok"]:
+            forest = None
+
+    packed = {"key": packed_key, "forest": forest, "parity": parity}
+    st.session_state["packed_forest"] = packed
+    return packed
+
+
 # --- HELPER: LOAD MODEL FROM FILE ---
 def load_model_from_file(uploaded_file):
     """
-    Memuat model dan daftar fitur dari file .pkl yang diupload.
-    Returns: tuple (model, features) atau (None, None) jika gagal.
+    Memuat model dari file .pkl yang diupload (format artefak baru maupun format lama).
+    Returns: tuple (model, header) dengan header berisi 'features', 'encoders', dst.,
+    atau (None, None) jika gagal.
     """
     try:
-        model_data = joblib.load(uploaded_file)
-        model = model_data.get('model')
-        features = model_data.get('features', [])
-        return model, features
+        return load_artifact(uploaded_file)
     except Exception as e:
         st.error(f"❌ Gagal memuat model: {str(e)}")
         return None, None
@@ -100,59 +175,59 @@ def require_model():
 
 
 # --- HELPER: PREPROCESSING DATA ---
-# Daftar kolom yang tidak relevan untuk prediksi hipertensi
-IRRELEVANT_COLUMNS = [
-    # Identifiers
-    'id', 'patient_id', 'record_id', 'index', 'unnamed', 'unnamed: 0',
-    # Location/Geographic (tidak relevan untuk prediksi medis)
-    'country', 'region', 'city', 'state', 'zip', 'zipcode', 'address', 'location',
-    # Personal identifiers
-    'name', 'first_name', 'last_name', 'email', 'phone', 'telephone',
-    # Dates (bisa diproses terpisah jika perlu)
-    'date', 'timestamp', 'created_at', 'updated_at', 'record_date',
-    # Education & Employment (tidak relevan untuk prediksi hipertensi)
-    'education', 'education_level', 'employment', 'employment_status', 'occupation', 'income', 'job',
-]
-
-def preprocess_data(df: pd.DataFrame, target_col: str = None):
+# Daftar & aturan kolom yang tidak relevan ada di column_rules.py
+def find_irrelevant_columns(columns, rules: dict = None) -> dict:
+    """
+    Menentukan kolom yang tidak relevan untuk prediksi hipertensi berdasarkan nama kolom.
+    rules (opsional) berisi daftar tambahan: {'exact': [...], 'tokens': [...], 'protected': [...]}.
+    Returns: dict {nama kolom: alasan dihapus}.
+    """
+    rules = rules or {}
+    return classify_columns(
+        columns,
+        extra_exact=rules.get("exact", ()),
+        extra_tokens=rules.get("tokens", ()),
+        extra_protected=rules.get("protected", ()),
+    )
+
+
+def preprocess_data(df: pd.DataFrame, target_col: str = None, profile: dict = None, column_rules: dict = None):
     """
     Preprocessing data secara fleksibel - otomatis menggunakan semua kolom numerik
     dari dataset yang diupload, dan menghapus kolom yang tidak relevan untuk prediksi.
+    Jika profile (hasil profiling.get_dataset_profile) diberikan, statistik duplikat &
+    missing tidak dihitung ulang. DataFrame asli tidak diubah (tanpa df.copy() penuh).
     """
-    df = df.copy()  # buat salinan agar tidak mengubah dataframe asli
+    # Hapus kolom yang tidak relevan untuk prediksi hipertensi
+    drop_reasons = find_irrelevant_columns(df.columns, column_rules)
+    cols_to_drop = list(drop_reasons)
+
+    # profil satu kali scan: duplikat, missing per kolom & baris yang dipertahankan
+    if profile is None or profile["drop_cols"] != cols_to_drop:
+        profile = profile_dataset(df, cols_to_drop)
 
     # simpan informasi awal sebelum dibersihkan
-    rows_before = df.shape[0]          # jumlah baris sebelum preprocessing
-    cols_before = df.shape[1]          # jumlah kolom sebelum preprocessing
-    dup_count = df.duplicated().sum()  # jumlah baris duplikat
-    missing_before = df.isna().sum()   # jumlah missing per kolom
+    rows_before = df.shape[0]                    # jumlah baris sebelum preprocessing
+    cols_before = df.shape[1]                    # jumlah kolom sebelum preprocessing
+    dup_count = profile["duplicates"]            # jumlah baris duplikat
+    missing_before = profile["missing_per_col"]  # jumlah missing per kolom
+
+    # ambil hanya baris yang lolos (bukan duplikat & tanpa missing) -> hasilnya objek baru
+    df = df.take(profile["keep_positions"])
 
-    # Hapus kolom yang tidak relevan untuk prediksi hipertensi
-    cols_to_drop = []
-    for col in df.columns:
-        col_lower = col.lower().strip()
-        # Cek apakah nama kolom ada di daftar irrelevant
-        if col_lower in IRRELEVANT_COLUMNS:
-            cols_to_drop.append(col)
-        # Cek juga jika nama kolom mengandung kata-kata tertentu
-        elif any(irr in col_lower for irr in ['unnamed', 'index', 'id']):
-            # Kecuali kolom yang mungkin relevan seperti 'patient_id' yang sudah di-check
-            if col_lower not in ['diabetes', 'hypertension']:  # pastikan bukan false positive
-                cols_to_drop.append(col)
-    
     # Drop kolom yang tidak relevan
     if cols_to_drop:
         df = df.drop(columns=cols_to_drop, errors='ignore')
 
-    # hapus baris duplikat
-    df = df.drop_duplicates()
-    # hapus baris yang mengandung missing values
-    df = df.dropna()
+    # konversi kolom bertipe object/category -> kode kategori (numerik)
+    # encoder disimpan agar batch prediction memakai kode yang sama persis
+    categorical_cols = [col for col in df.columns if is_categorical_column(df[col])]
+    encoders = fit_encoders(df, categorical_cols)
+    df, _ = apply_encoders(df, encoders)
+    st.session_state["encoders"] = encoders
 
-    # konversi kolom bertipe object -> kode kategori (numerik)
-    for col in df.columns:
-        if df[col].dtype == "object":
-            df[col] = df[col].astype("category").cat.codes
+    # padatkan tipe data hasil akhir (int8/float32) agar hemat memori per sesi
+    df, mem_info = compact_dtypes(df)
 
     # Update features di session state dengan kolom dari dataset
     if target_col and target_col in df.columns:
@@ -170,9 +245,12 @@ def preprocess_data(df: pd.DataFrame, target_col: str = None):
         "cols_after": int(df.shape[1]),                  # kolom setelah preprocessing
         "cols_dropped": cols_to_drop,                    # nama kolom yang dihapus
         "cols_dropped_count": len(cols_to_drop),         # jumlah kolom yang dihapus
+        "cols_dropped_reasons": drop_reasons,            # alasan tiap kolom dihapus
         "duplicates_removed": int(dup_count),            # jumlah duplikat yang dihapus
-        "missing_values_before": missing_before.to_dict(),  # missing value per kolom (sebelum)
-        "missing_total_after": int(df.isna().sum().sum()),  # total missing setelah preprocessing (harusnya 0)
+        "missing_values_before": missing_before,         # missing value per kolom (sebelum)
+        "missing_total_after": 0,                        # baris dengan missing sudah dibuang oleh profil
+        "memory_before": mem_info["bytes_before"],       # ukuran data sebelum dipadatkan (bytes)
+        "memory_after": mem_info["bytes_after"],         # ukuran data setelah dipadatkan (bytes)
     }
 
     return df, info
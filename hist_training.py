@@ -0,0 +1,103 @@
+# hist_training.py
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.inspection import permutation_importance
+from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+from sklearn.model_selection import train_test_split
+
+# --- KONFIGURASI BACKEND HISTOGRAM ---
+# HistGradientBoosting mem-bin fitur mentah sendiri menjadi kode uint8 (max_bins bin nilai + satu
+# bin untuk nilai kosong) sekali per fit, lalu seluruh boosting berjalan di atas histogram uint8
+# itu. Fitur diberikan apa adanya (float, NaN tetap NaN) agar binning tidak dilakukan dua kali
+# dan arah nilai kosong dipelajari per split.
+MAX_BINS = 255
+IMPORTANCE_SAMPLE_ROWS = 10_000
+IMPORTANCE_REPEATS = 3
+
+
+# --- MODEL: HIST GRADIENT BOOSTING ---
+class HistClassifier:
+    """
+    HistGradientBoostingClassifier beserta feature importance (permutation importance),
+    dengan antarmuka seperti model sklearn lain (predict, predict_proba, classes_,
+    feature_importances_) dan bisa di-pickle.
+    """
+
+    def __init__(self, model, feature_names, feature_importances):
+        self.model = model
+        self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+        self.n_features_in_ = len(feature_names)
+        self.classes_ = model.classes_
+        self.feature_importances_ = feature_importances
+
+    def _values(self, X):
+        if isinstance(X, pd.DataFrame):
+            X = X[list(self.feature_names_in_)]
+        return np.asarray(X, dtype=np.float64)
+
+    def predict_proba(self, X):
+        return self.model.predict_proba(self._values(X))
+
+    def predict(self, X):
+        return self.model.predict(self._values(X))
+
+
+def permutation_importances(model, X, y, random_state: int = 42) -> np.ndarray:
+    """
+    Feature importance dari permutation importance pada data testing (maksimal
+    IMPORTANCE_SAMPLE_ROWS baris), dinormalisasi agar jumlahnya 1 seperti milik Random Forest.
+    """
+    if len(X) > IMPORTANCE_SAMPLE_ROWS:
+        rng = np.random.default_rng(random_state)
+        idx = rng.choice(len(X), IMPORTANCE_SAMPLE_ROWS, replace=False)
+        X, y = X[idx], np.asarray(y)[idx]
+    result = permutation_importance(
+        model, X, y, n_repeats=IMPORTANCE_REPEATS, random_state=random_state, n_jobs=1
+    )
+    importances = np.clip(result.importances_mean, 0, None)
+    total = importances.sum()
+    return importances / total if total > 0 else np.full(len(importances), 1 / len(importances))
+
+
+# --- HELPER: TRAINING BACKEND HISTOGRAM ---
+def train_hist_model(df: pd.DataFrame, predictors, target, n_estimators: int, test_size: float,
+                     random_state: int = 42, progress=None) -> dict:
+    """
+    Melatih HistGradientBoostingClassifier dengan split train/test yang sama seperti
+    train_random_forest, dalam satu kali fit (n_estimators dipakai sebagai jumlah iterasi
+    boosting). progress(fraction, teks) dipanggil sebelum fit, setelah fit dan setelah
+    permutation importance.
+    Returns: dict berisi 'model', 'acc', 'cm', 'report', 'base_trees' (selalu 0).
+    """
+    X = df[list(predictors)].to_numpy(dtype=np.float64)
+    y = df[target].to_numpy()
+    train_idx, test_idx = train_test_split(
+        np.arange(len(X)), test_size=test_size, random_state=random_state
+    )
+
+    model = HistGradientBoostingClassifier(
+        max_iter=n_estimators,
+        max_bins=MAX_BINS,
+        class_weight="balanced",
+        random_state=random_state,
+    )
+    if progress is not None:
+        progress(0.0, f"Melatih {n_estimators} iterasi boosting")
+    model.fit(X[train_idx], y[train_idx])
+
+    if progress is not None:
+        progress(0.7, "Evaluasi & permutation importance pada data testing")
+    X_test, y_test = X[test_idx], y[test_idx]
+    y_pred = model.predict(X_test)
+    importances = permutation_importances(model, X_test, y_test, random_state)
+    if progress is not None:
+        progress(0.95, "Menyimpan hasil training")
+
+    return {
+        "model": HistClassifier(model, list(predictors), importances),
+        "acc": accuracy_score(y_test, y_pred),
+        "cm": confusion_matrix(y_test, y_pred),
+        "report": classification_report(y_test, y_pred, output_dict=True),
+        "base_trees": 0,
+    }
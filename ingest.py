@@ -0,0 +1,101 @@
+# ingest.py
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from compaction import compact_series
+
+# --- KONFIGURASI STREAMING ---
+CHUNK_ROWS = 100_000          # jumlah baris per chunk saat membaca CSV
+STREAMING_THRESHOLD_MB = 50   # file lebih besar dari ini otomatis memakai mode streaming
+
+
+# --- HELPER: DOWNCAST SATU CHUNK ---
+def downcast_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """
+    Memperkecil tipe data satu chunk (lihat compaction.compact_series).
+    Returns: DataFrame chunk yang sudah dipadatkan.
+    """
+    for col in chunk.columns:
+        chunk[col] = compact_series(chunk[col])
+    return chunk
+
+
+# --- HELPER: GABUNG CHUNK ---
+def _concat_chunks(chunks):
+    """
+    Menggabungkan chunk-chunk menjadi satu DataFrame. Kolom category digabung
+    dengan union_categoricals agar tidak kembali menjadi object. Jika tipe kategorinya
+    berbeda antar chunk (mis. teks di satu chunk, angka di chunk lain), kategori diubah
+    menjadi teks dulu, sama seperti hasil membaca seluruh file sekaligus.
+    """
+    if len(chunks) == 1:
+        return chunks[0]
+
+    columns = chunks[0].columns
+    cat_cols = [
+        col for col in columns
+        if any(isinstance(c[col].dtype, pd.CategoricalDtype) for c in chunks)
+    ]
+    merged_cats = {}
+    for col in cat_cols:
+        pieces = []
+        for c in chunks:
+            s = c[col]
+            if not isinstance(s.dtype, pd.CategoricalDtype):
+                # chunk yang seluruhnya kosong terbaca sebagai float, samakan dulu
+                s = s.astype(object).astype("category")
+            pieces.append(s)
+        category_dtypes = {p.cat.categories.dtype for p in pieces if len(p.cat.categories)}
+        if len(category_dtypes) > 1:
+            pieces = [p.cat.rename_categories(p.cat.categories.astype(str)) for p in pieces]
+        merged_cats[col] = union_categoricals(pieces)
+
+    other_cols = [col for col in columns if col not in merged_cats]
+    df = pd.concat([c[other_cols] for c in chunks], ignore_index=True)
+    for col in cat_cols:
+        df[col] = pd.Categorical(merged_cats[col])
+    return df[list(columns)]
+
+
+# --- HELPER: BACA CSV SECARA STREAMING ---
+def read_csv_chunked(file, total_bytes: int, chunksize: int = CHUNK_ROWS, progress_callback=None):
+    """
+    Membaca CSV per chunk agar memori puncak tetap kecil (satu chunk + hasil yang
+    sudah dipadatkan). Tabel info kolom dihitung bertahap per chunk.
+    progress_callback(fraction, rows_read) dipanggil setiap selesai satu chunk.
+    Returns: tuple (DataFrame, DataFrame info kolom, perkiraan bytes sebelum dipadatkan).
+    """
+    chunks = []
+    non_null = None
+    rows_read = 0
+    raw_bytes = 0
+
+    for chunk in pd.read_csv(file, chunksize=chunksize):
+        counts = chunk.notna().sum()
+        non_null = counts if non_null is None else non_null.add(counts, fill_value=0)
+        rows_read += len(chunk)
+        raw_bytes += int(chunk.memory_usage(deep=True).sum())
+        chunks.append(downcast_chunk(chunk))
+
+        if progress_callback is not None and total_bytes:
+            progress_callback(min(file.tell() / total_bytes, 1.0), rows_read)
+
+    if not chunks:
+        raise ValueError("File CSV tidak berisi data.")
+
+    df = _concat_chunks(chunks)
+    del chunks
+
+    # kolom yang tipenya berbeda antar chunk bisa kembali menjadi object
+    for col in df.columns:
+        if df[col].dtype == "object":
+            df[col] = compact_series(df[col])
+
+    non_null = non_null.reindex(df.columns).fillna(0).astype("int64")
+    col_info = pd.DataFrame({
+        'Kolom': df.columns,
+        'Tipe Data': df.dtypes.values,
+        'Non-Null Count': non_null.values,
+        'Null Count': len(df) - non_null.values,
+    })
+    return df, col_info, raw_bytes
@@ -0,0 +1,116 @@
+# jobs.py
+import threading
+import time
+import uuid
+
+import streamlit as st
+
+# --- KONFIGURASI JOB ---
+MAX_FINISHED_JOBS = 20   # job yang sudah selesai disimpan sebatas ini (yang terlama dibuang)
+
+
+class JobCancelled(Exception):
+    """Dilempar dari dalam job ketika pengguna menekan tombol batal."""
+
+
+# --- JOB LATAR BELAKANG ---
+class Job:
+    """
+    Satu pekerjaan yang berjalan di thread latar belakang. Fungsi job menerima objek Job
+    dan memanggil job.report(fraction, message) untuk melaporkan progres; di titik itu
+    job berhenti (JobCancelled) jika sudah dibatalkan. Hasil sementara (mis. leaderboard
+    tuning) boleh ditulis ke job.partial agar bisa ditampilkan selagi job berjalan.
+    Status: 'running', 'done', 'cancelled', 'error'.
+    """
+
+    def __init__(self, key: str, fn, meta: dict = None):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.meta = meta or {}
+        self.status = "running"
+        self.progress = 0.0
+        self.message = ""
+        self.result = None
+        self.partial = None
+        self.error = None
+        self.started_at = time.time()
+        self.finished_at = None
+        self._fn = fn
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"job-{self.id[:8]}", daemon=True)
+
+    def _run(self):
+        try:
+            self.result = self._fn(self)
+            self.progress = 1.0
+            self.status = "done"
+        except JobCancelled:
+            self.status = "cancelled"
+        except Exception as e:
+            self.error = str(e)
+            self.status = "error"
+        finally:
+            self.finished_at = time.time()
+
+    def report(self, fraction: float, message: str = ""):
+        """Memperbarui progres (0..1); melempar JobCancelled jika job sudah dibatalkan."""
+        self.progress = min(max(float(fraction), 0.0), 1.0)
+        self.message = message
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def cancel(self):
+        """Meminta job berhenti pada laporan progres berikutnya."""
+        self._cancel.set()
+
+    @property
+    def running(self) -> bool:
+        return self.status == "running"
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.time()) - self.started_at
+
+
+# --- MANAJER JOB ---
+class JobManager:
+    """
+    Menyimpan job latar belakang untuk seluruh server. Job dengan key yang sama yang
+    masih berjalan dipakai bersama, sehingga pekerjaan yang sama tidak dijalankan dua kali.
+    """
+
+    def __init__(self, max_finished: int = MAX_FINISHED_JOBS):
+        self.max_finished = max_finished
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key: str, fn, meta: dict = None) -> Job:
+        """Returns: job yang sedang berjalan untuk key ini, atau job baru yang langsung dimulai."""
+        with self._lock:
+            for job in self._jobs.values():
+                if job.key == key and job.running:
+                    return job
+            job = Job(key, fn, meta)
+            self._jobs[job.id] = job
+            self._prune()
+        job._thread.start()
+        return job
+
+    def get(self, job_id: str):
+        """Returns: Job atau None jika tidak ada (mis. sudah dibuang)."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _prune(self):
+        finished = sorted(
+            (job for job in self._jobs.values() if not job.running),
+            key=lambda job: job.finished_at,
+        )
+        for job in finished[: max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[job.id]
+
+
+@st.cache_resource
+def get_job_manager() -> JobManager:
+    """Manajer job latar belakang, dipakai bersama oleh semua sesi."""
+    return JobManager()
@@ -0,0 +1,94 @@
+# model_registry.py
+import os
+
+import streamlit as st
+
+from cache import MemoryLRUCache, content_hash
+from helpers import load_model_from_file
+
+# --- KONFIGURASI REGISTRY MODEL ---
+# Batas memori untuk model yang sudah dimuat (MB), bisa diubah lewat environment variable
+MODEL_REGISTRY_BUDGET_MB = int(os.environ.get("TENSICARE_MODEL_REGISTRY_MB", "1024"))
+
+
+@st.cache_resource
+def get_model_registry() -> MemoryLRUCache:
+    """Registry model yang sudah di-deserialize, dipakai bersama oleh semua sesi."""
+    return MemoryLRUCache(MODEL_REGISTRY_BUDGET_MB * 1024 * 1024)
+
+
+# --- HELPER: PERKIRAAN UKURAN MODEL DI MEMORI ---
+def estimate_model_bytes(model, fallback: int = 0) -> int:
+    """
+    Perkiraan memori model berbasis pohon: node (64 byte per node di sklearn) + array value.
+    Untuk model lain dipakai fallback (mis. ukuran payload file).
+    """
+    estimators = getattr(model, "estimators_", None)
+    if estimators is None:
+        return fallback
+    total = 0
+    for est in estimators:
+        tree = getattr(est, "tree_", None)
+        if tree is None:
+            return fallback
+        total += tree.node_count * 64 + tree.value.nbytes
+    return total
+
+
+# --- HELPER: MUAT MODEL SEKALI PER ARTEFAK ---
+def load_model_shared(uploaded_file):
+    """
+    Memuat model dari file upload, tetapi hanya sekali per isi file (hash artefak).
+    Rerun berikutnya dan sesi lain yang mengupload file yang sama memakai objek model
+    yang sama dari registry. Model di registry hanya dibaca, jangan diubah.
+    Returns: tuple (key, model, header) atau (None, None, None) jika gagal.
+    """
+    registry = get_model_registry()
+
+    # Selama file yang sama masih di uploader, tidak perlu hashing ulang
+    file_id = getattr(uploaded_file, "file_id", None)
+    if file_id is not None and st.session_state.get("model_file_id") == file_id:
+        key = st.session_state.get("model_registry_key")
+        entry = registry.get(key)
+        if entry is not None:
+            return key, entry["model"], entry["header"]
+
+    with uploaded_file.getbuffer() as buf:
+        key = content_hash(buf)
+        file_size = buf.nbytes
+
+    entry = registry.get(key)
+    if entry is None:
+        model, header = load_model_from_file(uploaded_file)
+        if model is None:
+            return None, None, None
+        nbytes = estimate_model_bytes(model, fallback=file_size)
+        entry = {
+            "model": model,
+            "header": header,
+            "name": getattr(uploaded_file, "name", key[:12]),
+            "nbytes": nbytes,
+        }
+        registry.put(key, entry, nbytes)
+
+    st.session_state["model_file_id"] = file_id
+    st.session_state["model_registry_key"] = key
+    return key, entry["model"], entry["header"]
+
+
+# --- HELPER: DAFTAR MODEL DI MEMORI ---
+def resident_models():
+    """
+    Returns: list dict (key, nama file, ukuran, kelas model) untuk model yang sedang ada
+    di registry, dari yang paling baru dipakai.
+    """
+    rows = []
+    for key, entry, nbytes in reversed(get_model_registry().entries()):
+        rows.append({
+            "key": key,
+            "name": entry["name"],
+            "nbytes": nbytes,
+            "model_class": type(entry["model"]).__name__,
+            "n_features": len(entry["header"].get("features", [])),
+        })
+    return rows
@@ -0,0 +1,99 @@
+# parallel_scoring.py
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from contextlib import contextmanager
+
+import streamlit as st
+
+from artifact import SPOOL_DIR, touch_spool_file, write_artifact
+from scoring import init_scoring_worker
+
+# --- KONFIGURASI SCORING PARALEL ---
+# Jumlah worker default untuk batch prediction (1 = tanpa process pool)
+DEFAULT_SCORING_WORKERS = int(os.environ.get("TENSICARE_SCORING_WORKERS", "1"))
+SHARDS_PER_WORKER = 2   # shard per worker pada mode di memori, agar beban lebih merata
+
+
+# --- HELPER: JUMLAH CPU ---
+def available_cpus() -> int:
+    """Jumlah CPU yang boleh dipakai proses ini (menghormati affinity/cgroup jika ada)."""
+    if hasattr(os, "sched_getaffinity"):
+        return max(len(os.sched_getaffinity(0)), 1)
+    return os.cpu_count() or 1
+
+
+def tuned_n_jobs(n_workers: int) -> int:
+    """n_jobs forest per worker = CPU / jumlah worker, agar total thread tidak melebihi CPU."""
+    return max(available_cpus() // max(n_workers, 1), 1)
+
+
+# --- HELPER: PEMBUATAN POOL ---
+# Worker spawn mengimpor ulang __main__ (app.py) sebagai __mp_main__; halaman aplikasi di app.py
+# hanya berjalan di bawah `if __name__ == "__main__"`, sehingga worker baru (termasuk pengganti
+# worker yang rusak) tidak mengeksekusi halaman.
+def _new_pool(n_workers: int) -> ProcessPoolExecutor:
+    executor = ProcessPoolExecutor(
+        max_workers=n_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_scoring_worker,
+        initargs=(tuned_n_jobs(n_workers),),
+    )
+    # semua worker dibuat sekarang (bukan saat submit berikutnya)
+    warmup = [executor.submit(os.getpid) for _ in range(n_workers)]
+    wait(warmup)
+    return executor
+
+
+# --- HELPER: PROCESS POOL BERSAMA ---
+@st.cache_resource
+def _pool_holder() -> dict:
+    # pool per jumlah worker untuk seluruh server, beserta jumlah pemakai yang sedang aktif
+    return {"pools": {}, "lock": threading.Lock()}
+
+
+@contextmanager
+def scoring_pool(n_workers: int):
+    """
+    Process pool (konteks spawn) dengan n_workers proses yang dipakai bersama oleh semua sesi.
+    Worker tetap hidup di antara prediksi sehingga model cukup dimuat sekali per worker.
+    Pool tidak pernah dimatikan selama masih dipakai; pool idle dengan jumlah worker lain
+    dimatikan saat pool baru diminta, dan pool yang rusak diganti.
+    Yields: ProcessPoolExecutor.
+    """
+    holder = _pool_holder()
+    with holder["lock"]:
+        pools = holder["pools"]
+        entry = pools.get(n_workers)
+        if entry is None or getattr(entry["executor"], "_broken", False):
+            entry = {"executor": _new_pool(n_workers), "users": 0}
+            pools[n_workers] = entry
+        entry["users"] += 1
+        for n, other in list(pools.items()):
+            if n != n_workers and other["users"] == 0:
+                other["executor"].shutdown(wait=False)
+                del pools[n]
+    try:
+        yield entry["executor"]
+    finally:
+        with holder["lock"]:
+            entry["users"] -= 1
+
+
+# --- HELPER: ARTEFAK MODEL BERSAMA UNTUK WORKER ---
+def export_shared_model(model, model_key: str, features) -> str:
+    """
+    Menulis model sekali ke artefak tanpa kompresi di disk (dinamai dengan model_key),
+    yang dibuka read-only (mmap) oleh setiap worker. File ikut anggaran SPOOL_MAX_MB:
+    artefak model lama yang paling lama tidak dipakai dihapus. Returns: path artefak.
+    """
+    os.makedirs(SPOOL_DIR, exist_ok=True)
+    path = os.path.join(SPOOL_DIR, f"shared-{model_key}.tnsc")
+    if not os.path.exists(path):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            write_artifact(f, model, {"features": list(features)}, compress=0)
+        os.replace(tmp_path, path)
+    touch_spool_file(path)
+    return path
@@ -0,0 +1,66 @@
+# profiling.py
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Konstanta pengacak untuk menggabungkan hash per kolom menjadi hash per baris
+_HASH_MULTIPLIER = np.uint64(1000003)
+
+
+# --- HELPER: PROFIL KUALITAS DATA (SATU KALI SCAN) ---
+def profile_dataset(df: pd.DataFrame, drop_cols=()) -> dict:
+    """
+    Menghitung statistik kualitas data dalam satu kali scan per kolom:
+    missing value per kolom, baris duplikat (kandidat lewat hash baris 64-bit, lalu
+    dipastikan dengan membandingkan isi barisnya) dan baris yang lolos pembersihan. Duplikat & missing dihitung hanya pada kolom
+    yang dipakai (bukan drop_cols), sama seperti urutan di preprocess_data.
+    Returns: dict profil, termasuk 'keep_positions' (posisi baris yang dipertahankan).
+    """
+    n_rows = len(df)
+    row_hash = np.zeros(n_rows, dtype=np.uint64)
+    row_has_null = np.zeros(n_rows, dtype=bool)
+    missing_per_col = {}
+
+    for col in df.columns:
+        s = df[col]
+        null_mask = s.isna().to_numpy()
+        missing_per_col[col] = int(null_mask.sum())
+        if col in drop_cols:
+            continue
+        row_has_null |= null_mask
+        col_hash = pd.util.hash_pandas_object(s, index=False).to_numpy()
+        row_hash = row_hash * _HASH_MULTIPLIER ^ col_hash
+
+    # hash yang sama belum tentu baris yang sama (tabrakan hash): hanya baris dengan hash
+    # kembar yang dibandingkan isinya, sehingga baris berbeda tidak ikut terhapus
+    is_duplicate = np.zeros(n_rows, dtype=bool)
+    candidates = np.flatnonzero(pd.Series(row_hash).duplicated(keep=False).to_numpy())
+    if len(candidates):
+        used_cols = [col for col in df.columns if col not in drop_cols]
+        is_duplicate[candidates] = df.iloc[candidates][used_cols].duplicated().to_numpy()
+    keep = ~is_duplicate & ~row_has_null
+
+    return {
+        "n_rows": n_rows,
+        "drop_cols": list(drop_cols),
+        "missing_per_col": missing_per_col,
+        "missing_total": int(sum(missing_per_col.values())),
+        "duplicates": int(is_duplicate.sum()),
+        "keep_positions": np.flatnonzero(keep),
+    }
+
+
+# --- HELPER: PROFIL DENGAN CACHE SESI ---
+def get_dataset_profile(df: pd.DataFrame, drop_cols=()) -> dict:
+    """
+    Sama seperti profile_dataset, tetapi hasilnya disimpan di session_state
+    sehingga halaman Preprocessing dan preprocess_data memakai hasil yang sama.
+    """
+    cache_key = (st.session_state.get("raw_key"), id(df), tuple(drop_cols))
+    cached = st.session_state.get("raw_profile")
+    if cached is not None and cached[0] == cache_key:
+        return cached[1]
+
+    profile = profile_dataset(df, drop_cols)
+    st.session_state["raw_profile"] = (cache_key, profile)
+    return profile
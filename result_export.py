@@ -0,0 +1,125 @@
+# result_export.py
+import gzip
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# --- KONFIGURASI EKSPOR HASIL ---
+EXPORT_FORMATS = {
+    "CSV": "csv",
+    "CSV terkompresi (gzip)": "csv.gz",
+    "Parquet": "parquet",
+}
+EXPORT_MIME = {
+    "csv": "text/csv",
+    "csv.gz": "application/gzip",
+    "parquet": "application/vnd.apache.parquet",
+}
+EXPORT_CHUNK_ROWS = 100_000
+EXPORT_SPOOL_MB = 32     # file ekspor lebih besar dari ini dipindah dari memori ke disk
+GZIP_LEVEL = 6
+
+
+# --- HELPER: SUMBER DATA PER CHUNK ---
+def result_chunks(df: pd.DataFrame = None, path: str = None, chunksize: int = EXPORT_CHUNK_ROWS,
+                  dtype: dict = None):
+    """Hasil batch per chunk: irisan df di memori, atau dibaca bertahap dari CSV hasil streaming."""
+    if df is not None:
+        for start in range(0, max(len(df), 1), chunksize):
+            yield df.iloc[start:start + chunksize]
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize, dtype=dtype)
+
+
+def csv_dtypes(path: str, chunksize: int = EXPORT_CHUNK_ROWS) -> dict:
+    """
+    Tipe kolom yang berlaku untuk seluruh CSV (satu pass baca per chunk). Chunk bisa terbaca
+    dengan tipe berbeda (kolom kosong/bilangan bulat di awal, pecahan/teks di chunk berikutnya):
+    campuran tipe numerik menjadi float64, campuran lainnya menjadi teks (object).
+    Returns: dict {kolom: dtype}, urut sesuai kolom CSV.
+    """
+    seen = {}
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        for col, dtype in chunk.dtypes.items():
+            seen.setdefault(col, set()).add(dtype)
+
+    dtypes = {}
+    for col, kinds in seen.items():
+        if len(kinds) == 1:
+            dtypes[col] = kinds.pop()
+        elif all(pd.api.types.is_numeric_dtype(k) and not pd.api.types.is_bool_dtype(k) for k in kinds):
+            dtypes[col] = np.dtype("float64")
+        else:
+            dtypes[col] = np.dtype(object)
+    return dtypes
+
+
+def _arrow_schema(dtypes: dict) -> pa.Schema:
+    return pa.schema([
+        (col, pa.string() if dtype == object else pa.from_numpy_dtype(dtype))
+        for col, dtype in dtypes.items()
+    ])
+
+
+# --- HELPER: TULIS FILE EKSPOR ---
+def _write_csv(chunks, out) -> int:
+    rows = 0
+    for i, chunk in enumerate(chunks):
+        out.write(chunk.to_csv(index=False, header=(i == 0)).encode("utf-8"))
+        rows += len(chunk)
+    return rows
+
+
+def _write_parquet(chunks, out, schema: pa.Schema) -> int:
+    # skema ditentukan sebelum writer dibuka agar semua chunk ditulis dengan tipe yang sama
+    rows = 0
+    with pq.ParquetWriter(out, schema, compression="snappy") as writer:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            rows += len(chunk)
+    return rows
+
+
+def build_export(fmt: str, df: pd.DataFrame = None, path: str = None,
+                 chunksize: int = EXPORT_CHUNK_ROWS) -> dict:
+    """
+    Menulis hasil batch (df di memori atau file CSV hasil streaming di path) ke format fmt
+    (lihat EXPORT_FORMATS) per chunk ke SpooledTemporaryFile: tetap di memori jika kecil,
+    otomatis dipindah ke disk jika melebihi EXPORT_SPOOL_MB. CSV hasil streaming dipakai
+    langsung tanpa ditulis ulang; untuk Parquet tipe kolomnya ditentukan dulu dari seluruh
+    file (csv_dtypes) agar skema semua chunk sama.
+    Returns: dict 'file' (file terbuka, posisi di awal), 'size' (bytes), 'seconds', 'rows'.
+    """
+    start = time.perf_counter()
+    if fmt == "csv" and df is None:
+        out = open(path, "rb")
+        return {"file": out, "size": os.path.getsize(path), "seconds": 0.0, "rows": None}
+
+    out = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MB * 1024 * 1024)
+    if fmt == "parquet":
+        if df is None:
+            dtypes = csv_dtypes(path, chunksize)
+            schema = _arrow_schema(dtypes)
+        else:
+            dtypes, schema = None, pa.Schema.from_pandas(df, preserve_index=False)
+        rows = _write_parquet(result_chunks(df, path, chunksize, dtypes), out, schema)
+    elif fmt == "csv.gz":
+        with gzip.GzipFile(fileobj=out, mode="wb", compresslevel=GZIP_LEVEL) as gz:
+            rows = _write_csv(result_chunks(df, path, chunksize), gz)
+    else:
+        rows = _write_csv(result_chunks(df, path, chunksize), out)
+
+    size = out.tell()
+    out.seek(0)
+    return {"file": out, "size": size, "seconds": time.perf_counter() - start, "rows": rows}
+
+
+def close_exports(exports: dict):
+    """Menutup file ekspor (file spool di disk ikut terhapus)."""
+    for export in (exports or {}).values():
+        export["file"].close()
@@ -0,0 +1,96 @@
+# result_grid.py
+import io
+
+import numpy as np
+import pandas as pd
+
+# --- KONFIGURASI TABEL HASIL ---
+PAGE_SIZES = [50, 100, 250, 500]
+SORT_OPTIONS = {
+    "Urutan asli": "original",
+    "Probabilitas tertinggi": "desc",
+    "Probabilitas terendah": "asc",
+}
+RISK_ROW_STYLE = "background-color: #f8d7da"
+SAFE_ROW_STYLE = "background-color: #d4edda"
+
+
+# --- HELPER: INDEKS HASIL ---
+def build_result_index(predictions, risk_proba) -> dict:
+    """
+    Indeks hasil batch, dibuat sekali per hasil: posisi baris terurut menurut probabilitas
+    (semua baris dan per kelas Prediksi) beserta probabilitas terurutnya, sehingga filter
+    rentang probabilitas cukup dua searchsorted dan pengurutan tidak perlu menyortir ulang.
+    Returns: dict {None atau kelas: dict 'by_proba', 'proba', 'original'}.
+    """
+    predictions = np.asarray(predictions)
+    proba = np.asarray(risk_proba, dtype=np.float64)
+    order = np.argsort(proba, kind="stable")
+    sorted_proba = proba[order]
+    index = {None: {"by_proba": order, "proba": sorted_proba, "original": np.arange(len(proba))}}
+
+    sorted_predictions = predictions[order]
+    for cls in np.unique(predictions).tolist():
+        in_class = sorted_predictions == cls
+        index[cls] = {
+            "by_proba": order[in_class],
+            "proba": sorted_proba[in_class],
+            "original": np.flatnonzero(predictions == cls),
+        }
+    return index
+
+
+def query_positions(index: dict, cls=None, proba_range=(0.0, 100.0), sort: str = "original"):
+    """
+    Posisi baris (iloc) yang lolos filter kelas + rentang probabilitas, dalam urutan sort.
+    Returns: array posisi (bisa berupa view dari indeks, jangan diubah).
+    """
+    entry = index.get(cls)
+    if entry is None:
+        return np.empty(0, dtype=np.int64)
+    low = np.searchsorted(entry["proba"], proba_range[0], side="left")
+    high = np.searchsorted(entry["proba"], proba_range[1], side="right")
+
+    if sort == "asc":
+        return entry["by_proba"][low:high]
+    if sort == "desc":
+        return entry["by_proba"][low:high][::-1]
+    if low == 0 and high == len(entry["proba"]):
+        return entry["original"]
+    return np.sort(entry["by_proba"][low:high])
+
+
+# --- HELPER: HALAMAN TABEL ---
+def page_frame(df: pd.DataFrame, positions, page: int, page_size: int) -> pd.DataFrame:
+    """Baris satu halaman (page mulai dari 1); index asli df dipertahankan sebagai nomor baris."""
+    start = (page - 1) * page_size
+    return df.iloc[positions[start:start + page_size]]
+
+
+def read_result_rows(path: str, offsets, positions, page: int, page_size: int) -> pd.DataFrame:
+    """
+    Baris satu halaman dari CSV hasil streaming, dibaca langsung per posisi memakai offset
+    byte setiap baris (offsets[0] = akhir header, lihat scoring.score_csv_streaming), tanpa
+    membaca seluruh file. Posisi baris dipakai sebagai nomor baris.
+    """
+    start = (page - 1) * page_size
+    rows = positions[start:start + page_size]
+    with open(path, "rb") as f:
+        lines = [f.read(int(offsets[0]))]
+        for pos in rows:
+            f.seek(int(offsets[pos]))
+            lines.append(f.read(int(offsets[pos + 1] - offsets[pos])))
+    frame = pd.read_csv(io.BytesIO(b"".join(lines)))
+    frame.index = rows
+    return frame
+
+
+def style_page(page_df: pd.DataFrame):
+    """Pewarnaan baris menurut Prediksi, hanya untuk baris di halaman ini (satu operasi vektor)."""
+    def colors(frame):
+        row_color = np.where(frame["Prediksi"].to_numpy() == 1, RISK_ROW_STYLE, SAFE_ROW_STYLE)
+        return pd.DataFrame(
+            np.repeat(row_color[:, None], frame.shape[1], axis=1),
+            index=frame.index, columns=frame.columns,
+        )
+    return page_df.style.apply(colors, axis=None)
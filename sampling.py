@@ -0,0 +1,74 @@
+# sampling.py
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from training import RANDOM_STATE, get_clean_fingerprint
+
+# --- KONFIGURASI MODE EKSPLORASI ---
+DEFAULT_SAMPLE_ROWS = 50_000
+CONFIDENCE_Z = 1.96   # interval kepercayaan 95%
+
+
+# --- HELPER: SAMPEL TERSTRATIFIKASI ---
+def stratified_sample_indices(y, n_rows: int, random_state: int = RANDOM_STATE) -> np.ndarray:
+    """
+    Indeks sampel berukuran n_rows dengan proporsi setiap kelas y sama seperti data penuh
+    (pembulatan dengan metode sisa terbesar). Urutan baris asli dipertahankan.
+    Returns: array indeks posisi (terurut).
+    """
+    codes, _ = pd.factorize(y, use_na_sentinel=False)
+    counts = np.bincount(codes)
+    n_rows = min(int(n_rows), len(codes))
+
+    exact = counts * n_rows / len(codes)
+    quota = np.floor(exact).astype(np.int64)
+    remainder = n_rows - quota.sum()
+    quota[np.argsort(-(exact - quota), kind="stable")[:remainder]] += 1
+
+    rng = np.random.default_rng(random_state)
+    picked = [
+        rng.choice(np.flatnonzero(codes == c), size=quota[c], replace=False)
+        for c in range(len(counts)) if quota[c]
+    ]
+    return np.sort(np.concatenate(picked))
+
+
+def stratified_sample(df: pd.DataFrame, target, n_rows: int,
+                      random_state: int = RANDOM_STATE) -> pd.DataFrame:
+    """Sampel terstratifikasi dari df berdasarkan kolom target. Returns: DataFrame."""
+    return df.iloc[stratified_sample_indices(df[target], n_rows, random_state)]
+
+
+# --- HELPER: INTERVAL KEPERCAYAAN AKURASI ---
+def wilson_interval(acc: float, n: int, z: float = CONFIDENCE_Z):
+    """
+    Interval kepercayaan Wilson untuk akurasi dari n baris data testing
+    (tetap valid untuk akurasi mendekati 0 atau 1). Returns: tuple (batas bawah, batas atas).
+    """
+    if n <= 0:
+        return 0.0, 1.0
+    denom = 1 + z * z / n
+    center = (acc + z * z / (2 * n)) / denom
+    half = z * math.sqrt(acc * (1 - acc) / n + z * z / (4 * n * n)) / denom
+    return max(center - half, 0.0), min(center + half, 1.0)
+
+
+# --- HELPER: DATA UNTUK MODE EKSPLORASI ---
+def get_explore_sample(target, n_rows: int):
+    """
+    Sampel terstratifikasi clean_df untuk mode eksplorasi, dibuat sekali per
+    (dataset, target, ukuran) dan disimpan di session state sebagai 'explore_df'.
+    Fingerprint sampel diturunkan dari fingerprint data penuh, sehingga cache training
+    tetap berlaku untuk sampel yang sama.
+    Returns: tuple (DataFrame sampel, fingerprint sampel).
+    """
+    fingerprint = f"{get_clean_fingerprint()}:stratified:{target}:{int(n_rows)}:{RANDOM_STATE}"
+    if st.session_state.get("explore_key") != fingerprint or st.session_state.get("explore_df") is None:
+        st.session_state["explore_df"] = stratified_sample(
+            st.session_state["clean_df"], target, n_rows
+        )
+        st.session_state["explore_key"] = fingerprint
+    return st.session_state["explore_df"], fingerprint
@@ -0,0 +1,307 @@
+# scoring.py
+import os
+import time
+import uuid
+from collections import deque
+from contextlib import ExitStack
+
+import numpy as np
+import pandas as pd
+
+from encoders import encode_column, fit_encoders
+from validation import validate_batch
+
+# --- KONFIGURASI BATCH PREDICTION ---
+BATCH_CHUNK_ROWS = 200_000   # jumlah baris per chunk pada mode streaming
+RESULT_DIR = os.path.join(os.environ.get("TENSICARE_CACHE_DIR", ".cache"), "results")
+RESULT_MAX_AGE_HOURS = float(os.environ.get("TENSICARE_RESULT_MAX_AGE_HOURS", "24"))
+RISK_LABELS = {0: 'Tidak Berisiko', 1: 'Berisiko'}
+DEFAULT_THRESHOLD = 0.5      # ambang probabilitas kelas positif untuk label 'Berisiko'
+
+
+# --- HELPER: SIAPKAN MATRIKS FITUR ---
+def prepare_features(df: pd.DataFrame, features, encoders=None, fill_values=None):
+    """
+    Menyusun X sesuai urutan fitur model: fitur yang hilang diisi dari fill_values
+    (median training, lihat validation.fill_values) atau 0, kolom kategorikal
+    dikodekan dengan encoder dari training. Kolom kategorikal tanpa encoder (model lama)
+    di-fit dari data ini; encoder hasil fit dikembalikan agar chunk berikutnya memakai kode yang sama.
+    Returns: tuple (X, dict info encoding).
+    """
+    available_features = [f for f in features if f in df.columns]
+    X = df[available_features].copy()
+
+    # Jika ada fitur yang hilang, isi dengan nilai default
+    fill_values = fill_values or {}
+    for feat in features:
+        if feat not in X.columns:
+            X[feat] = fill_values.get(feat, 0)
+
+    # Urutkan kolom sesuai dengan urutan fitur model
+    X = X[features]
+
+    encoders = dict(encoders or {})
+    categorical_cols = X.select_dtypes(include=['object', 'category']).columns.tolist()
+    legacy_cols = [col for col in categorical_cols if col not in encoders]
+    if legacy_cols:
+        encoders.update(fit_encoders(X, legacy_cols))
+
+    unknown_counts = {}
+    for col in categorical_cols:
+        X[col], n_unknown = encode_column(X[col], encoders[col])
+        if n_unknown:
+            unknown_counts[col] = n_unknown
+
+    info = {
+        "categorical_cols": categorical_cols,
+        "legacy_cols": legacy_cols,
+        "unknown_counts": unknown_counts,
+        "encoders": encoders,
+    }
+    return X, info
+
+
+# --- HELPER: PREDIKSI ---
+def predict_with_proba(model, X, threshold: float = DEFAULT_THRESHOLD):
+    """
+    Satu kali inferensi untuk label dan probabilitas: predict_proba dijalankan sekali,
+    lalu label diturunkan dari probabilitas kelas positif (label positif jika p > threshold).
+    Pada threshold 0.5 hasilnya sama dengan model.predict (argmax, seri -> kelas pertama).
+    Returns: tuple (array prediksi, array probabilitas risiko dalam persen).
+    """
+    if len(X) == 0:
+        # semua baris chunk ditolak validasi
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    if not hasattr(model, 'predict_proba'):
+        predictions = model.predict(X)
+        return predictions, predictions * 100
+
+    proba = model.predict_proba(X)
+    classes = np.asarray(model.classes_)
+    if proba.shape[1] == 1:
+        # model hanya mengenal satu kelas
+        return np.repeat(classes[:1], len(proba)), proba[:, 0] * 100
+    if proba.shape[1] > 2:
+        return classes.take(proba.argmax(axis=1)), proba[:, 1] * 100
+
+    risk = proba[:, 1]
+    threshold = round(float(threshold), 4)
+    # threshold 0.5 dibandingkan dengan p0 langsung agar identik dengan argmax milik predict
+    positive = risk > proba[:, 0] if threshold == DEFAULT_THRESHOLD else risk > threshold
+    predictions = np.where(positive, classes[1], classes[0])
+    return predictions, risk * 100
+
+
+def attach_predictions(df: pd.DataFrame, predictions, risk_proba) -> pd.DataFrame:
+    """Menambahkan kolom hasil prediksi ke df (langsung, tanpa menyalin df)."""
+    df['Prediksi'] = predictions
+    df['Label_Prediksi'] = df['Prediksi'].map(RISK_LABELS)
+    df['Probabilitas_Risiko (%)'] = risk_proba.round(2)
+    return df
+
+
+def merge_counts(total: dict, counts: dict):
+    """Menjumlahkan dict hitungan per kolom ke dalam total."""
+    for key, n in counts.items():
+        total[key] = total.get(key, 0) + n
+
+
+# --- HELPER: STATISTIK BATCH ---
+def new_batch_stats() -> dict:
+    """Statistik batch kosong (total di sini = baris yang diprediksi, tanpa baris ditolak)."""
+    return {
+        "total": 0, "berisiko": 0, "tidak_berisiko": 0, "unknown_categories": {},
+        "rejected": 0, "reject_counts": {}, "out_of_range": {}, "fill_values": {},
+        "validated_rows": 0, "validation_seconds": 0.0,
+    }
+
+
+def add_batch_stats(stats: dict, predictions, info: dict):
+    """Menambahkan hasil prediksi + validasi satu batch/chunk ke statistik."""
+    validation = info["validation"]
+    stats["total"] += len(predictions)
+    stats["berisiko"] += int((predictions == 1).sum())
+    stats["tidak_berisiko"] += int((predictions == 0).sum())
+    merge_counts(stats["unknown_categories"], info["unknown_counts"])
+    stats["rejected"] += validation["rejected"]
+    merge_counts(stats["reject_counts"], validation["reject_counts"])
+    merge_counts(stats["out_of_range"], validation["out_of_range"])
+    stats["fill_values"].update(validation["fill_values"])
+    stats["validated_rows"] += validation["rows"]
+    stats["validation_seconds"] += validation["seconds"]
+
+
+# --- HELPER: SCORING PARALEL (SISI WORKER) ---
+# Model per proses worker, dimuat sekali dari artefak bersama lalu dipakai ulang
+_WORKER_MODELS = {}
+_WORKER_N_JOBS = 1
+
+
+def init_scoring_worker(n_jobs: int):
+    """Initializer proses worker: n_jobs forest di worker (agar CPU tidak oversubscribed)."""
+    global _WORKER_N_JOBS
+    _WORKER_N_JOBS = n_jobs
+
+
+def _worker_model(model_path: str):
+    model = _WORKER_MODELS.get(model_path)
+    if model is None:
+        from artifact import load_artifact
+        _WORKER_MODELS.clear()   # worker hanya menyimpan model terakhir
+        model, _ = load_artifact(model_path, mmap=True)
+        if hasattr(model, "n_jobs"):
+            model.n_jobs = _WORKER_N_JOBS
+        _WORKER_MODELS[model_path] = model
+    return model
+
+
+def score_shard(model_path: str, X, threshold: float = DEFAULT_THRESHOLD):
+    """Dijalankan di proses worker: prediksi satu shard X dengan model dari model_path."""
+    return predict_with_proba(_worker_model(model_path), X, threshold)
+
+
+def score_in_pool(executor, model_path: str, X, threshold: float = DEFAULT_THRESHOLD,
+                  n_shards: int = 1):
+    """
+    Membagi X menjadi n_shards bagian berurutan, memprediksinya di process pool,
+    lalu menggabungkan hasilnya sesuai urutan baris semula.
+    Returns: tuple (array prediksi, array probabilitas risiko dalam persen).
+    """
+    bounds = np.linspace(0, len(X), min(max(n_shards, 1), max(len(X), 1)) + 1).astype(int)
+    futures = [
+        executor.submit(score_shard, model_path, X.iloc[start:stop], threshold)
+        for start, stop in zip(bounds[:-1], bounds[1:])
+    ]
+    results = [f.result() for f in futures]
+    return (np.concatenate([r[0] for r in results]),
+            np.concatenate([r[1] for r in results]))
+
+
+# --- HELPER: BATCH PREDICTION STREAMING ---
+def new_result_path(extension: str = "csv") -> str:
+    """Path file hasil baru di folder hasil lokal (file hasil lama dibersihkan dulu)."""
+    os.makedirs(RESULT_DIR, exist_ok=True)
+    prune_result_dir()
+    return os.path.join(RESULT_DIR, f"{uuid.uuid4().hex}.{extension}")
+
+
+def prune_result_dir(max_age_hours: float = RESULT_MAX_AGE_HOURS):
+    """
+    Menghapus file di RESULT_DIR yang terakhir diubah lebih dari max_age_hours lalu
+    (hasil dan baris ditolak dari sesi yang sudah ditutup tanpa Reset Hasil).
+    """
+    cutoff = time.time() - max_age_hours * 3600
+    for name in os.listdir(RESULT_DIR):
+        path = os.path.join(RESULT_DIR, name)
+        try:
+            if os.stat(path).st_mtime < cutoff:
+                os.remove(path)
+        except FileNotFoundError:
+            continue
+
+
+def _encoded_chunks(file, features, encoders, chunksize: int, summary=None,
+                    strict_range: bool = False):
+    # encoder hasil fit chunk pertama (model lama) dipakai untuk semua chunk berikutnya;
+    # baris yang ditolak validasi ikut dibawa di info untuk ditulis ke file penolakan
+    for i, chunk in enumerate(pd.read_csv(file, chunksize=chunksize)):
+        chunk, rejected, validation = validate_batch(chunk, features, summary, encoders, strict_range)
+        X, info = prepare_features(chunk, features, encoders, validation["fill_values"])
+        if i == 0:
+            encoders = info["encoders"]
+        info["rejected"] = rejected
+        info["validation"] = validation
+        yield chunk, X, info
+
+
+def _scored_in_pool(chunks, executor, model_path: str, threshold: float, max_in_flight: int):
+    # paling banyak max_in_flight chunk diproses bersamaan, hasil tetap keluar berurutan
+    pending = deque()
+    for chunk, X, info in chunks:
+        pending.append((chunk, info, executor.submit(score_shard, model_path, X, threshold)))
+        del X
+        if len(pending) >= max_in_flight:
+            chunk_done, info_done, future = pending.popleft()
+            yield (chunk_done, info_done, *future.result())
+    while pending:
+        chunk_done, info_done, future = pending.popleft()
+        yield (chunk_done, info_done, *future.result())
+
+
+def score_csv_streaming(file, total_bytes: int, model, features, encoders, out_path: str,
+                        threshold: float = DEFAULT_THRESHOLD, chunksize: int = BATCH_CHUNK_ROWS,
+                        preview_rows: int = 1000, progress_callback=None,
+                        executor=None, model_path: str = None, max_in_flight: int = 2,
+                        summary=None, reject_path: str = None, strict_range: bool = False) -> dict:
+    """
+    Membaca, memvalidasi, mengkodekan dan memprediksi CSV per chunk, lalu menulis hasilnya
+    langsung ke out_path. Memori yang dipakai hanya sebesar beberapa chunk, berapa pun ukuran file.
+    Jika executor (process pool) + model_path diberikan, chunk diprediksi paralel di worker.
+    progress_callback(fraction, rows_done) dipanggil setiap selesai satu chunk.
+    summary: ringkasan fitur model untuk validasi (lihat validation.validate_batch); baris yang
+    ditolak beserta alasannya ditulis ke reject_path (file hanya dibuat jika ada baris ditolak).
+    Selain file hasil, kolom Prediksi + probabilitas seluruh baris (beberapa byte per baris)
+    dan offset byte setiap baris di out_path dikumpulkan, agar tabel hasil bisa memfilter,
+    mengurutkan dan membaca halaman dari seluruh hasil (lihat result_grid.read_result_rows).
+    Returns: dict statistik + 'preview' (DataFrame beberapa baris pertama hasil),
+    'result_columns' (tuple array Prediksi, probabilitas %) dan 'row_offsets' (array n_baris + 1:
+    awal setiap baris lalu ukuran file; None jika ada nilai berisi baris baru).
+    """
+    stats = new_batch_stats()
+    legacy_cols = []
+    preview = None
+    predictions_parts, proba_parts, offset_parts = [], [], []
+    written = 0
+
+    chunks = _encoded_chunks(file, features, encoders, chunksize, summary, strict_range)
+    if executor is None:
+        scored = (
+            (chunk, info, *predict_with_proba(model, X, threshold))
+            for chunk, X, info in chunks
+        )
+    else:
+        scored = _scored_in_pool(chunks, executor, model_path, threshold, max_in_flight)
+
+    with ExitStack() as files:
+        out = files.enter_context(open(out_path, "wb"))
+        rejects = None
+        for i, (chunk, info, predictions, risk_proba) in enumerate(scored):
+            if i == 0:
+                legacy_cols = info["legacy_cols"]
+            chunk = attach_predictions(chunk, predictions, risk_proba)
+            data = chunk.to_csv(index=False, header=(i == 0)).encode("utf-8")
+            out.write(data)
+
+            predictions_parts.append(chunk["Prediksi"].to_numpy())
+            proba_parts.append(chunk["Probabilitas_Risiko (%)"].to_numpy())
+            if offset_parts is not None:
+                line_ends = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == ord("\n")) + 1 + written
+                if i == 0:
+                    offset_parts.append(line_ends[:1])   # akhir header = awal baris pertama
+                    line_ends = line_ends[1:]
+                if len(line_ends) == len(chunk):
+                    offset_parts.append(line_ends)
+                else:
+                    offset_parts = None   # ada nilai teks berisi baris baru
+            written += len(data)
+            if reject_path and len(info["rejected"]):
+                first_rejects = rejects is None
+                if first_rejects:
+                    rejects = files.enter_context(open(reject_path, "w", encoding="utf-8", newline=""))
+                info["rejected"].to_csv(rejects, index=False, header=first_rejects)
+
+            add_batch_stats(stats, predictions, info)
+            if preview is None:
+                preview = chunk.head(preview_rows)
+
+            if progress_callback is not None and total_bytes:
+                progress_callback(min(file.tell() / total_bytes, 1.0), stats["total"])
+
+    stats["legacy_cols"] = legacy_cols
+    stats["preview"] = preview
+    stats["result_columns"] = (
+        np.concatenate(predictions_parts) if predictions_parts else np.empty(0, dtype=np.int64),
+        np.concatenate(proba_parts) if proba_parts else np.empty(0),
+    )
+    stats["row_offsets"] = np.concatenate(offset_parts) if offset_parts else None
+    return stats
@@ -1,15 +1,18 @@
 # pages/analysis.py
 import streamlit as st
 import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 
 from helpers import (
     plot_confusion_matrix,
     plot_feature_importance,
-    save_model_to_file,
+    get_model_artifact,
 )
+from artifact import COMPRESSION_LEVELS
+from jobs import get_job_manager
+from form_schema import get_feature_summary
+from sampling import DEFAULT_SAMPLE_ROWS, get_explore_sample, wilson_interval
+from training import TRAINING_BACKENDS, get_clean_fingerprint, submit_training_job
+from tuning import DEFAULT_FOLDS, RANDOM_SEARCH_ITER, SEARCH_METHODS, leaderboard_frame, submit_tuning_job
 
 
 def show_analysis():
@@ -107,6 +110,42 @@ def show_analysis():
                 step=0.05,
                 help="Proporsi data yang digunakan untuk testing. Contoh: 0.20 berarti 20% untuk test, 80% untuk training."
             )
+        
+        backend_label = st.selectbox(
+            "🧮 Backend training",
+            options=list(TRAINING_BACKENDS),
+            key="training_backend",
+            help="Histogram: HistGradientBoosting mem-bin fitur menjadi kode uint8 sekali per training lalu "
+                 "membangun pohon dari histogram; jauh lebih cepat untuk data besar. Jumlah trees dipakai sebagai jumlah "
+                 "iterasi boosting, dan feature importance dihitung dengan permutation importance."
+        )
+        algorithm = TRAINING_BACKENDS[backend_label]
+        
+        incremental = st.toggle(
+            "♻️ Training inkremental (pakai ulang hutan yang sudah dilatih)",
+            value=True,
+            key="incremental_training",
+            disabled=algorithm != "random_forest",
+            help="Jika data, fitur dan proporsi testing sama, hutan yang sudah dilatih dipakai ulang: "
+                 "menambah trees hanya melatih trees tambahan, mengurangi trees cukup memangkas hutan. "
+                 "Hasilnya identik dengan training dari awal."
+        )
+        
+        explore = st.toggle(
+            "🧪 Mode eksplorasi (sampel terstratifikasi)",
+            value=False,
+            key="explore_mode",
+            help="Analisis dan visualisasi memakai sampel terstratifikasi berdasarkan kolom target, "
+                 "agar iterasi tetap cepat pada data besar. Model bisa dilatih ulang pada data penuh dengan satu klik."
+        )
+        explore_rows = st.number_input(
+            "Ukuran sampel (baris)",
+            min_value=1_000,
+            value=DEFAULT_SAMPLE_ROWS,
+            step=10_000,
+            key="explore_rows",
+            disabled=not explore,
+        )
 
     # Tombol untuk menjalankan analisis
     if selected_predictors and selected_target:
@@ -126,45 +165,84 @@ def show_analysis():
         """, unsafe_allow_html=True)
         
         if st.button("🕵🏻 Jalankan Analisis", use_container_width=True, key="run_analysis", type="primary"):
-            with st.spinner("⏳ Sedang melatih model Random Forest..."):
-                try:
-                    X = df_clean[selected_predictors]
-                    y = df_clean[selected_target]
-                    
-                    # Simpan features untuk digunakan di halaman lain
-                    st.session_state["features"] = selected_predictors
-                    
-                    X_train, X_test, y_train, y_test = train_test_split(
-                        X, y, test_size=test_size, random_state=42
-                    )
-                    
-                    model = RandomForestClassifier(
-                        n_estimators=n_estimators,
-                        random_state=42,
-                        class_weight="balanced",
-                        n_jobs=-1,
-                    )
-                    
-                    model.fit(X_train, y_train)
-                    y_pred = model.predict(X_test)
-                    
-                    acc = accuracy_score(y_test, y_pred)
-                    cm = confusion_matrix(y_test, y_pred)
-                    report = classification_report(y_test, y_pred, output_dict=True)
-                    
-                    st.session_state["rf_model"] = model
-                    st.session_state["acc"] = acc
-                    st.session_state["cm"] = cm
-                    st.session_state["report"] = report
-                    st.session_state["X_cols"] = X.columns.tolist()
-                    
-                    st.success("✅ Analisis selesai!")
-                    st.rerun()
-                except Exception as e:
-                    st.error(f"❌ Error saat analisis: {str(e)}")
+            try:
+                # Simpan features untuk digunakan di halaman lain
+                st.session_state["features"] = selected_predictors
+                
+                df_train, fingerprint, sample_rows = analysis_data(explore, explore_rows, selected_target)
+                start_training(
+                    df_train,
+                    fingerprint,
+                    selected_predictors,
+                    selected_target,
+                    n_estimators,
+                    test_size,
+                    incremental=incremental,
+                    algorithm=algorithm,
+                    sample_rows=sample_rows,
+                )
+                st.rerun()
+            except Exception as e:
+                st.error(f"❌ Error saat analisis: {str(e)}")
+        
+        # -----------------------------------------
+        # TUNING HYPERPARAMETER (CROSS-VALIDATION)
+        # -----------------------------------------
+        with st.expander("🔬 Tuning Hyperparameter (Cross-Validation)", expanded=False):
+            st.caption(
+                "Mencari kombinasi parameter Random Forest terbaik dengan k-fold cross-validation. "
+                "Setiap fold dilatih paralel dan skornya di-cache, lalu model terbaik dipakai sebagai model analisis."
+            )
+            col_method, col_folds = st.columns(2)
+            with col_method:
+                method_label = st.selectbox(
+                    "Metode pencarian",
+                    options=list(SEARCH_METHODS),
+                    key="tuning_method",
+                    help="Successive halving menyeleksi kandidat dengan sedikit trees dulu, "
+                         "lalu hanya kandidat terbaik yang dilatih dengan lebih banyak trees."
+                )
+            with col_folds:
+                n_folds = st.slider("Jumlah fold (k)", min_value=3, max_value=10, value=DEFAULT_FOLDS, key="tuning_folds")
+            method = SEARCH_METHODS[method_label]
+            n_iter = RANDOM_SEARCH_ITER
+            if method == "random":
+                n_iter = st.number_input("Jumlah kandidat acak", min_value=2, max_value=50,
+                                         value=RANDOM_SEARCH_ITER, key="tuning_n_iter")
+            
+            if st.button("🔬 Jalankan Tuning", use_container_width=True, key="run_tuning"):
+                st.session_state["features"] = selected_predictors
+                df_train, fingerprint, sample_rows = analysis_data(explore, explore_rows, selected_target)
+                job = submit_tuning_job(
+                    df_train,
+                    fingerprint,
+                    selected_predictors,
+                    selected_target,
+                    method,
+                    k=n_folds,
+                    n_iter=n_iter,
+                    test_size=test_size,
+                    sample_rows=sample_rows,
+                )
+                st.session_state["tuning_job_id"] = job.id
+                st.rerun()
     else:
         st.info("ℹ️ Pilih variabel prediktor dan target terlebih dahulu untuk menjalankan analisis.")
 
+    # -----------------------------------------
+    # PROGRES TRAINING LATAR BELAKANG
+    # -----------------------------------------
+    notice = st.session_state.pop("training_job_notice", None)
+    if notice is not None:
+        level, text = notice
+        getattr(st, level)(text)
+    
+    if st.session_state.get("training_job_id"):
+        show_training_progress()
+    
+    if st.session_state.get("tuning_job_id"):
+        show_tuning_progress()
+
     # -----------------------------------------
     # TAMPILKAN HASIL JIKA SUDAH ADA
     # -----------------------------------------
@@ -175,6 +253,16 @@ def show_analysis():
         X_cols = st.session_state["X_cols"]
         model = st.session_state["rf_model"]
         
+        base_trees = st.session_state.get("model_base_trees", 0)
+        n_trees = st.session_state.get("training_config", {}).get("n_estimators", 0)
+        if st.session_state.get("model_from_cache"):
+            st.caption("⚡ Hasil diambil dari cache training (data & pengaturan sama dengan training sebelumnya).")
+        elif base_trees > n_trees:
+            st.caption(f"♻️ Hutan dipangkas dari {base_trees} ke {n_trees} trees tanpa training ulang.")
+        elif base_trees:
+            st.caption(f"♻️ Hutan diperbesar dari {base_trees} ke {n_trees} trees "
+                       f"(hanya {n_trees - base_trees} trees baru yang dilatih).")
+        
         # Tampilkan hasil dalam card hijau
         st.markdown("""
         <div style="background: #d4edda; border-radius: 12px; padding: 20px; margin-bottom: 20px; border-left: 4px solid #28a745;">
@@ -191,6 +279,34 @@ def show_analysis():
         </div>
         """, unsafe_allow_html=True)
         
+        n_test = int(cm.sum())
+        acc_low, acc_high = wilson_interval(acc, n_test)
+        st.caption(
+            f"📏 Interval kepercayaan 95% akurasi (Wilson): {acc_low*100:.2f}% – {acc_high*100:.2f}% "
+            f"dari {n_test:,} baris data testing."
+        )
+        
+        sample_rows = st.session_state.get("model_sample_rows")
+        if sample_rows:
+            st.info(
+                f"🧪 Mode eksplorasi: model dilatih pada sampel terstratifikasi {sample_rows:,} "
+                f"dari {len(df_clean):,} baris. Visualisasi juga memakai sampel ini."
+            )
+            if st.button("🚀 Latih Ulang pada Data Penuh", use_container_width=True, key="promote_full_fit"):
+                config = st.session_state["training_config"]
+                start_training(
+                    df_clean,
+                    get_clean_fingerprint(),
+                    X_cols,
+                    st.session_state["model_target"],
+                    config["n_estimators"],
+                    config["test_size"],
+                    incremental=st.session_state.get("incremental_training", True),
+                    algorithm=config["algorithm"],
+                    params=config.get("params"),
+                )
+                st.rerun()
+        
         # Expander untuk detail
         with st.expander("📊 Lihat Confusion Matrix"):
             # Label untuk confusion matrix: 0 = Hipertensi, 1 = Tidak Hipertensi
@@ -204,6 +320,15 @@ def show_analysis():
         with st.expander("🎯 Lihat Feature Importance"):
             plot_feature_importance(model, X_cols)
         
+        tuning = st.session_state.get("tuning_result")
+        if tuning is not None and tuning["model_key"] == st.session_state.get("model_key"):
+            with st.expander("🏆 Leaderboard Tuning Hyperparameter"):
+                st.caption(
+                    f"Parameter terbaik: {tuning['best_params']} · akurasi CV "
+                    f"{tuning['cv_accuracy']*100:.2f}% ({tuning['folds']}-fold)"
+                )
+                st.dataframe(leaderboard_frame(tuning["leaderboard"]), use_container_width=True, hide_index=True)
+        
         # -----------------------------------------
         # TOMBOL SIMPAN MODEL
         # -----------------------------------------
@@ -211,10 +336,31 @@ def show_analysis():
         st.markdown("### 💾 Simpan Model")
         st.info("ℹ️ Simpan model terlatih ke file `.pkl` untuk digunakan nanti di halaman Use Model.")
         
-        model_buffer = save_model_to_file(model, X_cols)
+        compression_label = st.selectbox(
+            "Kompresi file model",
+            options=list(COMPRESSION_LEVELS),
+            index=1,
+            key="model_compression",
+            help="Tanpa kompresi: file lebih besar tetapi dimuat lebih cepat (tanpa dekompresi). Pohon sklearn tetap disalin ke memori saat dimuat.",
+        )
+        
+        # Serialisasi hanya sekali per model (dan level kompresi), bukan di setiap rerun
+        artifact = get_model_artifact(
+            model,
+            X_cols,
+            st.session_state.get("model_encoders", {}),
+            compress=COMPRESSION_LEVELS[compression_label],
+            target=st.session_state.get("target_col"),
+            training=st.session_state.get("training_config", {}),
+            feature_summary=get_feature_summary(X_cols),
+        )
+        st.caption(
+            f"📦 Ukuran file model: {artifact['size'] / (1024 * 1024):.2f} MB · "
+            f"waktu serialisasi: {artifact['seconds']:.2f} detik"
+        )
         st.download_button(
             label="📥 Download Model (.pkl)",
-            data=model_buffer,
+            data=artifact["data"],
             file_name="tensicare_model.pkl",
             mime="application/octet-stream",
             use_container_width=True,
@@ -238,4 +384,156 @@ def show_analysis():
                 st.session_state["page"] = "Data Visualization"
                 st.rerun()
         else:
-            st.button("Next →", use_container_width=True, key="next_btn_disabled", disabled=True)
\ No newline at end of file
+            st.button("Next →", use_container_width=True, key="next_btn_disabled", disabled=True)
+
+def analysis_data(explore, explore_rows, target):
+    """
+    Data untuk training: sampel terstratifikasi di mode eksplorasi (jika clean_df lebih besar
+    dari ukuran sampel), atau clean_df penuh.
+    Returns: tuple (DataFrame, fingerprint, ukuran sampel atau None).
+    """
+    df_clean = st.session_state["clean_df"]
+    if explore and len(df_clean) > explore_rows:
+        df_sample, fingerprint = get_explore_sample(target, explore_rows)
+        return df_sample, fingerprint, len(df_sample)
+    return df_clean, get_clean_fingerprint(), None
+
+
+def start_training(df, fingerprint, predictors, target, n_estimators, test_size,
+                   incremental=True, algorithm="random_forest", params=None, sample_rows=None):
+    """
+    Hasil training di-cache berdasarkan fingerprint data + konfigurasi: jika sudah ada langsung
+    diterapkan, jika belum training berjalan sebagai job latar belakang.
+    """
+    model_key, result, job = submit_training_job(
+        df, fingerprint, predictors, target, n_estimators, test_size,
+        incremental=incremental, algorithm=algorithm, params=params, sample_rows=sample_rows,
+    )
+    if job is None:
+        apply_training_result(model_key, result, {
+            "algorithm": algorithm,
+            "predictors": list(predictors),
+            "target": target,
+            "n_estimators": int(n_estimators),
+            "test_size": float(test_size),
+            "n_rows": int(len(df)),
+            "params": params,
+            "sample_rows": sample_rows,
+        }, from_cache=True)
+        st.session_state["training_job_id"] = None
+        st.session_state["training_job_notice"] = ("success", "✅ Analisis selesai!")
+    else:
+        st.session_state["training_job_id"] = job.id
+
+
+def apply_training_result(model_key, result, meta, from_cache=False):
+    """Menyimpan hasil training (model, metrik, konfigurasi) ke session state."""
+    st.session_state["rf_model"] = result["model"]
+    st.session_state["acc"] = result["acc"]
+    st.session_state["cm"] = result["cm"]
+    st.session_state["report"] = result["report"]
+    st.session_state["X_cols"] = list(meta["predictors"])
+    st.session_state["model_key"] = model_key
+    st.session_state["model_from_cache"] = from_cache
+    st.session_state["model_base_trees"] = result.get("base_trees", 0)
+    st.session_state["model_target"] = meta["target"]
+    st.session_state["model_sample_rows"] = meta.get("sample_rows")
+    st.session_state["training_config"] = {
+        "algorithm": meta.get("algorithm", "random_forest"),
+        "n_estimators": meta["n_estimators"],
+        "test_size": meta["test_size"],
+        "n_rows": meta["n_rows"],
+        "acc": float(result["acc"]),
+    }
+    if meta.get("params"):
+        st.session_state["training_config"]["params"] = meta["params"]
+    if meta.get("cv_accuracy") is not None:
+        st.session_state["training_config"]["cv_accuracy"] = meta["cv_accuracy"]
+    if meta.get("sample_rows"):
+        st.session_state["training_config"]["sample_rows"] = meta["sample_rows"]
+    
+    # Encoder kategorikal yang relevan untuk fitur model ini
+    encoders = st.session_state.get("encoders", {})
+    st.session_state["model_encoders"] = {
+        col: encoders[col] for col in meta["predictors"] if col in encoders
+    }
+
+
+@st.fragment(run_every=1.0)
+def show_training_progress():
+    """Menampilkan progres job training latar belakang (diperbarui tiap detik) + tombol batal."""
+    job = get_job_manager().get(st.session_state.get("training_job_id"))
+    if job is None:
+        st.session_state["training_job_id"] = None
+        return
+    
+    if job.running:
+        model_name = "Random Forest" if job.meta.get("algorithm", "random_forest") == "random_forest" else "HistGradientBoosting"
+        st.progress(
+            job.progress,
+            text=f"⏳ Melatih model {model_name}: {job.message or 'menyiapkan data'} ({job.elapsed:.0f} detik)"
+        )
+        st.caption("Training berjalan di latar belakang; Anda boleh pindah halaman dan kembali lagi nanti.")
+        if st.button("⛔ Batalkan Training", key="cancel_training"):
+            job.cancel()
+        return
+    
+    # Job selesai: terapkan hasilnya lalu render ulang seluruh halaman
+    st.session_state["training_job_id"] = None
+    if job.status == "done":
+        apply_training_result(job.key, job.result, job.meta)
+        st.session_state["training_job_notice"] = ("success", f"✅ Analisis selesai dalam {job.elapsed:.1f} detik!")
+    elif job.status == "cancelled":
+        st.session_state["training_job_notice"] = ("warning", "⛔ Training dibatalkan.")
+    else:
+        st.session_state["training_job_notice"] = ("error", f"❌ Error saat analisis: {job.error}")
+    st.rerun(scope="app")
+
+
+@st.fragment(run_every=1.0)
+def show_tuning_progress():
+    """Menampilkan progres + leaderboard sementara job tuning (diperbarui tiap detik) + tombol batal."""
+    job = get_job_manager().get(st.session_state.get("tuning_job_id"))
+    if job is None:
+        st.session_state["tuning_job_id"] = None
+        return
+    
+    if job.running:
+        st.progress(
+            job.progress,
+            text=f"🔬 Tuning hyperparameter: {job.message or 'menyiapkan fold'} ({job.elapsed:.0f} detik)"
+        )
+        if job.partial:
+            st.dataframe(leaderboard_frame(job.partial).head(10), use_container_width=True, hide_index=True)
+        if st.button("⛔ Batalkan Tuning", key="cancel_tuning"):
+            job.cancel()
+        return
+    
+    # Job selesai: model terbaik menjadi model analisis, lalu render ulang seluruh halaman
+    st.session_state["tuning_job_id"] = None
+    if job.status == "done":
+        best = job.result
+        params = {p: v for p, v in best["best_params"].items() if p != "n_estimators"}
+        apply_training_result(best["key"], best["result"], dict(
+            job.meta,
+            n_estimators=best["best_params"]["n_estimators"],
+            params=params,
+            cv_accuracy=best["cv_accuracy"],
+        ))
+        st.session_state["tuning_result"] = {
+            "model_key": best["key"],
+            "best_params": best["best_params"],
+            "cv_accuracy": best["cv_accuracy"],
+            "folds": job.meta["folds"],
+            "leaderboard": best["leaderboard"],
+        }
+        st.session_state["training_job_notice"] = (
+            "success",
+            f"✅ Tuning selesai dalam {job.elapsed:.1f} detik! Model terbaik: "
+            f"akurasi CV {best['cv_accuracy']*100:.2f}%",
+        )
+    elif job.status == "cancelled":
+        st.session_state["training_job_notice"] = ("warning", "⛔ Tuning dibatalkan.")
+    else:
+        st.session_state["training_job_notice"] = ("error", f"❌ Error saat tuning: {job.error}")
+    st.rerun(scope="app")
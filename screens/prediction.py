@@ -1,227 +1,34 @@
 # pages/prediction.py
+import os
+import time
+from contextlib import nullcontext
 import streamlit as st
 import pandas as pd
 import numpy as np
-from helpers import load_model_from_file
+from model_registry import load_model_shared, resident_models
+from encoders import encoder_mapping
+from helpers import get_packed_forest, packed_forest_key
+from forest_engine import benchmark, synthetic_rows
+from form_schema import get_feature_summary, get_form_schema
+from ingest import STREAMING_THRESHOLD_MB
+from result_export import EXPORT_FORMATS, EXPORT_MIME, build_export, close_exports
+from result_grid import (
+    PAGE_SIZES, SORT_OPTIONS, build_result_index, page_frame, query_positions, read_result_rows,
+    style_page,
+)
+from validation import validate_batch
+from scoring import (
+    BATCH_CHUNK_ROWS, DEFAULT_THRESHOLD, RISK_LABELS, add_batch_stats, attach_predictions,
+    new_batch_stats, new_result_path, predict_with_proba, prepare_features, score_csv_streaming,
+    score_in_pool,
+)
+from parallel_scoring import (
+    DEFAULT_SCORING_WORKERS, SHARDS_PER_WORKER, available_cpus, export_shared_model,
+    scoring_pool,
+)
 
-
-# ===========================================
-# FIELD MAPPING UNTUK USER-FRIENDLY FORM
-# ===========================================
-
-# Mapping nama kolom ke label yang lebih mudah dipahami
-FIELD_LABELS = {
-    # Gender/Sex fields
-    "male": "Jenis Kelamin",
-    "female": "Jenis Kelamin", 
-    "gender": "Jenis Kelamin",
-    "sex": "Jenis Kelamin",
-    "is_male": "Jenis Kelamin",
-    
-    # Age fields
-    "age": "Usia (Tahun)",
-    "umur": "Usia (Tahun)",
-    
-    # Country/Location
-    "country": "Negara",
-    "region": "Wilayah",
-    
-    # Smoking fields
-    "smoking": "Status Merokok",
-    "smoking_status": "Status Merokok",
-    "currentSmoker": "Perokok Aktif",
-    "current_smoker": "Perokok Aktif",
-    "is_smoking": "Status Merokok",
-    "cigsPerDay": "Jumlah Rokok per Hari",
-    "cigs_per_day": "Jumlah Rokok per Hari",
-    
-    # Blood pressure fields
-    "sysBP": "Tekanan Darah Sistolik (mmHg)",
-    "sys_bp": "Tekanan Darah Sistolik (mmHg)",
-    "systolic": "Tekanan Darah Sistolik (mmHg)",
-    "systolic_bp": "Tekanan Darah Sistolik (mmHg)",
-    "blood_pressure_systolic": "Tekanan Darah Sistolik (mmHg)",
-    "diaBP": "Tekanan Darah Diastolik (mmHg)",
-    "dia_bp": "Tekanan Darah Diastolik (mmHg)",
-    "diastolic": "Tekanan Darah Diastolik (mmHg)",
-    "diastolic_bp": "Tekanan Darah Diastolik (mmHg)",
-    "blood_pressure_diastolic": "Tekanan Darah Diastolik (mmHg)",
-    
-    # Medical history fields
-    "diabetes": "Riwayat Diabetes",
-    "has_diabetes": "Riwayat Diabetes",
-    "hypertension": "Riwayat Hipertensi",
-    "has_hypertension": "Riwayat Hipertensi",
-    "BPMeds": "Mengonsumsi Obat Tekanan Darah",
-    "bp_meds": "Mengonsumsi Obat Tekanan Darah",
-    "prevalentStroke": "Riwayat Stroke",
-    "prevalent_stroke": "Riwayat Stroke",
-    "stroke": "Riwayat Stroke",
-    "prevalentHyp": "Riwayat Hipertensi",
-    "prevalent_hyp": "Riwayat Hipertensi",
-    "previous_heart_disease": "Riwayat Penyakit Jantung",
-    "heart_disease": "Riwayat Penyakit Jantung",
-    "family_history": "Riwayat Keluarga",
-    
-    # Physical measurements
-    "BMI": "Indeks Massa Tubuh (BMI)",
-    "bmi": "Indeks Massa Tubuh (BMI)",
-    "obesity": "Status Obesitas",
-    "is_obese": "Status Obesitas",
-    "weight": "Berat Badan (kg)",
-    "height": "Tinggi Badan (cm)",
-    "waist_circumference": "Lingkar Pinggang (cm)",
-    
-    # Lab values
-    "totChol": "Kolesterol Total (mg/dL)",
-    "tot_chol": "Kolesterol Total (mg/dL)",
-    "cholesterol": "Kolesterol Total (mg/dL)",
-    "cholesterol_level": "Tingkat Kolesterol",
-    "cholesterol_hdl": "Kolesterol HDL (mg/dL)",
-    "cholesterol_ldl": "Kolesterol LDL (mg/dL)",
-    "hdl": "Kolesterol HDL (mg/dL)",
-    "ldl": "Kolesterol LDL (mg/dL)",
-    "triglycerides": "Trigliserida (mg/dL)",
-    "glucose": "Kadar Glukosa (mg/dL)",
-    "fasting_blood_sugar": "Gula Darah Puasa (mg/dL)",
-    
-    # Heart rate
-    "heartRate": "Detak Jantung (bpm)",
-    "heart_rate": "Detak Jantung (bpm)",
-    
-    # Activity & Lifestyle
-    "physical_activity": "Tingkat Aktivitas Fisik",
-    "physical_activity_level": "Tingkat Aktivitas Fisik",
-    "activity": "Tingkat Aktivitas Fisik",
-    "exercise": "Frekuensi Olahraga",
-    "alcohol_intake": "Konsumsi Alkohol",
-    "alcohol": "Konsumsi Alkohol",
-    "salt_intake": "Konsumsi Garam",
-    "sleep_duration": "Durasi Tidur (jam)",
-    "sleep": "Durasi Tidur (jam)",
-    "stress_level": "Tingkat Stres",
-    "stress": "Tingkat Stres",
-    
-    # Education & Employment
-    "education": "Tingkat Pendidikan",
-    "education_level": "Tingkat Pendidikan",
-    "employment_status": "Status Pekerjaan",
-    "employment": "Status Pekerjaan",
-    "occupation": "Pekerjaan",
-    "income": "Pendapatan",
-}
-
-# Mapping untuk field binary (0/1) ke opsi yang lebih ramah
-BINARY_OPTIONS = {
-    # Gender fields - 1 biasanya = male, 0 = female
-    "male": {0: "Perempuan", 1: "Laki-laki"},
-    "is_male": {0: "Perempuan", 1: "Laki-laki"},
-    "sex": {0: "Perempuan", 1: "Laki-laki"},
-    "gender": {0: "Perempuan", 1: "Laki-laki"},
-    "jenis_kelamin": {0: "Perempuan", 1: "Laki-laki"},
-    "kelamin": {0: "Perempuan", 1: "Laki-laki"},
-    "female": {0: "Laki-laki", 1: "Perempuan"},
-    "is_female": {0: "Laki-laki", 1: "Perempuan"},
-    
-    # Yes/No fields
-    "smoking": {0: "Tidak Merokok", 1: "Merokok"},
-    "currentSmoker": {0: "Tidak", 1: "Ya"},
-    "current_smoker": {0: "Tidak", 1: "Ya"},
-    "is_smoking": {0: "Tidak Merokok", 1: "Merokok"},
-    "diabetes": {0: "Tidak", 1: "Ya"},
-    "has_diabetes": {0: "Tidak", 1: "Ya"},
-    "hypertension": {0: "Tidak", 1: "Ya"},
-    "has_hypertension": {0: "Tidak", 1: "Ya"},
-    "BPMeds": {0: "Tidak", 1: "Ya"},
-    "bp_meds": {0: "Tidak", 1: "Ya"},
-    "prevalentStroke": {0: "Tidak", 1: "Ya"},
-    "prevalent_stroke": {0: "Tidak", 1: "Ya"},
-    "stroke": {0: "Tidak", 1: "Ya"},
-    "prevalentHyp": {0: "Tidak", 1: "Ya"},
-    "prevalent_hyp": {0: "Tidak", 1: "Ya"},
-    "previous_heart_disease": {0: "Tidak", 1: "Ya"},
-    "heart_disease": {0: "Tidak", 1: "Ya"},
-    "obesity": {0: "Tidak Obesitas", 1: "Obesitas"},
-    "is_obese": {0: "Tidak", 1: "Ya"},
-}
-
-# Mapping untuk field kategorikal dengan nilai tertentu
-CATEGORICAL_OPTIONS = {
-    "smoking_status": {
-        0: "Tidak Pernah Merokok",
-        1: "Mantan Perokok",
-        2: "Perokok Aktif"
-    },
-    "physical_activity": {
-        0: "Rendah",
-        1: "Sedang",
-        2: "Tinggi"
-    },
-    "physical_activity_level": {
-        0: "Rendah",
-        1: "Sedang",
-        2: "Tinggi"
-    },
-    "activity_level": {
-        0: "Rendah",
-        1: "Sedang",
-        2: "Tinggi"
-    },
-    "aktivitas_fisik": {
-        0: "Rendah",
-        1: "Sedang",
-        2: "Tinggi"
-    },
-    "cholesterol_level": {
-        0: "Normal",
-        1: "Tinggi"
-    },
-    "education": {
-        1: "SD/Sederajat",
-        2: "SMP/Sederajat",
-        3: "SMA/Sederajat",
-        4: "Diploma/Sarjana"
-    }
-}
-
-
-def get_friendly_label(feature_name):
-    """Mendapatkan label yang ramah pengguna untuk nama kolom."""
-    # Cek di mapping
-    if feature_name.lower() in {k.lower(): v for k, v in FIELD_LABELS.items()}:
-        for key, label in FIELD_LABELS.items():
-            if key.lower() == feature_name.lower():
-                return label
-    
-    # Fallback: format nama kolom agar lebih readable
-    # Ubah snake_case atau camelCase ke Title Case
-    formatted = feature_name.replace("_", " ").replace("-", " ")
-    # Handle camelCase
-    import re
-    formatted = re.sub('([a-z])([A-Z])', r'\1 \2', formatted)
-    return formatted.title()
-
-
-def get_friendly_options(feature_name, unique_values):
-    """Mendapatkan opsi yang ramah pengguna untuk field."""
-    feature_lower = feature_name.lower()
-    
-    # Cek apakah binary field (0 dan 1)
-    if set(unique_values) == {0, 1} or set(unique_values) == {0.0, 1.0}:
-        # Cek di mapping binary
-        for key, options in BINARY_OPTIONS.items():
-            if key.lower() == feature_lower:
-                return options
-        # Default untuk binary yang tidak dikenal
-        return {0: "Tidak", 1: "Ya"}
-    
-    # Cek di mapping kategorikal
-    for key, options in CATEGORICAL_OPTIONS.items():
-        if key.lower() == feature_lower:
-            return options
-    
-    # Default: return None untuk menggunakan nilai asli
-    return None
+# Jumlah baris maksimum untuk benchmark mesin prediksi
+BENCHMARK_ROWS = 20_000
 
 
 def show_prediction():
@@ -263,6 +70,17 @@ def show_prediction():
         </style>
     """, unsafe_allow_html=True)
     
+    # Ambang keputusan dipakai bersama oleh input manual dan batch prediction
+    st.slider(
+        "🎚️ Ambang Keputusan Risiko",
+        min_value=0.05,
+        max_value=0.95,
+        value=DEFAULT_THRESHOLD,
+        step=0.05,
+        help="Data diprediksi 'Berisiko' jika probabilitas risiko lebih besar dari ambang ini. Default 0.5 sama dengan prediksi standar model.",
+        key="decision_threshold"
+    )
+    
     tab1, tab2 = st.tabs([" Input Manual", " Batch Prediction"])
     
     # ===========================================
@@ -347,8 +165,10 @@ def show_manual_prediction():
         </style>
     """, unsafe_allow_html=True)
 
-    # Ambil data clean untuk referensi nilai min/max
-    df_clean = st.session_state.get("clean_df")
+    # Skema form (jenis input, opsi, rentang, default) dari ringkasan fitur model
+    schema = get_form_schema(features)
+    if any(field["widget"] == "number" and field["min"] is None for field in schema):
+        st.caption("ℹ️ Sebagian input tanpa batas rentang: model tidak menyimpan ringkasan fitur dan data training tidak tersedia di sesi ini.")
     
     # Dictionary untuk menyimpan input values
     input_values = {}
@@ -359,66 +179,45 @@ def show_manual_prediction():
         num_cols = 2
         cols = st.columns(num_cols)
         
-        # Dictionary untuk konversi balik dari label ramah ke nilai asli
-        reverse_mappings = {}
-        
-        for idx, feature in enumerate(features):
+        for idx, field in enumerate(schema):
+            feature = field["feature"]
+            friendly_label = field["label"]
             col_idx = idx % num_cols
             with cols[col_idx]:
-                # Dapatkan label yang ramah pengguna
-                friendly_label = get_friendly_label(feature)
-                
-                # Tentukan tipe input berdasarkan data
-                if df_clean is not None and feature in df_clean.columns:
-                    col_data = df_clean[feature]
-                    unique_vals = sorted(col_data.unique().tolist())
-                    unique_count = len(unique_vals)
-                    
-                    # Jika kolom memiliki sedikit nilai unik (kemungkinan kategorikal)
-                    if unique_count <= 5:
-                        # Coba dapatkan opsi yang ramah pengguna
-                        friendly_options = get_friendly_options(feature, unique_vals)
-                        
-                        if friendly_options:
-                            # Gunakan opsi yang ramah pengguna
-                            display_options = [friendly_options.get(v, str(v)) for v in unique_vals]
-                            reverse_mappings[feature] = {friendly_options.get(v, str(v)): v for v in unique_vals}
-                            
-                            selected_display = st.selectbox(
-                                f"📌 {friendly_label}",
-                                options=display_options,
-                                key=f"input_{feature}",
-                                help=f"Kolom asli: {feature}"
-                            )
-                            # Konversi kembali ke nilai asli
-                            input_values[feature] = reverse_mappings[feature][selected_display]
-                        else:
-                            # Tidak ada mapping, gunakan nilai asli
-                            input_values[feature] = st.selectbox(
-                                f"📌 {friendly_label}",
-                                options=unique_vals,
-                                key=f"input_{feature}",
-                                help=f"Kolom asli: {feature}"
-                            )
+                if field["widget"] == "select":
+                    if field["display"]:
+                        # Gunakan opsi yang ramah pengguna, lalu konversi kembali ke nilai asli
+                        selected_display = st.selectbox(
+                            f"📌 {friendly_label}",
+                            options=field["display"],
+                            key=f"input_{feature}",
+                            help=f"Kolom asli: {feature}"
+                        )
+                        input_values[feature] = field["reverse"][selected_display]
                     else:
-                        # Kolom numerik
-                        min_val = float(col_data.min())
-                        max_val = float(col_data.max())
-                        mean_val = float(col_data.mean())
-                        
-                        input_values[feature] = st.number_input(
+                        # Tidak ada mapping, gunakan nilai asli
+                        input_values[feature] = st.selectbox(
                             f"📌 {friendly_label}",
-                            min_value=min_val,
-                            max_value=max_val,
-                            value=mean_val,
+                            options=field["options"],
                             key=f"input_{feature}",
-                            help=f"Kolom asli: {feature} | Rentang: {min_val:.1f} - {max_val:.1f}"
+                            help=f"Kolom asli: {feature}"
                         )
+                elif field["min"] is not None:
+                    # Kolom numerik
+                    input_values[feature] = st.number_input(
+                        f"📌 {friendly_label}",
+                        min_value=field["min"],
+                        max_value=field["max"],
+                        value=field["default"],
+                        key=f"input_{feature}",
+                        help=f"Kolom asli: {feature} | Rentang: {field['min']:.1f} - {field['max']:.1f}"
+                             + (f" | Median: {field['median']:.1f}" if field["median"] is not None else "")
+                    )
                 else:
                     # Fallback jika tidak ada data referensi
                     input_values[feature] = st.number_input(
                         f"📌 {friendly_label}",
-                        value=0.0,
+                        value=field["default"],
                         key=f"input_{feature}",
                         help=f"Kolom asli: {feature}"
                     )
@@ -431,25 +230,33 @@ def show_manual_prediction():
     # -----------------------------------------
     if submitted:
         try:
-            # Buat DataFrame dari input dengan urutan kolom yang benar
-            input_data = pd.DataFrame([input_values], columns=features)
-            
-            # Lakukan prediksi
-            pred = model.predict(input_data)[0]
+            threshold = st.session_state.get("decision_threshold", DEFAULT_THRESHOLD)
+            packed = get_packed_forest(model, features)
+            forest = packed["forest"]
             
-            # Cek apakah model mendukung predict_proba
-            if hasattr(model, 'predict_proba'):
-                proba = model.predict_proba(input_data)[0]
-                # Ambil probabilitas untuk kelas positif (biasanya kelas 1)
-                if len(proba) > 1:
-                    risk_proba = proba[1] * 100
-                else:
-                    risk_proba = proba[0] * 100
+            start = time.perf_counter()
+            if forest is not None:
+                # Mesin array terkemas: vektor fitur mentah, tanpa DataFrame & dispatch joblib
+                input_row = np.array([[input_values[f] for f in features]], dtype=np.float32)
+                predictions, risk_probas = predict_with_proba(forest, input_row, threshold)
             else:
-                risk_proba = pred * 100
+                # Buat DataFrame dari input dengan urutan kolom yang benar
+                input_data = pd.DataFrame([input_values], columns=features)
+                predictions, risk_probas = predict_with_proba(model, input_data, threshold)
+            latency_ms = (time.perf_counter() - start) * 1000
+            pred, risk_proba = predictions[0], risk_probas[0]
             
             # Tampilkan hasil
             display_prediction_result(pred, risk_proba)
+            if forest is not None:
+                parity = packed["parity"]
+                st.caption(
+                    f"⚡ Waktu prediksi: {latency_ms:.2f} ms (mesin array terkemas, "
+                    f"sklearn ±{parity['sklearn_ms_per_row']:.1f} ms). Hasil identik dengan sklearn "
+                    f"pada {parity['n_rows']:,} baris uji (selisih maks {parity['max_abs_diff']:.1e})."
+                )
+            else:
+                st.caption(f"⚡ Waktu prediksi: {latency_ms:.2f} ms (sklearn)")
             
         except Exception as e:
             st.error(f"❌ Error saat melakukan prediksi: {str(e)}")
@@ -482,12 +289,52 @@ def show_batch_prediction():
     
     # Load model jika diupload
     if uploaded_model is not None:
-        loaded_model, loaded_features = load_model_from_file(uploaded_model)
+        # Model di-deserialize sekali per artefak dan dipakai bersama lewat registry
+        registry_key, loaded_model, header = load_model_shared(uploaded_model)
         if loaded_model is not None:
+            loaded_features = header.get("features", [])
             st.session_state["rf_model"] = loaded_model
+            st.session_state["model_key"] = registry_key
             st.session_state["X_cols"] = loaded_features
             st.session_state["features"] = loaded_features
+            st.session_state["model_encoders"] = header.get("encoders", {})
+            st.session_state["model_header"] = header
+            if header.get("feature_summary"):
+                # Form & validasi batch memakai ringkasan fitur dari artefak, bukan clean_df
+                st.session_state["feature_summary"] = {
+                    "key": registry_key, "summary": header["feature_summary"],
+                }
             st.success(f"✅ Model berhasil dimuat! ({len(loaded_features)} fitur)")
+            
+            # Info dari header artefak (dibaca tanpa memuat pohon model)
+            training = header.get("training") or {}
+            if header.get("format_version"):
+                details = [f"format v{header['format_version']}", header.get("model_class", "")]
+                if header.get("target"):
+                    details.append(f"target `{header['target']}`")
+                if "acc" in training:
+                    details.append(f"akurasi {training['acc'] * 100:.2f}%")
+                if "n_estimators" in training:
+                    details.append(f"{training['n_estimators']} trees")
+                st.caption("📦 " + " · ".join(d for d in details if d))
+    
+    # Daftar model yang sedang dimuat di memori server
+    resident = resident_models()
+    if resident:
+        with st.expander(f"🧠 Model di Memori Server ({len(resident)})"):
+            active_key = st.session_state.get("model_key")
+            st.dataframe(
+                pd.DataFrame([{
+                    "Aktif": "✅" if row["key"] == active_key else "",
+                    "File": row["name"],
+                    "Tipe Model": row["model_class"],
+                    "Jumlah Fitur": row["n_features"],
+                    "Ukuran (MB)": round(row["nbytes"] / (1024 * 1024), 2),
+                    "Hash": row["key"][:12],
+                } for row in resident]),
+                use_container_width=True,
+                hide_index=True,
+            )
     
     # Cek apakah ada model aktif
     model = st.session_state.get("rf_model")
@@ -500,6 +347,8 @@ def show_batch_prediction():
     # Tampilkan info model aktif
     st.success(f"✅ Model aktif dengan {len(features)} fitur: `{', '.join(features[:5])}{'...' if len(features) > 5 else ''}`")
     
+    show_backend_benchmark(model, features)
+    
     # -----------------------------------------
     # UPLOAD CSV DATA BARU
     # -----------------------------------------
@@ -523,8 +372,42 @@ def show_batch_prediction():
     
     if uploaded_csv is not None:
         try:
-            df_new = pd.read_csv(uploaded_csv)
-            st.info(f"📊 Data dimuat: {df_new.shape[0]} baris, {df_new.shape[1]} kolom")
+            file_mb = uploaded_csv.size / (1024 * 1024)
+            streaming = st.toggle(
+                "⚡ Mode streaming (proses per chunk, hemat memori)",
+                value=file_mb > STREAMING_THRESHOLD_MB,
+                help=f"Disarankan untuk file besar (> {STREAMING_THRESHOLD_MB} MB). File dibaca, dikodekan dan diprediksi per {BATCH_CHUNK_ROWS:,} baris; hasil langsung ditulis ke file.",
+                key="batch_streaming"
+            )
+            n_workers = st.number_input(
+                "🧮 Jumlah worker paralel",
+                min_value=1,
+                max_value=available_cpus(),
+                value=min(DEFAULT_SCORING_WORKERS, available_cpus()),
+                step=1,
+                help="Lebih dari 1: data dibagi menjadi shard dan diprediksi di process pool. n_jobs forest di tiap worker diatur otomatis (CPU / worker).",
+                key="batch_workers"
+            )
+            batch_engine = batch_backend(model)
+            if batch_engine == "packed":
+                st.caption("🧠 Mesin prediksi: array terkemas (lebih cepat dari sklearn menurut Benchmark Mesin Prediksi).")
+            else:
+                st.caption("🧠 Mesin prediksi: sklearn. Array terkemas hanya dipakai jika Benchmark Mesin Prediksi menunjukkan lebih cepat untuk model ini.")
+            strict_range = st.toggle(
+                "🚫 Tolak baris di luar rentang data training",
+                value=False,
+                help="Jika aktif, baris dengan nilai di luar min/max data training ditolak (masuk file penolakan). Jika tidak, baris tetap diprediksi dan hanya dihitung sebagai peringatan.",
+                key="batch_strict_range"
+            )
+            
+            if streaming:
+                # Mode streaming: hanya sebagian kecil file dibaca untuk preview & cek kolom
+                df_new = pd.read_csv(uploaded_csv, nrows=1000)
+                uploaded_csv.seek(0)
+                st.info(f"📊 File {file_mb:,.1f} MB, {df_new.shape[1]} kolom (data akan diproses per chunk)")
+            else:
+                df_new = pd.read_csv(uploaded_csv)
+                st.info(f"📊 Data dimuat: {df_new.shape[0]} baris, {df_new.shape[1]} kolom")
             
             # Preview data
             with st.expander("🔍 Preview Data (5 baris pertama)"):
@@ -541,7 +424,7 @@ def show_batch_prediction():
             
             # Jika ada fitur yang hilang, cek apakah masih bisa diprediksi
             if missing_features:
-                st.warning(f"⚠️ Kolom berikut tidak ditemukan di CSV: `{', '.join(missing_features)}`")
+                st.warning(f"⚠️ Kolom berikut tidak ditemukan di CSV dan akan diisi median data training (atau 0 jika model tidak menyimpan ringkasan fitur): `{', '.join(missing_features)}`")
                 
                 # Jika tidak ada fitur yang tersedia, tidak bisa prediksi
                 if not available_features:
@@ -558,62 +441,90 @@ def show_batch_prediction():
             
             # Tombol prediksi batch
             if st.button("🚀 Prediksi Batch", use_container_width=True, key="run_batch_pred"):
-                with st.spinner("⏳ Sedang melakukan prediksi..."):
-                    # Ambil kolom yang tersedia
-                    X_new = df_new[available_features].copy()
-                    
-                    # Jika ada fitur yang hilang, isi dengan nilai default (0 atau median)
-                    if missing_features:
-                        for feat in missing_features:
-                            X_new[feat] = 0  # Default value
-                    
-                    # Urutkan kolom sesuai dengan urutan fitur model
-                    X_new = X_new[features]
-                    
-                    # Konversi kolom kategorikal (string) ke numerik
-                    categorical_cols = X_new.select_dtypes(include=['object', 'category']).columns.tolist()
-                    encoding_info = {}
+                # Gunakan encoder yang disimpan saat training agar kode kategori konsisten
+                model_encoders = st.session_state.get("model_encoders") or {}
+                threshold = st.session_state.get("decision_threshold", DEFAULT_THRESHOLD)
+                summary = get_feature_summary(features)
+                clear_batch_result()
+                
+                # Mesin prediksi (array terkemas hanya dipakai jika lebih cepat dan lolos cek kesamaan)
+                scoring_model, backend = model, "sklearn"
+                if batch_engine == "packed":
+                    forest = get_packed_forest(model, features)["forest"]
+                    if forest is not None:
+                        scoring_model, backend = forest, "packed"
+                    else:
+                        st.warning("⚠️ Model ini tidak bisa dikemas ke array, prediksi memakai sklearn.")
+                
+                model_path = None
+                if n_workers > 1:
+                    model_id = st.session_state.get("model_key") or f"obj{id(model)}"
+                    model_path = export_shared_model(scoring_model, f"{model_id}-{backend}", features)
+                # pool dipegang selama prediksi agar tidak dimatikan oleh sesi lain
+                pool = scoring_pool(int(n_workers)) if n_workers > 1 else nullcontext()
+                with pool as executor:
+                    start = time.perf_counter()
                     
-                    if categorical_cols:
-                        st.info(f"🔄 Mengkonversi kolom kategorikal ke numerik: `{', '.join(categorical_cols)}`")
-                        from sklearn.preprocessing import LabelEncoder
+                    reject_path = new_result_path()
+                    if streaming:
+                        out_path = new_result_path()
+                        progress = st.progress(0.0, text="⏳ Memprediksi per chunk...")
                         
-                        for col in categorical_cols:
-                            le = LabelEncoder()
-                            # Handle missing values
-                            X_new[col] = X_new[col].fillna('Unknown')
-                            X_new[col] = le.fit_transform(X_new[col].astype(str))
-                            encoding_info[col] = dict(zip(le.classes_, le.transform(le.classes_)))
+                        def on_progress(fraction, rows_done):
+                            progress.progress(fraction, text=f"⏳ {rows_done:,} baris diprediksi ({fraction:.0%})")
                         
-                        # Tampilkan mapping encoding di expander
-                        with st.expander("📋 Mapping Encoding Kolom Kategorikal"):
-                            for col, mapping in encoding_info.items():
-                                st.write(f"**{col}:** {mapping}")
-                    
-                    # Prediksi
-                    predictions = model.predict(X_new)
-                    
-                    # Probabilitas jika tersedia
-                    if hasattr(model, 'predict_proba'):
-                        proba = model.predict_proba(X_new)
-                        risk_proba = proba[:, 1] * 100 if proba.shape[1] > 1 else proba[:, 0] * 100
+                        stats = score_csv_streaming(
+                            uploaded_csv, uploaded_csv.size, scoring_model, features, model_encoders, out_path,
+                            threshold=threshold, progress_callback=on_progress,
+                            executor=executor, model_path=model_path, max_in_flight=int(n_workers) + 1,
+                            summary=summary, reject_path=reject_path, strict_range=strict_range,
+                        )
+                        progress.empty()
+                        
+                        st.session_state["batch_result"] = stats.pop("preview")
+                        st.session_state["batch_result_path"] = out_path
+                        # indeks tabel dari seluruh hasil (bukan preview) jika baris file bisa dibaca per posisi
+                        result_columns, row_offsets = stats.pop("result_columns"), stats.pop("row_offsets")
+                        if row_offsets is not None:
+                            st.session_state["batch_result_index"] = build_result_index(*result_columns)
+                            st.session_state["batch_result_offsets"] = row_offsets
+                        legacy_cols = stats.pop("legacy_cols")
+                        st.session_state["batch_stats"] = stats
                     else:
-                        risk_proba = predictions * 100
-                    
-                    # Tambahkan hasil ke dataframe
-                    df_result = df_new.copy()
-                    df_result['Prediksi'] = predictions
-                    df_result['Label_Prediksi'] = df_result['Prediksi'].map({0: 'Tidak Berisiko', 1: 'Berisiko'})
-                    df_result['Probabilitas_Risiko (%)'] = risk_proba.round(2)
-                    
-                    # Simpan hasil ke session state
-                    st.session_state["batch_result"] = df_result
-                    st.session_state["batch_stats"] = {
-                        "total": len(predictions),
-                        "berisiko": int((predictions == 1).sum()),
-                        "tidak_berisiko": int((predictions == 0).sum())
-                    }
-                    
+                        with st.spinner("⏳ Sedang melakukan prediksi..."):
+                            # Validasi kolumnar dulu: baris yang tidak valid dipisah ke file penolakan
+                            df_new, rejected, validation = validate_batch(
+                                df_new, features, summary, model_encoders, strict_range
+                            )
+                            if len(rejected):
+                                rejected.to_csv(reject_path, index=False)
+                            X_new, encoding = prepare_features(df_new, features, model_encoders, validation["fill_values"])
+                            if executor is not None:
+                                predictions, risk_proba = score_in_pool(
+                                    executor, model_path, X_new, threshold,
+                                    n_shards=int(n_workers) * SHARDS_PER_WORKER,
+                                )
+                            else:
+                                predictions, risk_proba = predict_with_proba(scoring_model, X_new, threshold)
+                            
+                            # Tambahkan hasil ke dataframe (df_new milik rerun ini, tidak perlu disalin)
+                            df_result = attach_predictions(df_new, predictions, risk_proba)
+                            legacy_cols = encoding["legacy_cols"]
+                            
+                            # Simpan hasil ke session state
+                            st.session_state["batch_result"] = df_result
+                            st.session_state["batch_stats"] = new_batch_stats()
+                            add_batch_stats(
+                                st.session_state["batch_stats"], predictions,
+                                dict(encoding, validation=validation),
+                            )
+                
+                st.session_state["batch_stats"]["seconds"] = time.perf_counter() - start
+                st.session_state["batch_stats"]["backend"] = backend
+                if st.session_state["batch_stats"].get("rejected"):
+                    st.session_state["batch_reject_path"] = reject_path
+                if legacy_cols:
+                    st.session_state["batch_stats"]["legacy_cols"] = legacy_cols
                 st.success("✅ Prediksi batch selesai!")
                 st.rerun()
         
@@ -658,39 +569,275 @@ def show_batch_prediction():
         
         st.markdown("<br>", unsafe_allow_html=True)
         
-        # Tabel hasil
-        st.markdown("#### 📋 Tabel Hasil Prediksi")
+        if stats.get("seconds"):
+            st.caption(
+                f"⏱️ {stats.get('total', 0):,} baris diprediksi dalam {stats['seconds']:.2f} detik "
+                f"({stats.get('total', 0) / stats['seconds']:,.0f} baris/detik, mesin {stats.get('backend', 'sklearn')})."
+            )
+        if stats.get("validation_seconds"):
+            st.caption(
+                f"🧪 Validasi: {stats.get('validated_rows', 0):,} baris dalam {stats['validation_seconds']:.2f} detik "
+                f"({stats.get('validated_rows', 0) / stats['validation_seconds']:,.0f} baris/detik), "
+                f"{stats.get('rejected', 0):,} baris ditolak."
+            )
         
-        def highlight_risk(row):
-            if row['Prediksi'] == 1:
-                return ['background-color: #f8d7da'] * len(row)
-            else:
-                return ['background-color: #d4edda'] * len(row)
+        reject_counts = stats.get("reject_counts") or {}
+        if reject_counts:
+            detail = ", ".join(f"{reason} ({n:,} baris)" for reason, n in reject_counts.items())
+            st.error(f"❌ {stats.get('rejected', 0):,} baris ditolak dan tidak diprediksi: {detail}")
         
-        st.dataframe(
-            df_result.style.apply(highlight_risk, axis=1),
-            use_container_width=True,
-            height=400
-        )
+        fill_values = stats.get("fill_values") or {}
+        if fill_values:
+            detail = ", ".join(f"{col} = {value:,.2f}" for col, value in fill_values.items())
+            st.info(f"ℹ️ Kolom yang tidak ada di CSV diisi: {detail}")
+        
+        unknown_counts = stats.get("unknown_categories") or {}
+        if unknown_counts:
+            detail = ", ".join(f"{col} ({n:,} baris)" for col, n in unknown_counts.items())
+            st.warning(f"⚠️ Kategori tidak dikenal/kosong diberi kode -1: {detail}")
+        
+        out_of_range = stats.get("out_of_range") or {}
+        if out_of_range:
+            detail = ", ".join(f"{col} ({n:,} baris)" for col, n in out_of_range.items())
+            st.warning(f"⚠️ Nilai di luar rentang data training (model mungkin kurang akurat): {detail}")
+        
+        legacy_cols = stats.get("legacy_cols") or []
+        if legacy_cols:
+            st.warning(f"⚠️ Model tidak menyimpan encoder untuk kolom `{', '.join(legacy_cols)}`. Kode kategori dibuat ulang dari batch ini dan bisa berbeda dari saat training.")
+        
+        model_encoders = st.session_state.get("model_encoders") or {}
+        encoded_cols = [col for col in features if col in model_encoders]
+        if encoded_cols:
+            # Tampilkan mapping encoding di expander
+            with st.expander("📋 Mapping Encoding Kolom Kategorikal"):
+                for col in encoded_cols:
+                    st.write(f"**{col}:** {encoder_mapping(model_encoders[col])}")
+        
+        # Tabel hasil
+        st.markdown("#### 📋 Tabel Hasil Prediksi")
+        result_path = st.session_state.get("batch_result_path")
+        if result_path and not os.path.exists(result_path):
+            result_path = None
+        show_result_grid(df_result, result_path, stats.get("total", 0))
         
         # Download hasil
         st.markdown("#### 📥 Download Hasil")
-        csv_buffer = df_result.to_csv(index=False).encode('utf-8')
+        show_result_export(df_result, result_path)
         
+        reject_path = st.session_state.get("batch_reject_path")
+        if stats.get("rejected") and reject_path and os.path.exists(reject_path):
+            show_reject_export(reject_path, stats["rejected"])
+        
+        # Tombol reset
+        if st.button("🔄 Reset Hasil", key="reset_batch"):
+            clear_batch_result()
+            st.rerun()
+
+
+@st.fragment
+def show_result_grid(df_result, result_path=None, total_rows: int = 0):
+    """
+    Tabel hasil batch per halaman: filter Prediksi + rentang probabilitas dan pengurutan
+    memakai indeks yang dibuat sekali per hasil; hanya baris di halaman aktif yang diwarnai
+    dan dikirim ke browser. Fragment: ganti halaman/filter hanya menjalankan ulang tabel ini,
+    bukan bagian download di bawahnya.
+    result_path: CSV hasil mode streaming. Indeks mencakup seluruh hasil dan baris halaman
+    dibaca dari file per posisi; jika offset baris tidak tersedia, tabel hanya menampilkan
+    preview (df_result) tanpa filter/pengurutan agar tidak dikira mewakili seluruh hasil.
+    """
+    offsets = st.session_state.get("batch_result_offsets")
+    preview_only = result_path is not None and offsets is None
+    index = st.session_state.get("batch_result_index")
+    if index is None:
+        index = build_result_index(df_result["Prediksi"].to_numpy(), df_result["Probabilitas_Risiko (%)"].to_numpy())
+        st.session_state["batch_result_index"] = index
+    if preview_only:
+        st.caption(f"Tabel berisi {len(df_result):,} baris pertama dari {total_rows:,} baris (filter & pengurutan tidak tersedia). Hasil lengkap tersedia di tombol download.")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        class_filter = st.selectbox(
+            "Filter Prediksi",
+            options=[None] + [cls for cls in RISK_LABELS if cls in index],
+            format_func=lambda cls: "Semua" if cls is None else RISK_LABELS[cls],
+            disabled=preview_only,
+            key="result_filter"
+        )
+    with col2:
+        sort_label = st.selectbox("Urutkan", options=list(SORT_OPTIONS.keys()), disabled=preview_only, key="result_sort")
+    with col3:
+        page_size = st.selectbox("Baris per halaman", options=PAGE_SIZES, index=1, key="result_page_size")
+    proba_range = st.slider(
+        "Rentang Probabilitas Risiko (%)",
+        min_value=0.0, max_value=100.0, value=(0.0, 100.0), step=0.5,
+        disabled=preview_only,
+        key="result_proba_range"
+    )
+    if preview_only:
+        class_filter, sort_label, proba_range = None, next(iter(SORT_OPTIONS)), (0.0, 100.0)
+    
+    positions = query_positions(index, class_filter, proba_range, SORT_OPTIONS[sort_label])
+    n_pages = max((len(positions) + page_size - 1) // page_size, 1)
+    # nilai awal lewat session state (bukan value=) agar bisa dikoreksi tanpa peringatan Streamlit;
+    # halaman lama bisa melebihi jumlah halaman setelah filter berubah
+    if "result_page" not in st.session_state:
+        st.session_state["result_page"] = 1
+    elif st.session_state["result_page"] > n_pages:
+        st.session_state["result_page"] = n_pages
+    page = st.number_input(f"Halaman (dari {n_pages:,})", min_value=1, max_value=n_pages, step=1, key="result_page")
+    
+    if result_path is not None and offsets is not None:
+        page_df = read_result_rows(result_path, offsets, positions, int(page), page_size)
+    else:
+        page_df = page_frame(df_result, positions, int(page), page_size)
+    if len(positions):
+        first = (int(page) - 1) * page_size + 1
+        st.caption(f"Baris {first:,}–{first + len(page_df) - 1:,} dari {len(positions):,} hasil yang cocok ({len(index[None]['proba']):,} total).")
+    else:
+        st.info("ℹ️ Tidak ada baris yang cocok dengan filter.")
+    st.dataframe(style_page(page_df), use_container_width=True, height=400)
+
+
+def drop_batch_export(fmt: str):
+    """Callback tombol download: file ekspor yang sudah dikirim ditutup dan dilepas dari session."""
+    exports = st.session_state.get("batch_exports") or {}
+    close_exports({fmt: exports.pop(fmt)} if fmt in exports else None)
+
+
+def show_result_export(df_result, result_path=None):
+    """
+    Ekspor hasil batch: file dibuat hanya saat diminta dan sekali per hasil + format
+    (disimpan di session state), bukan di setiap rerun. Setelah di-download file dilepas,
+    agar rerun berikutnya tidak membaca ulang seluruh file.
+    result_path: CSV hasil mode streaming (df_result hanya preview).
+    """
+    export_label = st.selectbox("Format file", options=list(EXPORT_FORMATS.keys()), key="export_format")
+    fmt = EXPORT_FORMATS[export_label]
+    exports = st.session_state.get("batch_exports") or {}
+    export = exports.get(fmt)
+    
+    if export is None:
+        if st.button(f"⚙️ Siapkan File {export_label}", use_container_width=True, key="prepare_export"):
+            with st.spinner("⏳ Menulis file ekspor..."):
+                if result_path:
+                    export = build_export(fmt, path=result_path)
+                else:
+                    export = build_export(fmt, df=df_result)
+            exports[fmt] = export
+            st.session_state["batch_exports"] = exports
+    
+    if export is not None:
+        st.caption(
+            f"📦 Ukuran file: {export['size'] / (1024 * 1024):.2f} MB · "
+            f"waktu ekspor: {export['seconds']:.2f} detik"
+        )
+        export["file"].seek(0)
         st.download_button(
-            label="📥 Download Hasil Prediksi (CSV)",
-            data=csv_buffer,
-            file_name="hasil_prediksi_batch.csv",
-            mime="text/csv",
+            label=f"📥 Download Hasil Prediksi ({export_label})",
+            data=export["file"].read(),
+            file_name=f"hasil_prediksi_batch.{fmt}",
+            mime=EXPORT_MIME[fmt],
+            on_click=drop_batch_export,
+            args=(fmt,),
             use_container_width=True,
             key="download_batch_result"
         )
+
+
+def release_reject_export():
+    """Callback tombol download baris ditolak: file tidak dibaca lagi di rerun berikutnya."""
+    st.session_state["batch_rejects_ready"] = False
+
+
+def show_reject_export(reject_path: str, n_rejected: int):
+    """File baris ditolak dibaca hanya setelah diminta, dan dilepas lagi setelah di-download."""
+    if not st.session_state.get("batch_rejects_ready"):
+        if st.button(f"⚙️ Siapkan File Baris Ditolak ({n_rejected:,} baris)", use_container_width=True, key="prepare_rejects"):
+            st.session_state["batch_rejects_ready"] = True
+        else:
+            return
+    
+    with open(reject_path, "rb") as f:
+        st.download_button(
+            label=f"📥 Download Baris Ditolak ({n_rejected:,} baris, CSV + alasan)",
+            data=f.read(),
+            file_name="baris_ditolak_batch.csv",
+            mime="text/csv",
+            on_click=release_reject_export,
+            use_container_width=True,
+            key="download_batch_rejects"
+        )
+
+
+def batch_backend(model) -> str:
+    """
+    Mesin prediksi batch: 'packed' hanya jika benchmark model aktif (jumlah baris terbanyak)
+    menunjukkan array terkemas lebih cepat dari sklearn, selain itu 'sklearn'.
+    """
+    bench = st.session_state.get("backend_benchmark")
+    if bench is not None and bench["key"] == packed_forest_key(model) and bench.get("batch_speedup", 0.0) > 1.0:
+        return "packed"
+    return "sklearn"
+
+
+def show_backend_benchmark(model, features):
+    """
+    Membandingkan kecepatan mesin sklearn dan array terkemas untuk model aktif.
+    Model baru dikemas saat benchmark dijalankan, bukan setiap kali halaman dirender.
+    """
+    with st.expander("⏱️ Benchmark Mesin Prediksi"):
+        if st.button("⏱️ Jalankan Benchmark", key="run_backend_benchmark"):
+            packed = get_packed_forest(model, features)
+            forest = packed["forest"]
+            bench = {"key": packed["key"], "summary": None, "rows": [], "batch_speedup": 0.0}
+            if forest is not None:
+                bench["summary"] = (
+                    f"Model dikemas menjadi {forest.n_trees} pohon, {len(forest.feature):,} node "
+                    f"({forest.nbytes / (1024 * 1024):.1f} MB), kedalaman maks {forest.max_depth}."
+                )
+                df_clean = st.session_state.get("clean_df")
+                if df_clean is not None and all(f in df_clean.columns for f in features):
+                    X_bench = df_clean[features].head(BENCHMARK_ROWS)
+                else:
+                    X_bench = synthetic_rows(forest, BENCHMARK_ROWS)
+                
+                with st.spinner("⏳ Mengukur kecepatan..."):
+                    for n_rows in (1, 100, len(X_bench)):
+                        result = benchmark(model, forest, X_bench[:n_rows])
+                        bench["batch_speedup"] = result["speedup"]   # baris terbanyak diukur terakhir
+                        bench["rows"].append({
+                            "Jumlah Baris": result["n_rows"],
+                            "sklearn (baris/detik)": round(result["sklearn_rows_per_s"]),
+                            "Array terkemas (baris/detik)": round(result["packed_rows_per_s"]),
+                            "Percepatan": f"{result['speedup']:.2f}x",
+                            "Selisih Maks": f"{result['max_abs_diff']:.1e}",
+                        })
+            st.session_state["backend_benchmark"] = bench
         
-        # Tombol reset
-        if st.button("🔄 Reset Hasil", key="reset_batch"):
-            st.session_state["batch_result"] = None
-            st.session_state["batch_stats"] = None
-            st.rerun()
+        bench = st.session_state.get("backend_benchmark")
+        if bench is None or bench["key"] != packed_forest_key(model):
+            st.caption("Model dikemas ke array saat benchmark dijalankan. Hasilnya menentukan mesin prediksi batch.")
+        elif bench["summary"] is None:
+            st.info("ℹ️ Model ini tidak bisa dikemas ke array (bukan Random Forest klasifikasi), hanya mesin sklearn yang tersedia.")
+        else:
+            st.caption(bench["summary"])
+            st.dataframe(pd.DataFrame(bench["rows"]), use_container_width=True, hide_index=True)
+
+
+def clear_batch_result():
+    """Menghapus hasil batch sebelumnya dari session state (termasuk file hasil streaming)."""
+    close_exports(st.session_state.get("batch_exports"))
+    st.session_state["batch_exports"] = None
+    st.session_state["batch_rejects_ready"] = False
+    for path_key in ("batch_result_path", "batch_reject_path"):
+        result_path = st.session_state.get(path_key)
+        if result_path and os.path.exists(result_path):
+            os.remove(result_path)
+        st.session_state[path_key] = None
+    st.session_state["batch_result"] = None
+    st.session_state["batch_result_index"] = None
+    st.session_state["batch_result_offsets"] = None
+    st.session_state["batch_stats"] = None
 
 
 def display_prediction_result(pred, risk_proba):
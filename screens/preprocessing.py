@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
-from helpers import preprocess_data
+from helpers import preprocess_data, find_irrelevant_columns
+from profiling import get_dataset_profile
 
 
 def show_preprocessing():
@@ -16,8 +17,31 @@ def show_preprocessing():
         return
     
     df_raw = st.session_state["raw_df"]
-    duplicates_count = df_raw.duplicated().sum()
-    null_count = df_raw.isna().sum().sum()
+
+    # -----------------------------------------
+    # ATURAN KOLOM TIDAK RELEVAN (bisa ditambah pengguna)
+    # -----------------------------------------
+    with st.expander("⚙️ Aturan Kolom Tidak Relevan (Opsional)", expanded=False):
+        st.caption(
+            "Kolom dihapus jika namanya ada di daftar bawaan atau mengandung token "
+            "identitas (`id`, `index`, `unnamed`) sebagai kata utuh. Pisahkan dengan koma."
+        )
+        extra_exact = st.text_input("Nama kolom tambahan yang dihapus", key="rules_exact")
+        extra_tokens = st.text_input("Token tambahan (kata utuh) yang dihapus", key="rules_tokens")
+        extra_protected = st.text_input("Kolom yang selalu dipertahankan", key="rules_protected")
+
+    column_rules = {
+        "exact": [t.strip() for t in extra_exact.split(",") if t.strip()],
+        "tokens": [t.strip() for t in extra_tokens.split(",") if t.strip()],
+        "protected": [t.strip() for t in extra_protected.split(",") if t.strip()],
+    }
+    st.session_state["column_rules"] = column_rules
+
+    # Profil dihitung sekali per dataset lalu dipakai ulang oleh preprocess_data
+    drop_reasons = find_irrelevant_columns(df_raw.columns, column_rules)
+    profile = get_dataset_profile(df_raw, list(drop_reasons))
+    duplicates_count = profile["duplicates"]
+    null_count = profile["missing_total"]
 
     # -----------------------------------------
     # CARD 1: Jumlah Baris & Jumlah Kolom (side by side)
@@ -90,13 +114,14 @@ def show_preprocessing():
     if button_clicked:
         with st.spinner("⏳ Sedang memproses data..."):
             # Panggil fungsi preprocess_data dari helpers
-            clean_df, info = preprocess_data(df_raw)
+            clean_df, info = preprocess_data(df_raw, profile=profile, column_rules=column_rules)
             
             info["transform_applied"] = "Tidak ada"
             
             # Simpan hasil preprocessing ke session_state
             st.session_state["clean_df"] = clean_df
             st.session_state["preprocess_info"] = info
+            st.session_state["clean_fingerprint"] = None  # dihitung ulang saat dibutuhkan
         
         st.success("✅ Preprocessing selesai!")
         st.rerun()
@@ -117,6 +142,8 @@ def show_preprocessing():
         cols_after = info.get('cols_after', info.get('cols', 0))
         cols_dropped = info.get('cols_dropped', [])
         cols_dropped_count = info.get('cols_dropped_count', 0)
+        memory_after = info.get('memory_after', clean_df.memory_usage(deep=True).sum())
+        memory_saved = max(info.get('memory_before', memory_after) - memory_after, 0)
         
         st.markdown("""
         <div style="background: #d4edda; border-radius: 12px; padding: 20px; margin-bottom: 20px; border-left: 4px solid #28a745;">
@@ -141,6 +168,11 @@ def show_preprocessing():
                     <div style="font-weight: 600; color: #155724;">Transformasi</div>
                     <div style="font-size: 1.5rem; color: #155724;">""" + transform_applied + """</div>
                 </div>
+                <div style="text-align: center;">
+                    <div style="font-weight: 600; color: #155724;">Ukuran Data</div>
+                    <div style="font-size: 1.5rem; color: #155724;">""" + f"{memory_after / 1024:,.2f} KB" + """</div>
+                    <div style="font-size: 0.8rem; color: #155724;">hemat """ + f"{memory_saved / 1024:,.2f} KB" + """</div>
+                </div>
             </div>
         </div>
         """, unsafe_allow_html=True)
@@ -153,6 +185,16 @@ def show_preprocessing():
                 <div style="color: #856404; font-size: 0.95rem;">""" + ", ".join(cols_dropped) + """</div>
             </div>
             """, unsafe_allow_html=True)
+
+            # Alasan setiap kolom dihapus
+            drop_reasons = info.get('cols_dropped_reasons', {})
+            if drop_reasons:
+                with st.expander("🔎 Alasan Kolom Dihapus"):
+                    st.dataframe(
+                        pd.DataFrame({'Kolom': list(drop_reasons), 'Alasan': list(drop_reasons.values())}),
+                        use_container_width=True,
+                        hide_index=True,
+                    )
         
         # Preview data hasil preprocessing
         with st.expander("🔍 Preview Data Hasil Preprocessing"):
@@ -1,5 +1,6 @@
 import streamlit as st
-import pandas as pd
+from cache import load_csv_cached
+from ingest import STREAMING_THRESHOLD_MB
 
 # Fungsi utama halaman "Input Dataset"
 def show_upload_dataset():
@@ -238,7 +239,32 @@ def show_upload_dataset():
 
     if uploaded_file is not None:
         try:
-            df = pd.read_csv(uploaded_file)
+            # Mode streaming: baca per chunk untuk file besar agar memori tetap terkendali
+            file_size_mb = uploaded_file.size / (1024 * 1024)
+            streaming = st.toggle(
+                "⚡ Mode streaming (untuk file besar)",
+                value=file_size_mb > STREAMING_THRESHOLD_MB,
+                help="Membaca file per bagian (chunk) dan memadatkan tipe data per chunk, "
+                     "sehingga file berukuran sangat besar tidak menghabiskan memori.",
+                key="upload_streaming",
+            )
+
+            progress_bar = None
+            if streaming:
+                progress_bar = st.progress(0.0, text="⏳ Membaca file...")
+
+            def update_progress(fraction, rows_read):
+                progress_bar.progress(fraction, text=f"⏳ Membaca file... {rows_read:,} baris")
+
+            # Parse hanya sekali per isi file; rerun berikutnya memakai cache
+            key, entry = load_csv_cached(
+                uploaded_file,
+                streaming=streaming,
+                progress_callback=update_progress if streaming else None,
+            )
+            if progress_bar is not None:
+                progress_bar.empty()
+            df = entry["df"]
             st.session_state["raw_df"] = df
             st.success("✅ Dataset berhasil diupload!")
             
@@ -258,7 +284,12 @@ def show_upload_dataset():
                     </div>
                     <div style="flex: 1; background: linear-gradient(135deg, #A67D45 0%, #8B6914 100%); padding: 20px; border-radius: 12px; text-align: center; color: white; box-shadow: 0 4px 15px rgba(166, 125, 69, 0.3);">
                         <div style="font-size: 0.9rem; opacity: 0.9; margin-bottom: 5px;">💾 Ukuran Data</div>
-                        <div style="font-size: 2rem; font-weight: 700;">{df.memory_usage(deep=True).sum() / 1024:.2f} KB</div>
+                        <div style="font-size: 2rem; font-weight: 700;">{entry['nbytes'] / 1024:.2f} KB</div>
+                    </div>
+                    <div style="flex: 1; background: linear-gradient(135deg, #899581 0%, #7a8672 100%); padding: 20px; border-radius: 12px; text-align: center; color: white; box-shadow: 0 4px 15px rgba(137, 149, 129, 0.3);">
+                        <div style="font-size: 0.9rem; opacity: 0.9; margin-bottom: 5px;">🗜️ Hemat Memori</div>
+                        <div style="font-size: 2rem; font-weight: 700;">{max(entry['bytes_before'] - entry['nbytes'], 0) / 1024:.2f} KB</div>
+                        <div style="font-size: 0.8rem; opacity: 0.9;">dari {entry['bytes_before'] / 1024:.2f} KB sebelum dipadatkan</div>
                     </div>
                 </div>
                 """,
@@ -272,13 +303,7 @@ def show_upload_dataset():
             #  INFORMASI TIPE & MISSING
             # -----------------------------
             st.markdown("###  Informasi Kolom")
-            col_info = pd.DataFrame({
-                'Kolom': df.columns,              
-                'Tipe Data': df.dtypes.values,    
-                'Non-Null Count': df.count().values,   
-                'Null Count': df.isna().sum().values   
-            })
-            st.dataframe(col_info, use_container_width=True)
+            st.dataframe(entry["col_info"], use_container_width=True)
 
             # Tombol untuk langsung pindah ke halaman preprocessing (positioned right)
             col1, col2, col3 = st.columns([3, 1, 1])
@@ -17,8 +17,10 @@ def show_visualization():
             st.rerun()
         return
     
-    # Ambil data dari session state
+    # Ambil data dari session state (sampel mode eksplorasi jika model dilatih pada sampel)
     df = st.session_state.get("clean_df")
+    if st.session_state.get("model_sample_rows") and st.session_state.get("explore_df") is not None:
+        df = st.session_state["explore_df"]
     model = st.session_state.get("rf_model")
     acc = st.session_state.get("acc", 0)
     X_cols = st.session_state.get("X_cols", [])
@@ -59,6 +61,12 @@ def show_visualization():
             <div style="color: #856404; font-size: 2.2rem; font-weight: bold;">{len(df):,}</div>
         </div>
         """, unsafe_allow_html=True)
+    
+    if df is not st.session_state.get("clean_df"):
+        st.caption(
+            f"🧪 Mode eksplorasi: visualisasi memakai sampel terstratifikasi {len(df):,} "
+            f"dari {len(st.session_state['clean_df']):,} baris."
+        )
 
     st.markdown("<br>", unsafe_allow_html=True)
 
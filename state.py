@@ -12,6 +12,10 @@ def init_session_state():
     if "raw_df" not in st.session_state:
         st.session_state["raw_df"] = None
 
+    # Kunci cache (hash isi file) dari dataset mentah yang sedang aktif
+    if "raw_key" not in st.session_state:
+        st.session_state["raw_key"] = None
+
     if "clean_df" not in st.session_state:
         st.session_state["clean_df"] = None
 
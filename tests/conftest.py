@@ -0,0 +1,6 @@
+# conftest.py
+import os
+import sys
+
+# modul aplikasi berada di root repo (bukan paket), jadi root ditambahkan ke sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,48 @@
+# test_artifact.py
+import io
+import os
+import time
+
+import numpy as np
+
+import artifact
+
+
+def test_uploaded_artifact_loads_from_buffer_without_spooling(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifact, "SPOOL_DIR", str(tmp_path / "spool"))
+    for compress in (0, 3):
+        buf = io.BytesIO()
+        artifact.write_artifact(buf, {"nilai": np.arange(5)}, {"features": ["a"]}, compress=compress)
+
+        model, header = artifact.load_artifact(buf)
+
+        assert model["nilai"].tolist() == [0, 1, 2, 3, 4]
+        assert header["features"] == ["a"]
+    assert not os.path.exists(tmp_path / "spool")
+
+
+def test_uncompressed_artifact_on_disk_is_memory_mapped(tmp_path):
+    path = tmp_path / "model.tnsc"
+    with open(path, "wb") as f:
+        artifact.write_artifact(f, {"nilai": np.arange(1000.0)}, {"features": ["a"]}, compress=0)
+
+    model, _ = artifact.load_artifact(str(path), mmap=True)
+
+    assert isinstance(model["nilai"], np.memmap)
+
+
+def test_prune_spool_removes_oldest_and_keeps_current(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifact, "SPOOL_DIR", str(tmp_path))
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"{i}.tnsc"
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (time.time() - 100 + i, time.time() - 100 + i))
+        paths.append(str(path))
+
+    # file terlama dipakai lagi: tidak boleh terhapus walaupun paling tua
+    artifact.prune_spool(keep=paths[0], budget_bytes=200)
+
+    assert os.path.exists(paths[0])
+    assert not os.path.exists(paths[1])
+    assert os.path.exists(paths[2])
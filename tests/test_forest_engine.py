@@ -0,0 +1,110 @@
+# test_forest_engine.py
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from forest_engine import COMPACT_FROM_DEPTH, PARITY_TOLERANCE, PackedForest, check_parity
+
+
+def _train(X, y, **params):
+    model = RandomForestClassifier(n_estimators=params.pop("n_estimators", 10), random_state=0, **params)
+    return model.fit(X, y)
+
+
+def _assert_parity(model, X, block_rows=None):
+    forest = PackedForest.from_model(model)
+    X = np.asarray(X, dtype=np.float32)
+    expected = model.predict_proba(X)
+
+    actual = forest.predict_proba(X) if block_rows is None else forest.predict_proba(X, block_rows)
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=PARITY_TOLERANCE)
+    np.testing.assert_array_equal(forest.predict(X), model.predict(X))
+    # jalur satu baris (dipakai form prediksi) harus identik dengan jalur batch
+    for row, proba in zip(X[:25], expected[:25]):
+        np.testing.assert_allclose(forest.predict_proba_one(row), proba, rtol=0, atol=PARITY_TOLERANCE)
+    return forest
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, 5)).astype(np.float32)
+    y = (X[:, 0] + X[:, 1] * X[:, 2] > 0).astype(int)
+    return X, y
+
+
+def test_parity_with_missing_values(data):
+    X, y = data
+    X = X.copy()
+    rng = np.random.default_rng(1)
+    X[rng.random(X.shape) < 0.15] = np.nan
+    model = _train(X, y)
+
+    forest = _assert_parity(model, X)
+    # ada split yang mengarahkan NaN ke kanan, jadi nan_left benar-benar teruji
+    assert not forest.nan_left[~forest.is_leaf()].all()
+
+    rows = np.full((3, X.shape[1]), np.nan, dtype=np.float32)
+    np.testing.assert_allclose(forest.predict_proba(rows), model.predict_proba(rows), atol=PARITY_TOLERANCE)
+
+
+def test_parity_depth_one_trees(data):
+    X, y = data
+    model = _train(X, y, max_depth=1)
+
+    forest = _assert_parity(model, X)
+    assert forest.max_depth == 1
+
+
+def test_parity_deep_trees_across_blocks(data):
+    X, y = data
+    rng = np.random.default_rng(2)
+    noisy = np.where(rng.random(len(y)) < 0.3, 1 - y, y)   # label acak -> pohon sangat dalam
+    model = _train(X, noisy, n_estimators=5, bootstrap=False, max_features=1)
+
+    forest = PackedForest.from_model(model)
+    assert forest.max_depth > COMPACT_FROM_DEPTH
+    # blok kecil: beberapa blok penuh + blok terakhir yang lebih pendek
+    _assert_parity(model, X, block_rows=128)
+
+
+def test_parity_multiclass_labels(data):
+    X, _ = data
+    y = np.array(["rendah", "sedang", "tinggi", "kritis"])[np.digitize(X[:, 0] + X[:, 3], [-1, 0, 1])]
+    model = _train(X, y, max_depth=6)
+
+    forest = _assert_parity(model, X)
+    assert list(forest.classes_) == list(model.classes_)
+
+
+def test_parity_at_float32_threshold_edges():
+    # nilai float32 yang berdekatan: ambang float64 sklearn (titik tengah) tidak bisa
+    # direpresentasikan di float32 dan harus dibulatkan ke bawah
+    rng = np.random.default_rng(3)
+    base = np.float32(120.0) + np.arange(200, dtype=np.float32) * np.float32(2 ** -17)
+    X = rng.choice(base, size=(400, 2)).astype(np.float32)
+    y = (X[:, 0] > base[100]).astype(int) ^ (X[:, 1] > base[50]).astype(int)
+    model = _train(X, y)
+
+    forest = PackedForest.from_model(model)
+    is_split = ~forest.is_leaf()
+    thresholds, features = forest.threshold[is_split], forest.feature[is_split]
+    rows = []
+    for t, f in zip(thresholds, features):
+        for value in (t, np.nextafter(t, np.float32(np.inf)), np.nextafter(t, np.float32(-np.inf))):
+            row = X[len(rows) % len(X)].copy()
+            row[f] = value
+            rows.append(row)
+
+    _assert_parity(model, np.array(rows, dtype=np.float32))
+
+
+def test_check_parity_reports_ok(data):
+    X, y = data
+    model = _train(X, y, max_depth=4)
+
+    result = check_parity(model, PackedForest.from_model(model), X)
+
+    assert result["ok"]
+    assert result["n_rows"] == len(X)
+    assert result["label_mismatches"] == 0
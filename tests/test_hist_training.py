@@ -0,0 +1,37 @@
+# test_hist_training.py
+import numpy as np
+import pandas as pd
+
+from hist_training import train_hist_model
+
+
+def _frame(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=n_rows)
+    x[rng.random(n_rows) < 0.2] = np.nan
+    # nilai kosong berisiko, nilai besar tidak: NaN tidak boleh diperlakukan sebagai nilai terbesar
+    y = (np.isnan(x) | (x < -0.5)).astype(int)
+    return pd.DataFrame({"x": x, "z": rng.normal(size=n_rows), "target": y})
+
+
+def test_hist_model_learns_missing_values_and_predicts_raw_rows():
+    df = _frame(2000)
+
+    result = train_hist_model(df, ["x", "z"], "target", n_estimators=20, test_size=0.25, random_state=0)
+    rows = pd.DataFrame({"x": [np.nan, np.nan, 2.0], "z": [0.0, 1.0, 0.0]})
+
+    assert result["acc"] > 0.95
+    assert result["cm"].sum() == 500
+    assert result["model"].predict(rows).tolist() == [1, 1, 0]
+    assert np.isclose(result["model"].feature_importances_.sum(), 1.0)
+
+
+def test_hist_model_fits_once_with_coarse_progress():
+    df = _frame(500)
+    calls = []
+
+    result = train_hist_model(df, ["x", "z"], "target", n_estimators=30, test_size=0.2,
+                              random_state=0, progress=lambda f, text: calls.append(f))
+
+    assert calls == sorted(calls) and len(calls) == 3
+    assert result["model"].model.n_iter_ <= 30
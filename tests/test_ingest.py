@@ -0,0 +1,50 @@
+# test_ingest.py
+import io
+
+import pandas as pd
+
+from ingest import read_csv_chunked
+
+
+def _read(csv: str, chunksize: int):
+    data = csv.encode()
+    df, col_info, _ = read_csv_chunked(io.BytesIO(data), len(data), chunksize=chunksize)
+    return df, col_info
+
+
+def test_category_text_in_one_chunk_numbers_in_another():
+    # chunk 1: teks (category berisi str), chunk 2: angka (category berisi int)
+    csv = "a,b\n"
+    csv += "".join(f"x{i % 3},{i}\n" for i in range(100))
+    csv += "".join(f"{i % 3},{i}\n" for i in range(100))
+
+    df, col_info = _read(csv, chunksize=100)
+    expected = pd.read_csv(io.StringIO(csv))
+
+    assert len(df) == 200
+    assert isinstance(df["a"].dtype, pd.CategoricalDtype)
+    assert df["a"].astype(str).tolist() == expected["a"].astype(str).tolist()
+    assert df["b"].tolist() == expected["b"].tolist()
+    assert col_info["Non-Null Count"].tolist() == [200, 200]
+
+
+def test_category_with_empty_chunk():
+    csv = "a,b\n"
+    csv += "".join(f"x{i % 3},{i}\n" for i in range(100))
+    csv += "".join(f",{i}\n" for i in range(100))
+
+    df, _ = _read(csv, chunksize=100)
+
+    assert len(df) == 200
+    assert df["a"].isna().sum() == 100
+    assert df["a"].iloc[:100].astype(str).tolist() == [f"x{i % 3}" for i in range(100)]
+
+
+def test_single_chunk_matches_full_read():
+    csv = "a,b\n" + "".join(f"x{i % 3},{i * 0.5}\n" for i in range(50))
+
+    df, _ = _read(csv, chunksize=100)
+    expected = pd.read_csv(io.StringIO(csv))
+
+    assert df["a"].astype(str).tolist() == expected["a"].tolist()
+    assert df["b"].tolist() == expected["b"].tolist()
@@ -0,0 +1,32 @@
+# test_profiling.py
+import numpy as np
+import pandas as pd
+
+import profiling
+
+
+def _frame():
+    return pd.DataFrame({
+        "a": [1, 2, 1, 3, 2],
+        "b": ["x", "y", "x", "z", "q"],
+        "id": [1, 2, 3, 4, 5],
+    })
+
+
+def test_duplicates_ignore_dropped_columns():
+    profile = profiling.profile_dataset(_frame(), drop_cols=["id"])
+
+    assert profile["duplicates"] == 1
+    assert profile["keep_positions"].tolist() == [0, 1, 3, 4]
+
+
+def test_hash_collision_does_not_drop_distinct_rows(monkeypatch):
+    # semua baris mendapat hash yang sama: hanya baris yang isinya sama yang boleh terhapus
+    monkeypatch.setattr(
+        profiling.pd.util, "hash_pandas_object",
+        lambda s, index=False: pd.Series(np.zeros(len(s), dtype=np.uint64)),
+    )
+    profile = profiling.profile_dataset(_frame(), drop_cols=["id"])
+
+    assert profile["duplicates"] == 1
+    assert profile["keep_positions"].tolist() == [0, 1, 3, 4]
@@ -0,0 +1,35 @@
+# test_result_export.py
+import pandas as pd
+
+from result_export import build_export
+
+
+def test_parquet_export_unifies_types_across_csv_chunks(tmp_path):
+    # chunk pertama: kolom catatan kosong dan skor bilangan bulat; chunk berikutnya teks/pecahan
+    df = pd.DataFrame({
+        "skor": [1, 2, 3, 4, 5.5, 6],
+        "catatan": [None, None, None, "kontrol", None, "ulang"],
+        "Prediksi": [0, 1, 0, 1, 1, 0],
+    })
+    path = tmp_path / "hasil.csv"
+    df.to_csv(path, index=False)
+
+    export = build_export("parquet", path=str(path), chunksize=3)
+    result = pd.read_parquet(export["file"])
+    export["file"].close()
+
+    assert export["rows"] == 6
+    assert result["skor"].tolist() == [1.0, 2.0, 3.0, 4.0, 5.5, 6.0]
+    assert result["catatan"].tolist() == [None, None, None, "kontrol", None, "ulang"]
+    assert result["Prediksi"].tolist() == [0, 1, 0, 1, 1, 0]
+
+
+def test_parquet_export_from_dataframe_keeps_object_columns(tmp_path):
+    df = pd.DataFrame({"catatan": [None, None, "kontrol"], "Probabilitas": [0.1, 0.5, 0.9]})
+
+    export = build_export("parquet", df=df, chunksize=2)
+    result = pd.read_parquet(export["file"])
+    export["file"].close()
+
+    assert result["catatan"].tolist() == [None, None, "kontrol"]
+    assert result["Probabilitas"].tolist() == [0.1, 0.5, 0.9]
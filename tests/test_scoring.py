@@ -0,0 +1,73 @@
+# test_scoring.py
+import io
+import os
+import time
+
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+import scoring
+from result_grid import read_result_rows
+
+
+def _model():
+    X = pd.DataFrame({"usia": [30.0, 40.0, 50.0, 60.0], "sistolik": [110.0, 120.0, 140.0, 160.0]})
+    return RandomForestClassifier(n_estimators=3, random_state=0).fit(X, [0, 0, 1, 1])
+
+
+def _score(tmp_path, csv_text):
+    out_path, reject_path = tmp_path / "hasil.csv", tmp_path / "ditolak.csv"
+    stats = scoring.score_csv_streaming(
+        io.StringIO(csv_text), len(csv_text), _model(), ["usia", "sistolik"], {}, str(out_path),
+        chunksize=2, reject_path=str(reject_path),
+    )
+    return stats, reject_path
+
+
+def test_streaming_creates_reject_file_only_when_rows_are_rejected(tmp_path):
+    stats, reject_path = _score(tmp_path, "usia,sistolik\n35,115\n45,130\n55,150\n")
+
+    assert stats["rejected"] == 0
+    assert not reject_path.exists()
+
+
+def test_streaming_writes_rejects_from_later_chunks_with_header(tmp_path):
+    # chunk pertama bersih: file penolakan baru dibuat (dengan header) di chunk kedua
+    stats, reject_path = _score(tmp_path, "usia,sistolik\n35,115\n45,130\n55,\n,150\n")
+
+    rejected = pd.read_csv(reject_path)
+    assert stats["rejected"] == 2
+    assert list(rejected.columns[:2]) == ["usia", "sistolik"]
+    assert rejected["sistolik"].tolist()[1] == 150
+
+
+def test_streaming_row_offsets_read_pages_from_result_file(tmp_path):
+    stats, _ = _score(tmp_path, "usia,sistolik,nama\n35,115,a\n45,130,b\n55,150,c\n65,170,d\n")
+
+    predictions, proba = stats["result_columns"]
+    assert len(predictions) == len(proba) == len(stats["row_offsets"]) - 1 == 4
+    positions = proba.argsort()[::-1]
+    page = read_result_rows(str(tmp_path / "hasil.csv"), stats["row_offsets"], positions, 1, 2)
+    assert page.index.tolist() == positions[:2].tolist()
+    assert page["Probabilitas_Risiko (%)"].tolist() == proba[positions[:2]].tolist()
+
+
+def test_streaming_drops_row_offsets_when_values_contain_newlines(tmp_path):
+    stats, _ = _score(tmp_path, 'usia,sistolik,nama\n35,115,"a\nb"\n45,130,c\n')
+
+    assert stats["row_offsets"] is None
+    assert len(stats["result_columns"][0]) == 2
+
+
+def test_prune_result_dir_removes_only_old_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(scoring, "RESULT_DIR", str(tmp_path))
+    old, fresh = tmp_path / "lama.csv", tmp_path / "baru.csv"
+    old.write_text("x")
+    fresh.write_text("x")
+    stale = time.time() - 3 * 3600
+    os.utime(old, (stale, stale))
+
+    scoring.prune_result_dir(max_age_hours=2)
+
+    assert not old.exists()
+    assert fresh.exists()
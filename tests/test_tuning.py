@@ -0,0 +1,37 @@
+# test_tuning.py
+import types
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+import tuning
+from training import RANDOM_STATE
+
+
+def test_cross_validation_excludes_the_holdout_rows(monkeypatch):
+    df = pd.DataFrame({"id": np.arange(100, dtype=float), "target": np.arange(100) % 2})
+    seen = {}
+
+    def fake_evaluate(X, y, entries, folds, cache_keys, progress=None, n_jobs=-1):
+        seen["ids"] = X[:, 0]
+        for entry in entries:
+            entry["scores"] = [0.5] * len(folds)
+        return entries
+
+    monkeypatch.setattr(tuning, "evaluate_candidates", fake_evaluate)
+    monkeypatch.setattr(tuning, "train_random_forest_cached", lambda *a, **kw: ("key", {}, False))
+    job = types.SimpleNamespace(partial=None, report=lambda *a: None)
+
+    tuning._tuning_job(job, df, "fp", ["id"], "target", "random", k=3, n_iter=1,
+                       test_size=0.2, n_jobs=1)
+
+    _, test_idx = train_test_split(np.arange(len(df)), test_size=0.2, random_state=RANDOM_STATE)
+    assert len(seen["ids"]) == 80
+    assert not np.isin(seen["ids"], test_idx).any()
+
+
+def test_fold_cache_key_depends_on_holdout_split():
+    params = {"n_estimators": 100}
+    assert (tuning.fold_cache_key("fp", ["a"], "t", params, 5, 0, 0.2)
+            != tuning.fold_cache_key("fp", ["a"], "t", params, 5, 0, 0.3))
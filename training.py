@@ -0,0 +1,268 @@
+# training.py
+import hashlib
+import json
+import os
+import warnings
+from functools import partial
+
+import pandas as pd
+import sklearn
+import streamlit as st
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+from sklearn.model_selection import train_test_split
+
+from cache import DiskLRUCache, data_fingerprint
+from hist_training import MAX_BINS, train_hist_model
+from jobs import get_job_manager
+
+# --- KONFIGURASI CACHE TRAINING ---
+CACHE_DIR = os.environ.get("TENSICARE_CACHE_DIR", ".cache")
+TRAINING_CACHE_MAX_MB = int(os.environ.get("TENSICARE_TRAINING_CACHE_MB", "2048"))
+RANDOM_STATE = 42
+# Minimal pohon per langkah training bertahap; minimal sejumlah CPU agar setiap langkah
+# tetap memakai semua core (n_jobs=-1)
+TREES_PER_STEP = max(10, os.cpu_count() or 1)
+
+
+# Backend training yang bisa dipilih di halaman Analysis
+TRAINING_BACKENDS = {
+    "Random Forest": "random_forest",
+    "Histogram (HistGradientBoosting, fitur uint8)": "hist_gradient_boosting",
+}
+
+
+@st.cache_resource
+def get_training_cache() -> DiskLRUCache:
+    """Cache hasil training di disk, dipakai bersama oleh semua sesi."""
+    return DiskLRUCache(
+        os.path.join(CACHE_DIR, "training"),
+        TRAINING_CACHE_MAX_MB * 1024 * 1024,
+    )
+
+
+# --- HELPER: FINGERPRINT CLEAN DATA ---
+def get_clean_fingerprint() -> str:
+    """Fingerprint clean_df di sesi ini (dihitung sekali, lalu disimpan)."""
+    if st.session_state.get("clean_fingerprint") is None:
+        st.session_state["clean_fingerprint"] = data_fingerprint(st.session_state["clean_df"])
+    return st.session_state["clean_fingerprint"]
+
+
+# --- HELPER: KUNCI CACHE TRAINING ---
+def training_cache_key(fingerprint: str, config: dict) -> str:
+    """Kunci cache = hash dari fingerprint data + seluruh konfigurasi training."""
+    payload = json.dumps(
+        {"data": fingerprint, "config": config, "sklearn": sklearn.__version__},
+        sort_keys=True,
+    )
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+# --- HELPER: TRAINING RANDOM FOREST ---
+def _fit_warm_start(model, X_train, y_train):
+    # Training bertahap memakai warm_start pada data yang sama persis, jadi peringatan sklearn
+    # tentang class_weight='balanced' + warm_start tidak berlaku di sini
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message='class_weight presets "balanced"', category=UserWarning)
+        model.fit(X_train, y_train)
+
+
+def train_random_forest(df: pd.DataFrame, predictors, target, n_estimators: int, test_size: float,
+                        progress=None, base_model=None, params: dict = None) -> dict:
+    """
+    Melatih Random Forest dan mengevaluasinya pada data testing.
+    Jika progress(fraction, message) diberikan, pohon dilatih bertahap (warm_start,
+    TREES_PER_STEP pohon per langkah) dan progres dilaporkan setiap langkah. Hutan yang
+    dihasilkan identik dengan training sekali jalan (random_state sama).
+    base_model: hutan dari konfigurasi yang sama (selain n_estimators) yang sudah dilatih.
+    Jika pohonnya lebih banyak, hutan dipangkas; jika lebih sedikit, hanya pohon tambahan
+    yang dilatih. Keduanya identik dengan training dari awal.
+    params: hyperparameter Random Forest tambahan (mis. hasil tuning, lihat tuning.py).
+    Returns: dict berisi 'model', 'acc', 'cm', 'report', 'base_trees' (pohon yang dipakai ulang).
+    """
+    X = df[predictors]
+    y = df[target]
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size, random_state=RANDOM_STATE
+    )
+
+    if base_model is not None:
+        model = base_model
+        base_trees = len(model.estimators_)
+        if base_trees >= n_estimators:
+            # pohon ke-i hanya bergantung pada random_state ke-i, jadi cukup dipangkas
+            model.estimators_ = model.estimators_[:n_estimators]
+            model.set_params(n_estimators=n_estimators)
+    else:
+        model = RandomForestClassifier(
+            n_estimators=n_estimators,
+            random_state=RANDOM_STATE,
+            class_weight="balanced",
+            n_jobs=-1,
+            **(params or {}),
+        )
+        base_trees = 0
+
+    n_trees = len(getattr(model, "estimators_", []))
+    if progress is None and n_trees < n_estimators:
+        model.set_params(warm_start=n_trees > 0, n_estimators=n_estimators)
+        _fit_warm_start(model, X_train, y_train)
+        model.set_params(warm_start=False)
+    elif progress is not None:
+        model.set_params(warm_start=True)
+        while n_trees < n_estimators:
+            progress(n_trees / n_estimators, f"{n_trees} dari {n_estimators} pohon")
+            n_trees = min(n_trees + TREES_PER_STEP, n_estimators)
+            model.set_params(n_estimators=n_trees)
+            _fit_warm_start(model, X_train, y_train)
+        model.set_params(warm_start=False)
+        progress(1.0, "Evaluasi pada data testing")
+
+    y_pred = model.predict(X_test)
+
+    return {
+        "model": model,
+        "acc": accuracy_score(y_test, y_pred),
+        "cm": confusion_matrix(y_test, y_pred),
+        "report": classification_report(y_test, y_pred, output_dict=True),
+        "base_trees": base_trees,
+    }
+
+
+# --- HELPER: KONFIGURASI TRAINING ---
+def random_forest_config(predictors, target, n_estimators: int, test_size: float,
+                         params: dict = None, algorithm: str = "random_forest") -> dict:
+    """Konfigurasi training (default Random Forest) yang menjadi bagian dari kunci cache."""
+    config = {
+        "algorithm": algorithm,
+        "predictors": list(predictors),
+        "target": target,
+        "n_estimators": int(n_estimators),
+        "test_size": round(float(test_size), 4),
+        "random_state": RANDOM_STATE,
+        "class_weight": "balanced",
+    }
+    if params:
+        config["params"] = dict(sorted(params.items()))
+    if algorithm == "hist_gradient_boosting":
+        # fitur mentah, di-bin oleh HGB sendiri; hasil dari binning lama tidak dipakai ulang
+        config["binning"] = {"max_bins": MAX_BINS, "input": "raw"}
+    return config
+
+
+# --- HELPER: KELUARGA HUTAN (TRAINING INKREMENTAL) ---
+def family_cache_key(fingerprint: str, config: dict) -> str:
+    """
+    Kunci 'keluarga' = fingerprint data + konfigurasi tanpa n_estimators. Semua hutan dalam
+    satu keluarga memakai data, fitur, split dan random_state yang sama, sehingga hutan
+    dengan n pohon adalah n pohon pertama dari hutan yang lebih besar.
+    """
+    family = {k: v for k, v in config.items() if k != "n_estimators"}
+    return "family-" + training_cache_key(fingerprint, family)
+
+
+def load_family_base(family_key: str):
+    """
+    Hutan terbesar yang pernah dilatih untuk keluarga ini (dicatat di cache sebagai
+    penunjuk ke hasil training-nya). Returns: model, atau None jika belum ada / sudah terhapus.
+    """
+    cache = get_training_cache()
+    entry = cache.get(family_key)
+    if entry is None:
+        return None
+    result = cache.get(entry["key"])
+    return None if result is None else result["model"]
+
+
+def _train_and_store(df, fingerprint, predictors, target, n_estimators, test_size, key,
+                     incremental=True, progress=None, params=None,
+                     algorithm="random_forest") -> dict:
+    if algorithm == "hist_gradient_boosting":
+        result = train_hist_model(df, predictors, target, n_estimators, test_size,
+                                  random_state=RANDOM_STATE, progress=progress)
+        get_training_cache().put(key, result)
+        return result
+
+    config = random_forest_config(predictors, target, n_estimators, test_size, params)
+    family_key = family_cache_key(fingerprint, config)
+    base_model = load_family_base(family_key) if incremental else None
+
+    result = train_random_forest(df, predictors, target, n_estimators, test_size,
+                                 progress=progress, base_model=base_model, params=params)
+    cache = get_training_cache()
+    cache.put(key, result)
+
+    # penunjuk juga diganti jika hutan yang ditunjuk sudah terhapus dari cache (eviction),
+    # agar keluarga ini tidak kehilangan basis selamanya
+    entry = cache.get(family_key)
+    if entry is None or entry["n_estimators"] < n_estimators or not cache.contains(entry["key"]):
+        cache.put(family_key, {"n_estimators": int(n_estimators), "key": key})
+    return result
+
+
+# --- HELPER: TRAINING DENGAN CACHE ---
+def train_random_forest_cached(df: pd.DataFrame, fingerprint: str, predictors, target,
+                               n_estimators: int, test_size: float, incremental: bool = True,
+                               params: dict = None, algorithm: str = "random_forest"):
+    """
+    Sama seperti train_random_forest, tetapi hasilnya disimpan di cache disk dengan kunci
+    fingerprint data + konfigurasi. Konfigurasi yang sama tidak dilatih ulang, dan jika
+    incremental=True hutan lain dari keluarga yang sama dipangkas/diperbesar.
+    Returns: tuple (key, hasil training, True jika diambil dari cache).
+    """
+    config = random_forest_config(predictors, target, n_estimators, test_size, params, algorithm)
+    key = training_cache_key(fingerprint, config)
+
+    result = get_training_cache().get(key)
+    if result is not None:
+        return key, result, True
+
+    result = _train_and_store(df, fingerprint, predictors, target, n_estimators, test_size,
+                              key, incremental, params=params, algorithm=algorithm)
+    return key, result, False
+
+
+# --- HELPER: TRAINING DI LATAR BELAKANG ---
+def _training_job(job, **kwargs):
+    return _train_and_store(progress=job.report, **kwargs)
+
+
+def submit_training_job(df: pd.DataFrame, fingerprint: str, predictors, target,
+                        n_estimators: int, test_size: float, incremental: bool = True,
+                        algorithm: str = "random_forest", params: dict = None,
+                        sample_rows: int = None):
+    """
+    Memulai training sebagai job latar belakang (lihat jobs.JobManager) agar UI tidak
+    terblokir dan training tetap berjalan saat pengguna pindah halaman. Hasil yang sudah
+    ada di cache langsung dikembalikan tanpa job; job yang sama yang masih berjalan dipakai ulang.
+    Dengan incremental=True job hanya melatih pohon tambahan (atau memangkas) dari hutan
+    terbesar keluarga yang sama. algorithm memilih backend (lihat TRAINING_BACKENDS).
+    sample_rows hanya dicatat di meta job (df adalah sampel mode eksplorasi, lihat sampling.py).
+    Returns: tuple (key, hasil training atau None, job atau None).
+    """
+    config = random_forest_config(predictors, target, n_estimators, test_size, params, algorithm)
+    key = training_cache_key(fingerprint, config)
+
+    result = get_training_cache().get(key)
+    if result is not None:
+        return key, result, None
+
+    job = get_job_manager().submit(
+        key,
+        partial(_training_job, df=df, fingerprint=fingerprint, predictors=list(predictors),
+                target=target, n_estimators=int(n_estimators), test_size=float(test_size),
+                key=key, incremental=incremental, params=params, algorithm=algorithm),
+        meta={
+            "algorithm": algorithm,
+            "predictors": list(predictors),
+            "target": target,
+            "n_estimators": int(n_estimators),
+            "test_size": float(test_size),
+            "n_rows": int(len(df)),
+            "params": params,
+            "sample_rows": sample_rows,
+        },
+    )
+    return key, None, job
@@ -0,0 +1,285 @@
+# tuning.py
+import math
+import time
+from functools import partial
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import (
+    KFold, ParameterGrid, ParameterSampler, StratifiedKFold, train_test_split,
+)
+
+from jobs import get_job_manager
+from training import (
+    RANDOM_STATE,
+    get_training_cache,
+    train_random_forest_cached,
+    training_cache_key,
+)
+
+# --- KONFIGURASI TUNING ---
+DEFAULT_FOLDS = 5
+RANDOM_SEARCH_ITER = 10   # jumlah kandidat pada random search
+HALVING_FACTOR = 3        # successive halving: 1/3 kandidat terbaik lolos ke ronde berikutnya
+
+# Metode pencarian yang bisa dipilih di halaman Analysis
+SEARCH_METHODS = {
+    "Grid search": "grid",
+    "Random search": "random",
+    "Successive halving": "halving",
+}
+
+# Ruang hyperparameter Random Forest yang dicari
+PARAM_SPACE = {
+    "n_estimators": [100, 200, 300],
+    "max_depth": [None, 10, 20],
+    "min_samples_leaf": [1, 2, 5],
+    "max_features": ["sqrt", "log2"],
+}
+
+
+# --- HELPER: KANDIDAT PARAMETER ---
+def candidate_params(method: str, n_iter: int = RANDOM_SEARCH_ITER) -> list:
+    """
+    Daftar kombinasi parameter untuk metode pencarian. Pada successive halving n_estimators
+    bukan parameter yang dicari, melainkan 'anggaran' yang naik di setiap ronde.
+    Returns: list dict parameter.
+    """
+    if method == "random":
+        return list(ParameterSampler(PARAM_SPACE, n_iter=n_iter, random_state=RANDOM_STATE))
+    if method == "halving":
+        space = {k: v for k, v in PARAM_SPACE.items() if k != "n_estimators"}
+        return list(ParameterGrid(space))
+    return list(ParameterGrid(PARAM_SPACE))
+
+
+def halving_schedule(n_candidates: int, max_trees: int = max(PARAM_SPACE["n_estimators"]),
+                     factor: int = HALVING_FACTOR) -> list:
+    """
+    Jadwal successive halving: ronde terakhir memakai max_trees pohon, setiap ronde
+    sebelumnya 1/factor-nya. Returns: list tuple (jumlah kandidat, n_estimators) per ronde.
+    """
+    n_rounds = max(math.ceil(math.log(max(n_candidates, 1), factor)), 1)
+    schedule = []
+    for i in range(n_rounds):
+        n_trees = max(max_trees // factor ** (n_rounds - 1 - i), 1)
+        schedule.append((max(math.ceil(n_candidates / factor ** i), 1), n_trees))
+    return schedule
+
+
+def cv_folds(y, k: int) -> list:
+    """Indeks k-fold (stratified jika setiap kelas punya minimal k baris)."""
+    if pd.Series(y).value_counts().min() >= k:
+        splitter = StratifiedKFold(n_splits=k, shuffle=True, random_state=RANDOM_STATE)
+    else:
+        splitter = KFold(n_splits=k, shuffle=True, random_state=RANDOM_STATE)
+    return list(splitter.split(np.zeros(len(y)), y))
+
+
+# --- HELPER: EVALUASI SATU FOLD ---
+def fold_cache_key(fingerprint: str, predictors, target, params: dict, k: int, fold: int,
+                   test_size: float) -> str:
+    """
+    Kunci cache skor satu fold (data + fitur + parameter + pembagian fold). Fold dibuat dari
+    baris training split test_size, jadi test_size ikut menentukan isi setiap fold.
+    """
+    return training_cache_key(fingerprint, {
+        "algorithm": "random_forest_cv",
+        "predictors": list(predictors),
+        "target": target,
+        "params": dict(sorted(params.items())),
+        "folds": k,
+        "fold": fold,
+        "test_size": round(float(test_size), 4),
+        "random_state": RANDOM_STATE,
+        "class_weight": "balanced",
+    })
+
+
+def score_fold(X, y, params: dict, train_idx, test_idx) -> dict:
+    """Melatih Random Forest pada satu fold dan mengukur akurasinya pada fold validasi."""
+    start = time.perf_counter()
+    model = RandomForestClassifier(
+        random_state=RANDOM_STATE, class_weight="balanced", n_jobs=1, **params
+    )
+    model.fit(X[train_idx], y[train_idx])
+    score = accuracy_score(y[test_idx], model.predict(X[test_idx]))
+    return {"score": float(score), "seconds": time.perf_counter() - start}
+
+
+# --- HELPER: LEADERBOARD ---
+def new_entry(params: dict, k: int, round_no: int = 1) -> dict:
+    """Entri leaderboard kosong untuk satu kandidat (skor per fold diisi selama CV)."""
+    return {"params": params, "round": round_no, "scores": [None] * k, "seconds": 0.0, "cached": 0}
+
+
+def entry_mean(entry: dict):
+    """Rata-rata akurasi fold yang sudah selesai (None jika belum ada)."""
+    scores = [s for s in entry["scores"] if s is not None]
+    return float(np.mean(scores)) if scores else None
+
+
+def leaderboard_frame(entries) -> pd.DataFrame:
+    """
+    Leaderboard kandidat, diurutkan dari rata-rata akurasi CV tertinggi
+    (kandidat yang belum selesai dihitung dari fold yang sudah ada).
+    Returns: DataFrame.
+    """
+    entries = list(entries)
+    show_round = len({entry["round"] for entry in entries}) > 1
+    rows = []
+    for entry in entries:
+        scores = [s for s in entry["scores"] if s is not None]
+        row = {"Peringkat": 0}
+        if show_round:
+            row["Ronde"] = entry["round"]
+        # nilai parameter sebagai teks: satu kolom bisa berisi None dan angka (mis. max_depth)
+        row.update({k: str(v) for k, v in entry["params"].items()})
+        row["Fold selesai"] = f"{len(scores)}/{len(entry['scores'])}"
+        row["Akurasi CV (%)"] = round(np.mean(scores) * 100, 2) if scores else None
+        row["Std (%)"] = round(np.std(scores) * 100, 2) if scores else None
+        row["Fold dari cache"] = entry["cached"]
+        row["Waktu (detik)"] = round(entry["seconds"], 2)
+        rows.append(row)
+    frame = pd.DataFrame(rows)
+    if frame.empty:
+        return frame
+    frame = frame.sort_values("Akurasi CV (%)", ascending=False, na_position="last", kind="stable")
+    frame["Peringkat"] = range(1, len(frame) + 1)
+    return frame.reset_index(drop=True)
+
+
+# --- HELPER: PENCARIAN PARALEL ---
+def evaluate_candidates(X, y, entries, folds, cache_keys, progress=None, n_jobs: int = -1):
+    """
+    Cross-validation semua kandidat di entries (diisi langsung). Skor fold yang sudah ada
+    di cache dipakai, sisanya dilatih paralel (joblib dengan thread, seperti n_jobs milik
+    Random Forest sendiri) dan entri diperbarui begitu setiap fold selesai, dalam urutan
+    selesai. progress() dipanggil setiap satu fold selesai.
+    Returns: entries.
+    """
+    cache = get_training_cache()
+    tasks = []
+    for i, entry in enumerate(entries):
+        for fold in range(len(folds)):
+            cached = cache.get(cache_keys[i][fold])
+            if cached is None:
+                tasks.append((i, fold))
+                continue
+            entry["scores"][fold] = cached["score"]
+            entry["cached"] += 1
+    if progress is not None:
+        progress()
+
+    def run(i, fold):
+        train_idx, test_idx = folds[fold]
+        return i, fold, score_fold(X, y, entries[i]["params"], train_idx, test_idx)
+
+    results = Parallel(n_jobs=n_jobs, prefer="threads", return_as="generator_unordered")(
+        delayed(run)(i, fold) for i, fold in tasks
+    )
+    for i, fold, outcome in results:
+        cache.put(cache_keys[i][fold], outcome)
+        entries[i]["scores"][fold] = outcome["score"]
+        entries[i]["seconds"] += outcome["seconds"]
+        if progress is not None:
+            progress()
+    return entries
+
+
+# --- HELPER: JOB TUNING ---
+def _tuning_job(job, df, fingerprint, predictors, target, method, k, n_iter, test_size, n_jobs):
+    # CV hanya pada baris training dari split yang sama dengan train_random_forest, agar baris
+    # testing (untuk akurasi akhir model terbaik) tidak ikut menentukan pemilihan parameter
+    train_idx, _ = train_test_split(
+        np.arange(len(df)), test_size=test_size, random_state=RANDOM_STATE
+    )
+    X = df[predictors].to_numpy()[train_idx]
+    y = df[target].to_numpy()[train_idx]
+    folds = cv_folds(y, k)
+    candidates = candidate_params(method, n_iter)
+    if method == "halving":
+        schedule = halving_schedule(len(candidates))
+    else:
+        schedule = [(len(candidates), None)]
+
+    total_fits = sum(n for n, _ in schedule) * k
+    board = []   # entri semua ronde; dibaca UI lewat job.partial selama job berjalan
+    job.partial = board
+
+    def report(label):
+        done = sum(s is not None for entry in board for s in entry["scores"])
+        job.report(done / total_fits * 0.95, f"{label}{done} dari {total_fits} fold")
+
+    for round_no, (n_keep, n_trees) in enumerate(schedule, start=1):
+        if n_trees is not None:
+            candidates = [dict(params, n_estimators=n_trees) for params in candidates[:n_keep]]
+        entries = [new_entry(params, k, round_no) for params in candidates]
+        keys = [
+            [fold_cache_key(fingerprint, predictors, target, params, k, fold, test_size)
+             for fold in range(k)]
+            for params in candidates
+        ]
+        board.extend(entries)
+        label = f"ronde {round_no}/{len(schedule)}, " if len(schedule) > 1 else ""
+        evaluate_candidates(X, y, entries, folds, keys, partial(report, label), n_jobs)
+
+        # kandidat terbaik lebih dulu; ronde berikutnya mengambil yang teratas
+        entries = sorted(entries, key=lambda entry: -entry_mean(entry))
+        candidates = [
+            {p: v for p, v in entry["params"].items() if p != "n_estimators"} for entry in entries
+        ]
+
+    best = entries[0]
+    job.report(0.95, "Melatih model terbaik pada data training")
+    key, result, _ = train_random_forest_cached(
+        df, fingerprint, predictors, target, best["params"]["n_estimators"], test_size,
+        params=candidates[0],
+    )
+    return {
+        "key": key,
+        "result": result,
+        "best_params": best["params"],
+        "cv_accuracy": entry_mean(best),
+        "leaderboard": board,
+    }
+
+
+def submit_tuning_job(df: pd.DataFrame, fingerprint: str, predictors, target, method: str,
+                      k: int = DEFAULT_FOLDS, n_iter: int = RANDOM_SEARCH_ITER,
+                      test_size: float = 0.2, n_jobs: int = -1, sample_rows: int = None):
+    """
+    Memulai pencarian hyperparameter dengan k-fold cross-validation pada data training
+    sebagai job latar belakang. Leaderboard sementara tersedia di job.partial; setelah
+    selesai kandidat terbaik dilatih ulang pada data training (split yang sama dengan
+    training biasa) dan dinilai pada data testing yang tidak pernah dipakai saat CV,
+    sehingga akurasi, confusion matrix dan report bisa dibandingkan langsung.
+    Returns: job.
+    """
+    key = training_cache_key(fingerprint, {
+        "algorithm": "random_forest_search",
+        "method": method,
+        "folds": int(k),
+        "n_iter": int(n_iter) if method == "random" else None,
+        "predictors": list(predictors),
+        "target": target,
+        "test_size": round(float(test_size), 4),
+    })
+    return get_job_manager().submit(
+        key,
+        partial(_tuning_job, df=df, fingerprint=fingerprint, predictors=list(predictors),
+                target=target, method=method, k=int(k), n_iter=int(n_iter),
+                test_size=float(test_size), n_jobs=n_jobs),
+        meta={
+            "predictors": list(predictors),
+            "target": target,
+            "test_size": float(test_size),
+            "n_rows": int(len(df)),
+            "method": method,
+            "folds": int(k),
+            "sample_rows": sample_rows,
+        },
+    )
@@ -0,0 +1,106 @@
+# validation.py
+import time
+
+import numpy as np
+import pandas as pd
+
+# Kolom alasan penolakan di file baris yang ditolak
+REJECT_REASON_COL = "Alasan_Penolakan"
+
+
+# --- HELPER: NILAI PENGISI KOLOM YANG HILANG ---
+def fill_values(features, columns, summary=None) -> dict:
+    """
+    Nilai pengganti untuk fitur yang tidak ada di batch: median data training dari
+    ringkasan fitur model (sketsa kuantil), atau 0 jika model tidak menyimpan ringkasan.
+    Returns: dict {fitur: nilai}.
+    """
+    entries = (summary or {}).get("features") or {}
+    probs = (summary or {}).get("quantile_probs") or []
+    values = {}
+    for feat in features:
+        if feat in columns:
+            continue
+        entry = entries.get(feat) or {}
+        if "quantiles" in entry and 0.5 in probs:
+            values[feat] = entry["quantiles"][probs.index(0.5)]
+        else:
+            values[feat] = 0
+    return values
+
+
+# --- HELPER: VALIDASI KOLUMNAR ---
+def _add_reason(reasons: np.ndarray, mask: np.ndarray, label: str, counts: dict):
+    n = int(mask.sum())
+    if n:
+        reasons[mask] = reasons[mask] + label + "; "
+        counts[label] = counts.get(label, 0) + n
+
+
+def validate_batch(df: pd.DataFrame, features, summary=None, encoders=None,
+                   strict_range: bool = False):
+    """
+    Validasi seluruh baris batch per kolom (vektor, tanpa loop per baris) terhadap skema
+    fitur model: nilai kosong, nilai yang bukan angka pada fitur numerik, dan rentang
+    min/max data training. Teks angka (mis. '120') dikonversi menjadi angka.
+    Kolom kategorikal tidak ditolak; kategori tidak dikenal diberi kode -1 saat encoding.
+    Tanpa ringkasan fitur (model lama) hanya nilai kosong pada kolom numerik yang dicek.
+    strict_range: baris di luar rentang ditolak; jika False hanya dihitung sebagai peringatan.
+    Returns: tuple (df baris valid, df baris ditolak + kolom REJECT_REASON_COL, dict info).
+    """
+    start = time.perf_counter()
+    entries = (summary or {}).get("features") or {}
+    encoders = encoders or {}
+    reasons = np.full(len(df), "", dtype=object)
+    reject_counts = {}
+    out_of_range = {}
+    coerced = {}
+
+    for col in features:
+        if col not in df.columns or col in encoders:
+            continue
+        raw = df[col]
+        entry = entries.get(col)
+        if entry is None:
+            if not pd.api.types.is_numeric_dtype(raw):
+                continue   # kategorikal model lama, encoder dibuat dari batch
+            entry = {"nulls": 0}
+        elif "min" not in entry:
+            continue       # fitur kategorikal menurut ringkasan
+
+        values = raw if pd.api.types.is_numeric_dtype(raw) else pd.to_numeric(raw, errors="coerce")
+        if values is not raw:
+            coerced[col] = values
+            _add_reason(reasons, (values.isna() & raw.notna()).to_numpy(), f"{col}: bukan angka", reject_counts)
+        if not entry.get("nulls"):
+            _add_reason(reasons, raw.isna().to_numpy(), f"{col}: kosong", reject_counts)
+
+        if "min" in entry:
+            if entry["dtype"].startswith("float"):
+                # bandingkan dalam presisi training (mis. float32) agar nilai maksimum asli tidak terhitung
+                values = values.astype(entry["dtype"])
+            outside = ((values < entry["min"]) | (values > entry["max"])).to_numpy()
+            if strict_range:
+                _add_reason(reasons, outside, f"{col}: di luar rentang training", reject_counts)
+            elif outside.any():
+                out_of_range[col] = int(outside.sum())
+
+    valid = reasons == ""
+    # baris ditolak disimpan dengan nilai aslinya (sebelum konversi)
+    rejected_df = df[~valid].assign(
+        **{REJECT_REASON_COL: pd.Series(reasons[~valid], dtype=object).str[:-2].to_numpy()}
+    )
+    if coerced:
+        df = df.assign(**coerced)
+    # take (bukan df[valid]) agar kolom hasil prediksi bisa ditambahkan tanpa SettingWithCopyWarning
+    valid_df = df if valid.all() else df.take(np.flatnonzero(valid))
+
+    info = {
+        "rows": len(df),
+        "rejected": int((~valid).sum()),
+        "reject_counts": reject_counts,
+        "out_of_range": out_of_range,
+        "fill_values": fill_values(features, df.columns, summary),
+        "seconds": time.perf_counter() - start,
+    }
+    return valid_df, rejected_df, info